@@ -10,15 +10,22 @@ from alembic import context
 config = context.config
 
 # Interpret the config file for Python logging.
-# This line sets up loggers basically.
-if config.config_file_name is not None:
+# This line sets up loggers basically. Skipped when run from app.db.migrate,
+# whose logging is already configured (fileConfig would disable it).
+if config.config_file_name is not None and "connection" not in config.attributes:
     fileConfig(config.config_file_name)
 
 # add your model's MetaData object here
 # for 'autogenerate' support
-# from myapp import mymodel
-# target_metadata = mymodel.Base.metadata
-target_metadata = None
+from app.core.config import settings
+from app.db.base_class import Base
+from app.models import user, device, work_order, message, notification, idempotency_key  # noqa: F401
+
+target_metadata = Base.metadata
+
+# The app's DATABASE_URL, unless alembic.ini / -x overrides point elsewhere
+if config.get_main_option("sqlalchemy.url", "").startswith("driver://"):
+    config.set_main_option("sqlalchemy.url", settings.DATABASE_URL.replace("%", "%%"))
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
@@ -57,6 +64,17 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    # app.db.migrate passes in the connection holding its advisory lock
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(
+            connection=connection, target_metadata=target_metadata
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
@@ -0,0 +1,36 @@
+"""add indexes for hot customer and admin queries
+
+Revision ID: add_hot_path_indexes
+Revises: add_idempotency_keys_table
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_hot_path_indexes'
+down_revision = 'add_idempotency_keys_table'
+branch_labels = None
+depends_on = None
+
+# (table, column) pairs filtered or joined on by the portal and admin lists
+INDEXES = [
+    ('work_orders', 'customer_id'),
+    ('work_orders', 'device_id'),
+    ('work_orders', 'status'),
+    ('devices', 'customer_id'),
+    ('notifications', 'user_id'),
+    ('notifications', 'work_order_id'),
+]
+
+
+def upgrade():
+    # IF NOT EXISTS: databases built with create_all after these were added to the models already have them
+    for table, column in INDEXES:
+        op.create_index(f'ix_{table}_{column}', table, [column], if_not_exists=True)
+
+
+def downgrade():
+    for table, column in reversed(INDEXES):
+        op.drop_index(f'ix_{table}_{column}', table, if_exists=True)
@@ -0,0 +1,45 @@
+"""add idempotency keys table
+
+Revision ID: add_idempotency_keys_table
+Revises: add_messages_table
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_idempotency_keys_table'
+down_revision = 'add_messages_table'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases built with create_all after the model was added already have the table
+    if not sa.inspect(op.get_bind()).has_table('idempotency_keys'):
+        # Stored first responses for Idempotency-Key replay (status_code is NULL while in flight)
+        op.create_table(
+            'idempotency_keys',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_key', sa.String(), nullable=False),
+            sa.Column('key', sa.String(), nullable=False),
+            sa.Column('request_hash', sa.String(), nullable=False),
+            sa.Column('status_code', sa.Integer(), nullable=True),
+            sa.Column('response_body', sa.Text(), nullable=True),
+            sa.Column('media_type', sa.String(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+            sa.Column('expires_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('user_key', 'key', name='uq_idempotency_keys_user_key_key')
+        )
+
+    op.create_index('ix_idempotency_keys_id', 'idempotency_keys', ['id'], if_not_exists=True)
+    op.create_index('ix_idempotency_keys_expires_at', 'idempotency_keys', ['expires_at'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_idempotency_keys_expires_at', 'idempotency_keys')
+    op.drop_index('ix_idempotency_keys_id', 'idempotency_keys')
+    op.drop_table('idempotency_keys')
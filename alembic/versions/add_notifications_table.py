@@ -0,0 +1,107 @@
+"""create users, devices, work orders and notifications tables
+
+Revision ID: add_notifications_table
+Revises:
+Create Date: 2025-10-30 12:00:00.000000
+
+Base of the chain. The tables were originally created with create_all, so
+this revision recreates them as they were before the messages table.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_notifications_table'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('phone', sa.String(), nullable=True),
+        sa.Column('password_hash', sa.String(), nullable=True),
+        sa.Column('role', sa.Enum('ADMIN', 'TECHNICIAN', 'USER', name='userrole'), nullable=True),
+        sa.Column('notes', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_users_id', 'users', ['id'])
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    op.create_table(
+        'devices',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('customer_id', sa.Integer(), nullable=True),
+        sa.Column('device_type', sa.String(), nullable=True),
+        sa.Column('brand', sa.String(), nullable=True),
+        sa.Column('model', sa.String(), nullable=True),
+        sa.Column('serial_number', sa.String(), nullable=True),
+        sa.Column('notes', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['customer_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_devices_id', 'devices', ['id'])
+    op.create_index('ix_devices_serial_number', 'devices', ['serial_number'], unique=True)
+
+    op.create_table(
+        'work_orders',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('customer_id', sa.Integer(), nullable=False),
+        sa.Column('device_id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('status', sa.Enum(
+            'PENDING', 'DIAGNOSED', 'APPROVED', 'IN_PROGRESS', 'COMPLETED', 'DELIVERED', 'CANCELLED',
+            name='workorderstatus'
+        ), nullable=True),
+        sa.Column('cost', sa.Float(), nullable=True),
+        sa.Column('technician_notes', sa.String(), nullable=True),
+        sa.Column('assigned_technician', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['customer_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['device_id'], ['devices.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_work_orders_id', 'work_orders', ['id'])
+
+    op.create_table(
+        'notifications',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('work_order_id', sa.Integer(), nullable=False),
+        sa.Column('type', sa.Enum('MESSAGE', 'STATUS_CHANGE', 'TECH_NOTE', 'COMPLETED', name='notificationtype'), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('message', sa.String(), nullable=False),
+        sa.Column('read', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['work_order_id'], ['work_orders.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_notifications_id', 'notifications', ['id'])
+
+
+def downgrade():
+    op.drop_index('ix_notifications_id', 'notifications')
+    op.drop_table('notifications')
+    op.drop_index('ix_work_orders_id', 'work_orders')
+    op.drop_table('work_orders')
+    op.drop_index('ix_devices_serial_number', 'devices')
+    op.drop_index('ix_devices_id', 'devices')
+    op.drop_table('devices')
+    op.drop_index('ix_users_email', 'users')
+    op.drop_index('ix_users_id', 'users')
+    op.drop_table('users')
+
+    # Drop enum types (PostgreSQL specific)
+    op.execute('DROP TYPE IF EXISTS notificationtype')
+    op.execute('DROP TYPE IF EXISTS workorderstatus')
+    op.execute('DROP TYPE IF EXISTS userrole')
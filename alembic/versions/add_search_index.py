@@ -0,0 +1,26 @@
+"""add full-text search index over work orders, devices and messages
+
+Revision ID: add_search_index
+Revises: add_hot_path_indexes
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+
+from app.db.search import create_search_index, drop_search_index
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_search_index'
+down_revision = 'add_hot_path_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # SQLite: FTS5 tables + sync triggers, backfilled; PostgreSQL: GIN tsvector indexes
+    create_search_index(op.get_bind())
+
+
+def downgrade():
+    drop_search_index(op.get_bind())
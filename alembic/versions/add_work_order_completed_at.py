@@ -0,0 +1,27 @@
+"""add work_orders.completed_at, set by the status state machine
+
+Revision ID: add_work_order_completed_at
+Revises: add_search_index
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_work_order_completed_at'
+down_revision = 'add_search_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases built with create_all after the column was added to the model already have it
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('work_orders')}
+    if 'completed_at' not in columns:
+        op.add_column('work_orders', sa.Column('completed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('work_orders', 'completed_at')
@@ -2,8 +2,8 @@
 from fastapi import APIRouter
 from .devices import router as devices_router
 from .work_orders import router as work_orders_router
-from .users import router as users
-from app.api.admin import work_orders, devices, users  
+from .users import router as users_router
+from app.api.admin import work_orders, devices, users, profiles, search, typeahead, exports, snapshots, imports
 
 router = APIRouter()
 
@@ -23,4 +23,40 @@ router.include_router(
     users.router,  
     prefix="/users",  
     tags=["admin-users"]  
-)
\ No newline at end of file
+)
+
+router.include_router(
+    profiles.router,
+    prefix="/profiles",
+    tags=["admin-profiles"]
+)
+
+router.include_router(
+    search.router,
+    prefix="/search",
+    tags=["admin-search"]
+)
+
+router.include_router(
+    typeahead.router,
+    prefix="/typeahead",
+    tags=["admin-typeahead"]
+)
+
+router.include_router(
+    exports.router,
+    prefix="/exports",
+    tags=["admin-exports"]
+)
+
+router.include_router(
+    snapshots.router,
+    prefix="/snapshots",
+    tags=["admin-snapshots"]
+)
+
+router.include_router(
+    imports.router,
+    prefix="/imports",
+    tags=["admin-imports"]
+)
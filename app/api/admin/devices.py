@@ -4,10 +4,12 @@ from typing import List, Optional
 
 from app.db.session import get_db
 from app.models.device import Device
-from app.models.user import Customer
+from app.models.user import User
 from app.models.user_role import UserRole
 from app.schemas.device import DeviceCreate, DeviceResponse
 from app.core.deps import get_current_user
+from app.core.fieldsets import parse_fields, sparse_response
+from app.services.typeahead import typeahead
 
 router = APIRouter()
 
@@ -15,12 +17,14 @@ router = APIRouter()
 @router.get("/", response_model=List[DeviceResponse])
 def get_all_devices(
     customer_id: Optional[int] = None,
+    fields: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: Customer = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
     """
     Get all devices (Admin/Tech only).
     Optionally filter by customer_id query parameter.
+    Pass ?fields=brand,model to only select and return those columns.
     """
     # Check if user is admin or technician
     if current_user.role not in [UserRole.ADMIN, UserRole.TECHNICIAN]:
@@ -29,12 +33,17 @@ def get_all_devices(
             detail="Only admins and technicians can access this endpoint"
         )
     
+    field_names = parse_fields(fields, DeviceResponse, Device)
+    
     query = db.query(Device)
     
     # Optional filter by customer_id
     if customer_id:
         query = query.filter(Device.customer_id == customer_id)
     
+    if field_names:
+        return sparse_response(query, Device, field_names)
+    
     devices = query.all()
     return devices
 
@@ -43,7 +52,7 @@ def get_all_devices(
 def get_device(
     device_id: int,
     db: Session = Depends(get_db),
-    current_user: Customer = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
     """Get any device by ID (Admin/Tech only)"""
     if current_user.role not in [UserRole.ADMIN, UserRole.TECHNICIAN]:
@@ -63,7 +72,7 @@ def get_device(
 def create_device_for_customer(
     device: DeviceCreate,
     db: Session = Depends(get_db),
-    current_user: Customer = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
     """Create a device for any customer (Admin only)"""
     if current_user.role != UserRole.ADMIN:
@@ -72,10 +81,11 @@ def create_device_for_customer(
             detail="Only admins can create devices for other customers"
         )
     
-    db_device = Device(**device.model_dump())
+    db_device = Device(customer_id=device.owner_id, **device.model_dump(exclude={"owner_id"}))
     db.add(db_device)
     db.commit()
     db.refresh(db_device)
+    typeahead.device_changed(db_device)
     return db_device
 
 
@@ -84,7 +94,7 @@ def update_device(
     device_id: int,
     device: DeviceCreate,
     db: Session = Depends(get_db),
-    current_user: Customer = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
     """Update any device (Admin/Tech only)"""
     if current_user.role not in [UserRole.ADMIN, UserRole.TECHNICIAN]:
@@ -97,11 +107,13 @@ def update_device(
     if not db_device:
         raise HTTPException(status_code=404, detail="Device not found")
     
-    for key, value in device.model_dump().items():
+    db_device.customer_id = device.owner_id
+    for key, value in device.model_dump(exclude={"owner_id"}).items():
         setattr(db_device, key, value)
     
     db.commit()
     db.refresh(db_device)
+    typeahead.device_changed(db_device)
     return db_device
 
 
@@ -109,7 +121,7 @@ def update_device(
 def delete_device(
     device_id: int,
     db: Session = Depends(get_db),
-    current_user: Customer = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
     """Delete any device (Admin only)"""
     if current_user.role != UserRole.ADMIN:
@@ -124,4 +136,5 @@ def delete_device(
     
     db.delete(device)
     db.commit()
+    typeahead.device_deleted(device.id)
     return {"message": "Device deleted successfully"}
\ No newline at end of file
@@ -0,0 +1,137 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Optional
+
+from app.db.session import get_db
+from app.models.device import Device
+from app.models.message import Message
+from app.models.user import User
+from app.models.work_order import WorkOrder, WorkOrderStatus
+from app.core.permissions import require_admin
+from app.services.exports import EXPORT_FORMATS, export_stream
+
+router = APIRouter()
+
+
+def check_format(export_format: str):
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid format. Must be one of: {', '.join(EXPORT_FORMATS)}"
+        )
+
+
+def check_status(status: Optional[str]) -> Optional[WorkOrderStatus]:
+    if status is None:
+        return None
+    try:
+        return WorkOrderStatus(status)
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid status. Must be one of: {', '.join(s.value for s in WorkOrderStatus)}"
+        )
+
+
+def streaming_export(db: Session, statement, export_format: str, name: str) -> StreamingResponse:
+    media_type, suffix = EXPORT_FORMATS[export_format]
+    filename = f"{name}-{datetime.utcnow():%Y%m%dT%H%M%SZ}{suffix}"
+    return StreamingResponse(
+        export_stream(db, statement, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/work-orders")
+def export_work_orders(
+    export_format: str = Query("ndjson", alias="format"),
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Stream every work order with its cost, device and customer (Admin only).
+    `format` is ndjson or csv; filter by status and by created_at in
+    [created_from, created_to).
+    """
+    check_format(export_format)
+    status = check_status(status)
+
+    statement = (
+        select(
+            WorkOrder.id,
+            WorkOrder.status,
+            WorkOrder.title,
+            WorkOrder.cost,
+            WorkOrder.assigned_technician,
+            WorkOrder.customer_id,
+            User.name.label("customer_name"),
+            User.email.label("customer_email"),
+            WorkOrder.device_id,
+            Device.device_type,
+            Device.brand,
+            Device.model,
+            Device.serial_number,
+            WorkOrder.created_at,
+            WorkOrder.updated_at,
+        )
+        .join(Device, Device.id == WorkOrder.device_id)
+        .join(User, User.id == WorkOrder.customer_id)
+        .order_by(WorkOrder.id)
+    )
+    if status:
+        statement = statement.where(WorkOrder.status == status)
+    if created_from:
+        statement = statement.where(WorkOrder.created_at >= created_from)
+    if created_to:
+        statement = statement.where(WorkOrder.created_at < created_to)
+
+    return streaming_export(db, statement, export_format, "work-orders")
+
+
+@router.get("/messages")
+def export_messages(
+    export_format: str = Query("ndjson", alias="format"),
+    status: Optional[str] = None,
+    work_order_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Stream message threads, ordered by work order then message (Admin only).
+    `format` is ndjson or csv; filter by the work order's status, a single
+    work order, and by message created_at in [created_from, created_to).
+    """
+    check_format(export_format)
+    status = check_status(status)
+
+    statement = (
+        select(
+            Message.id,
+            Message.work_order_id,
+            Message.sender_id,
+            Message.sender_type,
+            Message.message,
+            Message.is_read,
+            Message.created_at,
+        )
+        .order_by(Message.work_order_id, Message.id)
+    )
+    if status:
+        statement = statement.join(WorkOrder, WorkOrder.id == Message.work_order_id).where(WorkOrder.status == status)
+    if work_order_id:
+        statement = statement.where(Message.work_order_id == work_order_id)
+    if created_from:
+        statement = statement.where(Message.created_at >= created_from)
+    if created_to:
+        statement = statement.where(Message.created_at < created_to)
+
+    return streaming_export(db, statement, export_format, "messages")
@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.models.user import User
+from app.schemas.imports import ImportResult
+from app.core.deps import get_technician_user
+from app.core.permissions import require_admin
+from app.services.imports import IMPORT_FORMATS, run_import
+
+router = APIRouter()
+
+
+def check_format(import_format: str):
+    if import_format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid format. Must be one of: {', '.join(IMPORT_FORMATS)}"
+        )
+
+
+@router.post("/devices", response_model=ImportResult)
+async def import_devices_upload(
+    request: Request,
+    import_format: str = Query("ndjson", alias="format"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Import devices from the request body (Admin only).
+    `format` is ndjson (one DeviceCreate object per line) or csv (header row
+    with DeviceCreate field names). Rows with an unknown owner or a
+    serial_number that already exists are skipped and reported.
+    """
+    check_format(import_format)
+    return await run_import(db, "devices", request.stream(), import_format)
+
+
+@router.post("/work-orders", response_model=ImportResult)
+async def import_work_orders_upload(
+    request: Request,
+    import_format: str = Query("ndjson", alias="format"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_technician_user)
+):
+    """
+    Import work orders from the request body (Admin/Tech only).
+    `format` is ndjson or csv, with WorkOrderCreate fields; each work order
+    belongs to its device's customer. Rows with an unknown device_id are
+    skipped and reported.
+    """
+    check_format(import_format)
+    return await run_import(db, "work-orders", request.stream(), import_format)
+
+
+@router.post("/users", response_model=ImportResult)
+async def import_users_upload(
+    request: Request,
+    import_format: str = Query("ndjson", alias="format"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Create users from the request body (Admin only).
+    `format` is ndjson or csv, with UserCreateAdmin fields (name, email,
+    password, optional phone, role and notes). Rows whose email is already
+    registered are skipped and reported. For large migrations prefer
+    `python -m app.services.imports users FILE` on a machine with spare CPUs.
+    """
+    check_format(import_format)
+    return await run_import(db, "users", request.stream(), import_format)
@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from typing import List
+import os
+
+from app.models.user import User
+from app.schemas.profile import ProfileResponse
+from app.core.config import settings
+from app.core.permissions import require_admin
+from app.core.profiling import PROFILE_ID_PATTERN, list_profiles
+
+router = APIRouter()
+
+# format -> (file suffix, media type)
+PROFILE_FORMATS = {
+    "pstats": (".prof", "application/octet-stream"),
+    "collapsed": (".collapsed", "text/plain"),
+}
+
+
+@router.get("/", response_model=List[ProfileResponse])
+def get_profiles(
+    limit: int = 50,
+    current_user: User = Depends(require_admin)
+):
+    """
+    List recent request profiles (Admin only), newest first.
+    Profile a request by sending it with `X-Profile: 1` as an admin, or enable
+    sampled profiling with PROFILING_ENABLED.
+    """
+    return list_profiles()[:limit]
+
+
+@router.get("/{profile_id}/{profile_format}")
+def download_profile(
+    profile_id: str,
+    profile_format: str,
+    current_user: User = Depends(require_admin)
+):
+    """
+    Download a profile (Admin only).
+    `pstats` opens with `python -m pstats` or snakeviz, `collapsed` with
+    flamegraph.pl or speedscope.
+    """
+    if profile_format not in PROFILE_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid format. Must be one of: {', '.join(PROFILE_FORMATS)}"
+        )
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    suffix, media_type = PROFILE_FORMATS[profile_format]
+    path = os.path.join(settings.PROFILING_DIR, profile_id + suffix)
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    return FileResponse(path, media_type=media_type, filename=profile_id + suffix)
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List
+
+from app.db.search import search_work_orders
+from app.db.session import get_db
+from app.models.device import Device
+from app.models.work_order import WorkOrder
+from app.models.user import User
+from app.schemas.search import SearchResult
+from app.core.deps import get_technician_user
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[SearchResult])
+def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_technician_user)
+):
+    """
+    Full-text search over work orders, their devices and message threads
+    (Admin/Tech only). Results are work orders, best match first.
+    """
+    hits = search_work_orders(db.connection(), q, skip=skip, limit=limit)
+    if not hits:
+        return []
+
+    rows = (
+        db.query(WorkOrder, Device)
+        .join(Device, Device.id == WorkOrder.device_id)
+        .filter(WorkOrder.id.in_([work_order_id for work_order_id, _, _ in hits]))
+        .all()
+    )
+    found = {work_order.id: (work_order, device) for work_order, device in rows}
+
+    results = []
+    for work_order_id, score, matched_in in hits:
+        if work_order_id not in found:
+            continue
+        work_order, device = found[work_order_id]
+        results.append(SearchResult(
+            work_order_id=work_order.id,
+            title=work_order.title,
+            status=work_order.status,
+            assigned_technician=work_order.assigned_technician,
+            device_id=device.id,
+            device_brand=device.brand,
+            device_model=device.model,
+            serial_number=device.serial_number,
+            score=score,
+            matched_in=matched_in,
+        ))
+    return results
@@ -0,0 +1,86 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.responses import FileResponse
+from typing import List
+import logging
+import os
+import re
+
+from app.models.user import User
+from app.schemas.snapshot import SnapshotRequest, SnapshotRun
+from app.core.config import settings
+from app.core.permissions import require_admin
+from app.db.snapshot import SNAPSHOT_FORMATS, SNAPSHOT_TABLES, list_runs, snapshot, snapshot_lock
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+FILE_PATTERN = re.compile(r"^[a-z_]+-[0-9]{8}T[0-9]{6}\.(parquet|arrow)$")
+MEDIA_TYPES = {
+    ".parquet": "application/vnd.apache.parquet",
+    ".arrow": "application/vnd.apache.arrow.file",
+}
+
+
+def run_snapshot(request: SnapshotRequest):
+    try:
+        snapshot(settings.SNAPSHOT_DIR, request.format, request.tables, request.full)
+    except RuntimeError:
+        logger.warning("snapshot_already_running")
+    except Exception:
+        logger.exception("snapshot_failed")
+
+
+@router.post("/", status_code=202)
+def start_snapshot(
+    request: SnapshotRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(require_admin)
+):
+    """
+    Start a snapshot of the database to Parquet / Arrow files (Admin only).
+    Runs after the response; poll GET /api/admin/snapshots for the result.
+    """
+    if request.format not in SNAPSHOT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid format. Must be one of: {', '.join(SNAPSHOT_FORMATS)}"
+        )
+    unknown = set(request.tables or []) - set(SNAPSHOT_TABLES)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid tables. Must be among: {', '.join(SNAPSHOT_TABLES)}"
+        )
+    if snapshot_lock.locked():
+        raise HTTPException(status_code=409, detail="A snapshot is already running")
+
+    background_tasks.add_task(run_snapshot, request)
+    return {"message": "Snapshot started"}
+
+
+@router.get("/", response_model=List[SnapshotRun])
+def get_snapshots(
+    limit: int = 50,
+    current_user: User = Depends(require_admin)
+):
+    """List snapshot runs (Admin only), newest first"""
+    return list_runs(settings.SNAPSHOT_DIR)[:limit]
+
+
+@router.get("/{table}/{filename}")
+def download_snapshot(
+    table: str,
+    filename: str,
+    current_user: User = Depends(require_admin)
+):
+    """Download one snapshot file (Admin only)"""
+    if table not in SNAPSHOT_TABLES or not FILE_PATTERN.match(filename) or not filename.startswith(f"{table}-"):
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+
+    path = os.path.join(settings.SNAPSHOT_DIR, table, filename)
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+
+    media_type = MEDIA_TYPES[os.path.splitext(filename)[1]]
+    return FileResponse(path, media_type=media_type, filename=filename)
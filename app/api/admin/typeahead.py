@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app.db.session import get_db
+from app.models.user import User
+from app.schemas.typeahead import TypeaheadResponse
+from app.services.typeahead import KIND_ENTRIES, typeahead
+from app.core.deps import get_technician_user
+
+router = APIRouter()
+
+
+@router.get("/", response_model=TypeaheadResponse)
+def suggest(
+    q: str = Query(..., min_length=1, max_length=100),
+    kind: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_technician_user)
+):
+    """
+    Typeahead suggestions for the counter (Admin/Tech only).
+    Matches the start of any word of a user's name, their email or phone
+    number, and a device's model or serial number. Pass kind=users or
+    kind=devices to only get one list.
+    """
+    if kind is not None and kind not in KIND_ENTRIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid kind. Must be one of: {', '.join(KIND_ENTRIES)}"
+        )
+
+    typeahead.ensure_ready(db)
+    kinds = [kind] if kind else list(KIND_ENTRIES)
+    return {name: typeahead.suggest(name, q, limit) for name in kinds}
+
+
+@router.get("/stats")
+def typeahead_stats(current_user: User = Depends(get_technician_user)):
+    """Size and freshness of this worker's typeahead indexes"""
+    return typeahead.stats()
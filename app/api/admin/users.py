@@ -8,6 +8,8 @@ from app.models.user_role import UserRole
 from app.schemas.user import UserCreateAdmin, UserResponse, UserUpdateAdmin
 from app.core.permissions import require_admin, require_technician
 from app.core.security import get_password_hash
+from app.core.fieldsets import parse_fields, sparse_response
+from app.services.typeahead import typeahead
 
 router = APIRouter()
 
@@ -15,10 +17,16 @@ router = APIRouter()
 @router.get("/", response_model=List[UserResponse])
 def get_all_users(
     role: Optional[str] = None,
+    fields: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_technician)
 ):
-    """Get all users (Technician or Admin). Optionally filter by role."""
+    """
+    Get all users (Technician or Admin). Optionally filter by role.
+    Pass ?fields=name,email to only select and return those columns.
+    """
+    field_names = parse_fields(fields, UserResponse, User)
+    
     query = db.query(User)
     
     if role:
@@ -31,6 +39,9 @@ def get_all_users(
                 detail=f"Invalid role. Must be: user, technician, or admin"
             )
     
+    if field_names:
+        return sparse_response(query, User, field_names)
+    
     users = query.all()
     return users
 
@@ -76,6 +87,7 @@ def create_user(
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    typeahead.user_changed(db_user)
     return db_user
 
 
@@ -106,6 +118,7 @@ def update_user(
     
     db.commit()
     db.refresh(db_user)
+    typeahead.user_changed(db_user)
     return db_user
 
 
@@ -151,6 +164,7 @@ def delete_user(
     
     db.delete(user)
     db.commit()
+    typeahead.user_deleted(user.id)
     return {"message": f"User {user.name} deleted successfully"}
 
 
@@ -197,6 +211,7 @@ def promote_to_technician(
     user.role = UserRole.TECHNICIAN
     db.commit()
     db.refresh(user)
+    typeahead.user_changed(user)
     
     return {
         "message": f"{user.name} promoted to technician",
@@ -234,6 +249,7 @@ def create_technician(
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    typeahead.user_changed(db_user)
     return db_user
 
 
@@ -278,4 +294,5 @@ def remove_technician(
     
     db.delete(user)
     db.commit()
+    typeahead.user_deleted(user.id)
     return {"message": f"Technician {user.name} removed successfully"}
\ No newline at end of file
@@ -1,14 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from app.db.session import get_db
-from app.models.work_order import WorkOrder
+from app.models.work_order import WorkOrder, WorkOrderStatus
 from app.models.device import Device
 from app.models.user import User
 from app.models.user_role import UserRole
-from app.schemas.work_order import WorkOrderCreate, WorkOrderResponse, WorkOrderUpdate
+from app.schemas.work_order import (
+    WorkOrderBulkStatusResponse,
+    WorkOrderBulkStatusUpdate,
+    WorkOrderCreate,
+    WorkOrderResponse,
+    WorkOrderUpdate,
+)
+from app.core.config import settings
 from app.core.deps import get_current_user
+from app.core.fieldsets import parse_fields, sparse_response
+from app.services.work_order_status import allowed_targets, change_statuses
 
 router = APIRouter()
 
@@ -17,12 +27,14 @@ router = APIRouter()
 def get_all_work_orders(
     customer_id: Optional[int] = None,
     status: Optional[str] = None,
+    fields: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get all work orders (Admin/Tech only).
     Optionally filter by customer_id or status.
+    Pass ?fields=title,status,updated_at to only select and return those columns.
     """
     if current_user.role not in [UserRole.ADMIN, UserRole.TECHNICIAN]:
         raise HTTPException(
@@ -30,6 +42,8 @@ def get_all_work_orders(
             detail="Only admins and technicians can access this endpoint"
         )
     
+    field_names = parse_fields(fields, WorkOrderResponse, WorkOrder)
+    
     query = db.query(WorkOrder)
     
     # Optional filters
@@ -39,6 +53,9 @@ def get_all_work_orders(
     if status:
         query = query.filter(WorkOrder.status == status)
     
+    if field_names:
+        return sparse_response(query, WorkOrder, field_names)
+    
     work_orders = query.all()
     return work_orders
 
@@ -124,7 +141,8 @@ def update_work_order_status(
 ):
     """
     Update work order status (Admin/Tech only).
-    Allows partial update of just status and notes.
+    Allows partial update of just status and notes. The move must be allowed
+    by the work order state machine (app.services.work_order_status).
     """
     if current_user.role not in [UserRole.ADMIN, UserRole.TECHNICIAN]:
         raise HTTPException(
@@ -132,32 +150,98 @@ def update_work_order_status(
             detail="Only admins and technicians can update work order status"
         )
     
-    db_work_order = db.query(WorkOrder).filter(WorkOrder.id == work_order_id).first()
+    # Locked until the commit (PostgreSQL), like the bulk update
+    db_work_order = db.query(WorkOrder).filter(WorkOrder.id == work_order_id).with_for_update().first()
     if not db_work_order:
         raise HTTPException(status_code=404, detail="Work order not found")
     
-    # Validate status
-    valid_statuses = ['pending', 'in_progress', 'waiting_for_parts', 'completed', 'cancelled']
-    if status not in valid_statuses:
+    try:
+        new_status = WorkOrderStatus(status)
+    except ValueError:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid status. Must be one of: {', '.join(valid_statuses)}"
+            detail=f"Invalid status. Must be one of: {', '.join(s.value for s in WorkOrderStatus)}"
         )
     
-    db_work_order.status = status
-    if technician_notes:
+    results, _ = change_statuses(
+        db,
+        [(db_work_order.id, db_work_order.status, db_work_order.customer_id)],
+        new_status,
+        current_user,
+        values={"technician_notes": technician_notes} if technician_notes else None,
+    )
+    if results[0]["result"] == "invalid_transition":
+        allowed = allowed_targets(db_work_order.status, current_user)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot move a work order from '{db_work_order.status.value}' to '{new_status.value}'. "
+                   f"Allowed: {', '.join(s.value for s in allowed) or 'none'}"
+        )
+    if results[0]["result"] == "conflict":
+        raise HTTPException(
+            status_code=409,
+            detail="Work order status was changed by another request, reload and retry"
+        )
+    if results[0]["result"] == "unchanged" and technician_notes:
         db_work_order.technician_notes = technician_notes
     
-    # Set completed_at if status is completed
-    if status == 'completed' and not db_work_order.completed_at:
-        from datetime import datetime
-        db_work_order.completed_at = datetime.utcnow()
-    
     db.commit()
     db.refresh(db_work_order)
     return db_work_order
 
 
+@router.patch("/status", response_model=WorkOrderBulkStatusResponse)
+def update_work_order_statuses(
+    bulk: WorkOrderBulkStatusUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Move many work orders to one status (Admin/Tech only).
+    One SELECT, one UPDATE and one INSERT per side effect (notifications,
+    thread messages) for the whole list, committed together. Returns a result
+    per id: updated, unchanged (already in that status), invalid_transition
+    (not allowed from its status; left as is), conflict (changed by another
+    request meanwhile; left as is) or not_found.
+    """
+    if current_user.role not in [UserRole.ADMIN, UserRole.TECHNICIAN]:
+        raise HTTPException(
+            status_code=403,
+            detail="Only admins and technicians can update work order status"
+        )
+    
+    ids = list(dict.fromkeys(bulk.ids))
+    if not ids or len(ids) > settings.WORK_ORDER_BULK_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Send between 1 and {settings.WORK_ORDER_BULK_MAX_IDS} work order ids"
+        )
+    
+    # Locked until the commit (PostgreSQL), so the statuses checked are the ones replaced
+    current = {
+        row.id: tuple(row)
+        for row in db.execute(
+            select(WorkOrder.id, WorkOrder.status, WorkOrder.customer_id)
+            .where(WorkOrder.id.in_(ids))
+            .with_for_update()
+        )
+    }
+    
+    values = {"technician_notes": bulk.technician_notes} if bulk.technician_notes else None
+    results, changes = change_statuses(
+        db, [current[i] for i in ids if i in current], bulk.status, current_user, values
+    )
+    if changes:
+        db.commit()
+    
+    by_id = {result["id"]: result for result in results}
+    return {
+        "status": bulk.status,
+        "updated": len(changes),
+        "results": [by_id.get(i, {"id": i, "result": "not_found"}) for i in ids],
+    }
+
+
 @router.delete("/{work_order_id}")
 def delete_work_order(
     work_order_id: int,
@@ -0,0 +1,150 @@
+"""
+Batch endpoint
+Runs several API calls in-process in a single HTTP round trip
+"""
+import asyncio
+import json
+from typing import List
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.security import get_current_user
+from app.db.session import get_db
+from app.models.user import User
+from app.schemas.batch import BatchItem, BatchItemResult, BatchRequest, BatchResponse
+
+router = APIRouter()
+
+BATCH_PATH = "/api/batch"
+
+
+async def run_item(request: Request, item: BatchItem, state: dict) -> BatchItemResult:
+    """
+    Dispatch one sub-request through the ASGI app and capture its response.
+    `state` is exposed to dependencies as request.state (principal, shared db session).
+    """
+    url = urlsplit(item.path)
+    body = json.dumps(item.body).encode() if item.body is not None else b""
+
+    headers = [(b"content-type", b"application/json")]
+    authorization = request.headers.get("authorization")
+    if authorization:
+        headers.append((b"authorization", authorization.encode()))
+
+    scope = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": "1.1",
+        "method": item.method,
+        "scheme": request.scope.get("scheme", "http"),
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "headers": headers,
+        "state": state,
+    }
+
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    response = {"status": 500, "body": b""}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:
+        # The app already logged it; report the item as failed and keep going
+        return BatchItemResult(id=item.id, status=500, body={"detail": "Internal Server Error"})
+
+    try:
+        result_body = json.loads(response["body"]) if response["body"] else None
+    except ValueError:
+        result_body = response["body"].decode(errors="replace")
+
+    return BatchItemResult(id=item.id, status=response["status"], body=result_body)
+
+
+@router.post("", response_model=BatchResponse)
+async def run_batch(
+    batch: BatchRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Run a list of sub-requests as the current user and return all results together.
+    Writes run one at a time on this request's DB session, in order.
+    Consecutive GETs run concurrently, each with its own session.
+    Session calls made here go through the threadpool so the event loop never blocks on the DB.
+    """
+    if not batch.items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No batch items provided"
+        )
+
+    if len(batch.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many batch items. Maximum is {settings.BATCH_MAX_ITEMS}"
+        )
+
+    for item in batch.items:
+        path = urlsplit(item.path).path
+        if not path.startswith("/api/") or path.rstrip("/") == BATCH_PATH:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid batch item path: {item.path}"
+            )
+
+    semaphore = asyncio.Semaphore(settings.BATCH_MAX_CONCURRENCY)
+
+    async def run_read(item: BatchItem) -> BatchItemResult:
+        async with semaphore:
+            return await run_item(request, item, {"principal": current_user})
+
+    results: List[BatchItemResult] = []
+    reads: List[BatchItem] = []
+
+    async def flush_reads():
+        if reads:
+            # Reads run on other threads, so make sure nothing on the user is left to lazy load
+            user_state = inspect(current_user)
+            if user_state.persistent and user_state.expired_attributes:
+                await run_in_threadpool(db.refresh, current_user)
+            results.extend(await asyncio.gather(*[run_read(item) for item in reads]))
+            reads.clear()
+
+    for item in batch.items:
+        if item.method == "GET":
+            reads.append(item)
+            continue
+
+        await flush_reads()
+        result = await run_item(request, item, {"principal": current_user, "db": db})
+        if result.status >= 500:
+            await run_in_threadpool(db.rollback)
+        results.append(result)
+
+    await flush_reads()
+
+    return BatchResponse(results=results)
@@ -4,10 +4,12 @@ from .devices import router as devices_router
 from .work_orders import router as work_orders_router
 from .profile import router as profile_router
 from .notifications import router as notifications_router
+from .dashboard import router as dashboard_router
 
 
 router = APIRouter()
 router.include_router(devices_router, prefix="/devices", tags=["Customer Devices"])
 router.include_router(work_orders_router, prefix="/work-orders", tags=["Customer Work Orders"])
 router.include_router(profile_router, prefix="/profile", tags=["Customer Profile"])
-router.include_router(notifications_router, prefix="/notifications", tags=["Customer Notifications"])
\ No newline at end of file
+router.include_router(notifications_router, prefix="/notifications", tags=["Customer Notifications"])
+router.include_router(dashboard_router, prefix="/dashboard", tags=["Customer Dashboard"])
\ No newline at end of file
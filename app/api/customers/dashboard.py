@@ -0,0 +1,99 @@
+"""
+Dashboard endpoint for customer portal
+Returns devices, work orders, recent messages and unread counts in one request
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from app.core.deps import get_current_user
+from app.db.session import get_db
+from app.models.device import Device
+from app.models.message import Message, SenderType
+from app.models.notification import Notification
+from app.models.user import User
+from app.models.work_order import WorkOrder, WorkOrderStatus
+from app.schemas.dashboard import DashboardCounts, DashboardResponse
+from app.schemas.message import MessageResponse
+
+router = APIRouter()
+
+# Statuses that still need attention from the shop
+ACTIVE_STATUSES = [
+    WorkOrderStatus.PENDING,
+    WorkOrderStatus.DIAGNOSED,
+    WorkOrderStatus.APPROVED,
+    WorkOrderStatus.IN_PROGRESS,
+]
+
+
+@router.get("", response_model=DashboardResponse)
+def get_dashboard(
+    recent_limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get everything the customer portal shows on load.
+    Replaces separate calls to /devices, /work-orders, /messages/unread-count,
+    /messages/recent and /notifications/unread-count.
+    """
+    # Work orders, newest activity first (also used to resolve sender names below)
+    work_orders = db.query(WorkOrder).filter(
+        WorkOrder.customer_id == current_user.id
+    ).order_by(WorkOrder.updated_at.desc()).all()
+
+    devices = db.query(Device).filter(
+        Device.customer_id == current_user.id
+    ).all()
+
+    # All badge counts in a single round trip
+    unread_messages = select(func.count(Message.id)).join(WorkOrder).where(
+        WorkOrder.customer_id == current_user.id,
+        Message.sender_type == SenderType.TECHNICIAN,
+        Message.is_read == 0
+    ).scalar_subquery()
+
+    unread_notifications = select(func.count(Notification.id)).where(
+        Notification.user_id == current_user.id,
+        Notification.read == False
+    ).scalar_subquery()
+
+    counts = db.execute(
+        select(
+            unread_messages.label("unread_messages"),
+            unread_notifications.label("unread_notifications"),
+        )
+    ).one()
+
+    messages = db.query(Message).join(WorkOrder).filter(
+        WorkOrder.customer_id == current_user.id
+    ).order_by(Message.created_at.desc()).limit(recent_limit).all()
+
+    # Resolve sender names from the work orders we already loaded (no per-message query)
+    work_orders_by_id = {wo.id: wo for wo in work_orders}
+    recent_messages = []
+    for msg in messages:
+        msg_dict = msg.to_dict()
+
+        if msg.sender_type == SenderType.CUSTOMER:
+            msg_dict["sender_name"] = current_user.name
+        elif msg.sender_type == SenderType.TECHNICIAN:
+            work_order = work_orders_by_id.get(msg.work_order_id)
+            msg_dict["sender_name"] = (work_order and work_order.assigned_technician) or "Technician"
+        else:
+            msg_dict["sender_name"] = "System"
+
+        msg_dict["sender_avatar"] = None
+        recent_messages.append(MessageResponse(**msg_dict))
+
+    return DashboardResponse(
+        counts=DashboardCounts(
+            unread_messages=counts.unread_messages,
+            unread_notifications=counts.unread_notifications,
+            active_work_orders=sum(1 for wo in work_orders if wo.status in ACTIVE_STATUSES),
+        ),
+        work_orders=work_orders,
+        devices=devices,
+        recent_messages=recent_messages,
+    )
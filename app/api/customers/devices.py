@@ -37,7 +37,7 @@ def create_my_device(
     Customer ID is automatically set from JWT token.
     """
     # Override customer_id with current user's ID (security!)
-    device_data = device.model_dump()
+    device_data = device.model_dump(exclude={"owner_id"})
     device_data['customer_id'] = current_user.id
     
     db_device = Device(**device_data)
@@ -89,7 +89,7 @@ def update_my_device(
     
     # Update fields
     for key, value in device.model_dump().items():
-        if key != 'customer_id':  # Don't allow changing owner
+        if key != 'owner_id':  # Don't allow changing owner
             setattr(db_device, key, value)
     
     db.commit()
@@ -6,6 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from app.core.deps import get_current_user
+from app.core.idempotency import IdempotentRoute, idempotent
 from app.db.session import get_db
 from app.models.message import Message, SenderType
 from app.models.work_order import WorkOrder
@@ -13,7 +14,7 @@ from app.models.user import User
 from app.models.notification import Notification, NotificationType
 from app.schemas.message import MessageCreate, MessageResponse, MessageThread, MessageMarkRead
 
-router = APIRouter(prefix="/messages", tags=["messages"])
+router = APIRouter(prefix="/messages", tags=["messages"], route_class=IdempotentRoute)
 
 
 @router.get("/work-order/{work_order_id}", response_model=MessageThread)
@@ -78,6 +79,7 @@ async def get_work_order_messages(
 
 
 @router.post("/work-order/{work_order_id}", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
+@idempotent
 async def send_message(
     work_order_id: int,
     message_data: MessageCreate,
@@ -87,6 +89,7 @@ async def send_message(
     """
     Send a new message in a work order thread
     Customer can only send messages to their own work orders
+    Retries with the same Idempotency-Key header replay the first response
     """
     # Verify work order belongs to customer
     work_order = db.query(WorkOrder).filter(
@@ -109,6 +112,9 @@ async def send_message(
         is_read=0  # New messages are unread
     )
     
+    # Read before commit expires the customer, which would cost another SELECT
+    sender_name = current_customer.name
+    
     db.add(new_message)
     db.commit()
     db.refresh(new_message)
@@ -118,7 +124,7 @@ async def send_message(
     
     # Format response
     msg_dict = new_message.to_dict()
-    msg_dict["sender_name"] = current_customer.name
+    msg_dict["sender_name"] = sender_name
     msg_dict["sender_avatar"] = None
     
     return MessageResponse(**msg_dict)
@@ -196,21 +202,20 @@ async def get_recent_messages(
     Get recent messages across all work orders
     Useful for showing recent activity in dashboard
     """
-    messages = db.query(Message).join(WorkOrder).filter(
+    # Technician names come from the same join, not a query per message
+    rows = db.query(Message, WorkOrder.assigned_technician).join(WorkOrder).filter(
         WorkOrder.customer_id == current_customer.id
     ).order_by(Message.created_at.desc()).limit(limit).all()
     
     # Format messages
     formatted_messages = []
-    for msg in messages:
-        work_order = db.query(WorkOrder).filter(WorkOrder.id == msg.work_order_id).first()
-        
+    for msg, assigned_technician in rows:
         msg_dict = msg.to_dict()
         
         if msg.sender_type == SenderType.CUSTOMER:
             msg_dict["sender_name"] = current_customer.name
         elif msg.sender_type == SenderType.TECHNICIAN:
-            msg_dict["sender_name"] = work_order.assigned_technician or "Technician"
+            msg_dict["sender_name"] = assigned_technician or "Technician"
         else:
             msg_dict["sender_name"] = "System"
         
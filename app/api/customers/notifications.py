@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.db.session import get_db
 from app.models.user import User
 from app.models.notification import Notification
 from app.schemas.notification import NotificationResponse
 from app.core.deps import get_current_user
+from app.core.fieldsets import parse_fields, sparse_response
 
 router = APIRouter()
 
@@ -14,20 +15,31 @@ def get_my_notifications(
     skip: int = 0,
     limit: int = 50,
     unread_only: bool = False,
+    fields: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all notifications for the current user"""
+    """
+    Get all notifications for the current user.
+    Pass ?fields=title,read to only select and return those columns.
+    """
+    field_names = parse_fields(fields, NotificationResponse, Notification)
+    
     query = db.query(Notification).filter(
-        Notification.customer_id == current_user.id
+        Notification.user_id == current_user.id
     )
     
     if unread_only:
         query = query.filter(Notification.read == False)
     
-    notifications = query.order_by(
+    query = query.order_by(
         Notification.created_at.desc()
-    ).offset(skip).limit(limit).all()
+    ).offset(skip).limit(limit)
+    
+    if field_names:
+        return sparse_response(query, Notification, field_names)
+    
+    notifications = query.all()
     
     return notifications
 
@@ -40,7 +52,7 @@ def mark_notification_as_read(
     """Mark a notification as read"""
     notification = db.query(Notification).filter(
         Notification.id == notification_id,
-        Notification.customer_id == current_user.id
+        Notification.user_id == current_user.id
     ).first()
     
     if not notification:
@@ -58,7 +70,7 @@ def mark_all_notifications_as_read(
 ):
     """Mark all notifications as read"""
     db.query(Notification).filter(
-        Notification.customer_id == current_user.id,
+        Notification.user_id == current_user.id,
         Notification.read == False
     ).update({"read": True})
     
@@ -73,7 +85,7 @@ def get_unread_count(
 ):
     """Get count of unread notifications"""
     count = db.query(Notification).filter(
-        Notification.customer_id == current_user.id,
+        Notification.user_id == current_user.id,
         Notification.read == False
     ).count()
     
@@ -88,7 +100,7 @@ def delete_notification(
     """Delete a notification"""
     notification = db.query(Notification).filter(
         Notification.id == notification_id,
-        Notification.customer_id == current_user.id
+        Notification.user_id == current_user.id
     ).first()
     
     if not notification:
@@ -107,7 +119,7 @@ def delete_all_notifications(
 ):
     """Delete all notifications for current user"""
     db.query(Notification).filter(
-        Notification.customer_id == current_user.id
+        Notification.user_id == current_user.id
     ).delete()
     db.commit()
     
@@ -3,14 +3,16 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from app.db.session import get_db
-from app.models.work_order import WorkOrder
+from app.models.work_order import WorkOrder, WorkOrderStatus
 from app.models.device import Device
 from app.models.user import User
 from app.schemas.work_order import WorkOrderCreate, WorkOrderResponse
 from app.core.deps import get_current_user
+from app.core.idempotency import IdempotentRoute, idempotent
+from app.services.work_order_status import can_transition, change_statuses
 
 
-router = APIRouter()
+router = APIRouter(route_class=IdempotentRoute)
 
 
 @router.get("/", response_model=List[WorkOrderResponse])
@@ -30,6 +32,7 @@ def get_my_work_orders(
 
 
 @router.post("/", response_model=WorkOrderResponse, status_code=201)
+@idempotent
 def create_my_work_order(
     work_order: WorkOrderCreate,
     db: Session = Depends(get_db),
@@ -38,6 +41,7 @@ def create_my_work_order(
     """
     Create a new work order for one of the customer's devices.
     Device ownership is verified automatically.
+    Retries with the same Idempotency-Key header replay the first response.
     """
     # Verify device exists
     device = db.query(Device).filter(Device.id == work_order.device_id).first()
@@ -92,7 +96,7 @@ def cancel_my_work_order(
     work_order = db.query(WorkOrder).join(Device).filter(
         WorkOrder.id == work_order_id,
         Device.customer_id == current_user.id
-    ).first()
+    ).with_for_update(of=WorkOrder).first()
     
     if not work_order:
         raise HTTPException(
@@ -100,13 +104,20 @@ def cancel_my_work_order(
             detail="Work order not found or you don't have permission"
         )
     
-    # Only allow cancellation if work hasn't started
-    if work_order.status not in ['pending']:
+    # Only allowed while work hasn't started (see CUSTOMER_TRANSITIONS)
+    if not can_transition(work_order.status, WorkOrderStatus.CANCELLED, current_user):
         raise HTTPException(
             status_code=400,
-            detail=f"Cannot cancel work order with status '{work_order.status}'. Please contact support."
+            detail=f"Cannot cancel work order with status '{work_order.status.value}'. Please contact support."
         )
     
-    work_order.status = 'cancelled'
+    results, _ = change_statuses(
+        db, [(work_order.id, work_order.status, work_order.customer_id)], WorkOrderStatus.CANCELLED, current_user
+    )
+    if results[0]["result"] == "conflict":
+        raise HTTPException(
+            status_code=409,
+            detail="Work order status was changed meanwhile, please reload and try again."
+        )
     db.commit()
     return {"message": "Work order cancelled successfully"}
\ No newline at end of file
@@ -0,0 +1,196 @@
+"""
+Admission control / load shedding middleware
+Caps in-flight requests per route and per lane so a slow database can't pile up
+every request (and every pooled connection) until the whole API times out.
+Excess requests wait in a bounded queue until a deadline, then get a quick 503.
+"""
+import asyncio
+import json
+from collections import deque
+from typing import Dict, Optional
+
+from starlette.routing import Match
+
+from app.core.config import settings
+
+DEFAULT_LANE = "default"
+PRIORITY_LANE = "priority"
+
+
+class Limiter:
+    """Concurrency limit with a bounded FIFO wait queue (one per event loop / worker)"""
+
+    def __init__(self, limit: int, max_queue: int):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self.waiters = deque()
+        self.shed_count = 0
+        self.timeout_count = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self.waiters)
+
+    async def acquire(self, timeout: float) -> bool:
+        """Take a slot, waiting up to `timeout` seconds. Returns False if the request is shed"""
+        if self.active < self.limit and not self.waiters:
+            self.active += 1
+            return True
+
+        if len(self.waiters) >= self.max_queue:
+            self.shed_count += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            # release() hands its slot straight to us, so active is already counted
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+            return True
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            self.timeout_count += 1
+            return False
+        except asyncio.CancelledError:
+            # Client went away while queued
+            self._abandon(waiter)
+            raise
+
+    def _abandon(self, waiter):
+        if waiter.done():
+            # Slot was handed over just as we gave up - pass it on
+            self.release()
+        else:
+            waiter.cancel()
+            self.waiters.remove(waiter)
+
+    def release(self):
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True)
+                return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queue_depth": self.queue_depth,
+            "shed_count": self.shed_count,
+            "timeout_count": self.timeout_count,
+        }
+
+
+class AdmissionControlMiddleware:
+    """
+    Pure ASGI middleware. Each request takes a slot on its route's limiter and
+    on its lane's limiter. Cheap routes (health, unread counts) use the priority
+    lane so they keep answering while the default lane is saturated.
+    """
+
+    ROUTE_CACHE_SIZE = 10000
+
+    def __init__(self, app):
+        self.app = app
+        self.lanes = {
+            DEFAULT_LANE: Limiter(settings.ADMISSION_MAX_CONCURRENCY, settings.ADMISSION_MAX_QUEUE),
+            PRIORITY_LANE: Limiter(settings.ADMISSION_PRIORITY_CONCURRENCY, settings.ADMISSION_MAX_QUEUE),
+        }
+        self.routes: Dict[str, Limiter] = {}
+        self._route_cache: Dict[tuple, Optional[str]] = {}
+        admission_middleware.append(self)
+
+    def route_template(self, scope) -> Optional[str]:
+        """Route path template for the request, e.g. /api/customers/messages/work-order/{work_order_id}"""
+        cache_key = (scope["method"], scope["path"])
+        if cache_key in self._route_cache:
+            return self._route_cache[cache_key]
+
+        template = None
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match != Match.NONE:
+                template = getattr(route, "path", None)
+                break
+
+        if len(self._route_cache) >= self.ROUTE_CACHE_SIZE:
+            self._route_cache.clear()
+        self._route_cache[cache_key] = template
+        return template
+
+    def route_limiter(self, template: str) -> Limiter:
+        limiter = self.routes.get(template)
+        if limiter is None:
+            limit = settings.ADMISSION_ROUTE_LIMITS.get(template, settings.ADMISSION_ROUTE_CONCURRENCY)
+            limiter = self.routes[template] = Limiter(limit, settings.ADMISSION_MAX_QUEUE)
+        return limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.ADMISSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        # Batch sub-requests already run inside an admitted /api/batch request
+        if "principal" in scope.get("state", {}):
+            await self.app(scope, receive, send)
+            return
+
+        template = self.route_template(scope)
+        if template is None:
+            # Unknown path - let the router answer 404
+            await self.app(scope, receive, send)
+            return
+
+        lane = PRIORITY_LANE if template in settings.ADMISSION_PRIORITY_ROUTES else DEFAULT_LANE
+        route_limiter = self.route_limiter(template)
+        lane_limiter = self.lanes[lane]
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.ADMISSION_QUEUE_TIMEOUT_SECONDS
+
+        if not await route_limiter.acquire(settings.ADMISSION_QUEUE_TIMEOUT_SECONDS):
+            await self.shed(send)
+            return
+
+        try:
+            if not await lane_limiter.acquire(max(deadline - loop.time(), 0)):
+                await self.shed(send)
+                return
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                lane_limiter.release()
+        finally:
+            route_limiter.release()
+
+    async def shed(self, send):
+        body = json.dumps({"detail": "Server is busy, please retry shortly"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(settings.ADMISSION_RETRY_AFTER_SECONDS).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    def stats(self) -> dict:
+        return {
+            "lanes": {name: limiter.stats() for name, limiter in self.lanes.items()},
+            "routes": {template: limiter.stats() for template, limiter in self.routes.items()},
+        }
+
+
+# Middleware instances register themselves here so stats can be read from endpoints
+admission_middleware = []
+
+
+def admission_stats() -> dict:
+    """Queue depth, active and shed counts for this worker"""
+    if not admission_middleware:
+        return {"enabled": False}
+    return {"enabled": settings.ADMISSION_ENABLED, **admission_middleware[-1].stats()}
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 import os
+from typing import Dict, List, Optional
 
 class Settings(BaseSettings):
     # Use environment variable or default to SQLite
@@ -8,8 +9,138 @@ class Settings(BaseSettings):
         "sqlite:///./repair_shop.db"
     )
     SECRET_KEY: str = "your-secret-key-change-this"
+    # bcrypt work factor for new password hashes (tests lower it to the minimum, 4)
+    BCRYPT_ROUNDS: int = 12
+    # Processes hashing passwords for bulk user imports; 0 = one per usable CPU
+    PASSWORD_HASH_WORKERS: int = 0
     ENVIRONMENT: str = "development"
     
+    # Batch endpoint (/api/batch)
+    BATCH_MAX_ITEMS: int = 20
+    BATCH_MAX_CONCURRENCY: int = 4
+    
+    # Idempotency-Key replay ("memory" per worker, or "database" shared across workers)
+    IDEMPOTENCY_BACKEND: str = "memory"
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60
+    IDEMPOTENCY_MAX_ENTRIES: int = 10000
+    IDEMPOTENCY_LOCK_TIMEOUT_SECONDS: int = 60
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0
+    IDEMPOTENCY_POLL_SECONDS: float = 0.05
+    
+    # Admission control / load shedding (per worker)
+    # Default lane matches SQLAlchemy's default pool (5 + 10 overflow) so requests
+    # queue here instead of inside the connection pool
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_CONCURRENCY: int = 15
+    ADMISSION_PRIORITY_CONCURRENCY: int = 10
+    ADMISSION_ROUTE_CONCURRENCY: int = 10
+    # Exports hold a slot and a pooled connection for their whole (long) stream
+    ADMISSION_ROUTE_LIMITS: Dict[str, int] = {
+        "/api/admin/exports/work-orders": 2,
+        "/api/admin/exports/messages": 2,
+        "/api/admin/imports/devices": 2,
+        "/api/admin/imports/work-orders": 2,
+        "/api/admin/imports/users": 1,
+    }
+    ADMISSION_MAX_QUEUE: int = 50
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 2.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+    ADMISSION_PRIORITY_ROUTES: List[str] = [
+        "/api/health",
+        "/api/health/load",
+        "/api/customers/messages/unread-count",
+        "/api/customers/notifications/unread-count",
+    ]
+    
+    # Metrics (/metrics, Prometheus text format)
+    # Set METRICS_MULTIPROC_DIR to a shared directory when running several workers
+    METRICS_ENABLED: bool = True
+    METRICS_PRIVATE_ONLY: bool = True
+    METRICS_MULTIPROC_DIR: str = ""
+    METRICS_FLUSH_INTERVAL_SECONDS: float = 5.0
+    
+    # Query instrumentation (slow-query log, per-request budget, Server-Timing)
+    DB_SLOW_QUERY_MS: float = 200.0
+    DB_REQUEST_QUERY_BUDGET: int = 30
+    DB_REQUEST_TIME_BUDGET_MS: float = 500.0
+    DB_SERVER_TIMING: bool = True
+    
+    # Request profiling (admins can always send X-Profile: 1)
+    # PROFILING_ROUTES limits sampled profiling to these route templates (empty = all)
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_RATE: float = 0.01
+    PROFILING_ROUTES: List[str] = []
+    PROFILING_INTERVAL_MS: float = 5.0
+    PROFILING_MAX_CONCURRENT: int = 2
+    PROFILING_MAX_PROFILES: int = 200
+    PROFILING_DIR: str = "profiles"
+    
+    # Tracing (OTLP/JSON lines written to TRACING_FILE, no collector needed)
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATIO: float = 0.1
+    TRACING_FILE: str = "traces/spans.jsonl"
+    TRACING_SERVICE_NAME: str = "repair-shop-api"
+    
+    # Logging (JSON lines via a background writer; LOG_FILE empty = stderr)
+    LOG_LEVEL: str = "INFO"
+    LOG_FILE: str = ""
+    LOG_MAX_BYTES: int = 50 * 1024 * 1024
+    LOG_BACKUP_COUNT: int = 5
+    LOG_QUEUE_SIZE: int = 10000
+    
+    # Access log - polling routes only log ACCESS_LOG_2XX_SAMPLE_RATE of their 2xx responses
+    ACCESS_LOG_ENABLED: bool = True
+    ACCESS_LOG_2XX_SAMPLE_RATE: float = 0.05
+    ACCESS_LOG_SAMPLED_ROUTES: List[str] = [
+        "/api/health",
+        "/api/customers/notifications/unread-count",
+        "/api/customers/messages/unread-count",
+    ]
+    
+    # Server runner (python -m app.serve)
+    # SERVER_WORKERS = 0 sizes the pool from usable CPUs, capped by memory / SERVER_WORKER_MEMORY_MB
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0
+    SERVER_WORKER_MEMORY_MB: int = 256
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEPALIVE_SECONDS: int = 5
+    SERVER_LIMIT_CONCURRENCY: Optional[int] = None
+    SERVER_LIMIT_MAX_REQUESTS: Optional[int] = None
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: int = 30
+    
+    # Full-text search (GET /api/admin/search): best hits per source considered for ranking
+    SEARCH_MAX_HITS: int = 1000
+    
+    # Typeahead (GET /api/admin/typeahead): per-worker in-memory prefix indexes
+    # About 120 bytes per key, stored fields included (200k users + devices = 840k keys = ~100MB)
+    TYPEAHEAD_PRELOAD: bool = True
+    TYPEAHEAD_REBUILD_SECONDS: int = 300
+    TYPEAHEAD_MAX_ENTRIES: int = 1_000_000
+    TYPEAHEAD_MAX_KEY_LENGTH: int = 48
+    
+    # Streaming exports (/api/admin/exports): rows fetched and encoded per batch
+    EXPORT_BATCH_ROWS: int = 1000
+    
+    # Bulk status updates (PATCH /api/admin/work-orders/status)
+    WORK_ORDER_BULK_MAX_IDS: int = 500
+    
+    # Bulk imports (/api/admin/imports): rows validated and inserted per batch, row errors reported
+    # Users go IMPORT_USER_BATCH_ROWS at a time - each batch waits for its bcrypt hashes
+    IMPORT_BATCH_ROWS: int = 1000
+    IMPORT_USER_BATCH_ROWS: int = 200
+    IMPORT_MAX_ERRORS: int = 1000
+    
+    # Analytics snapshots (python -m app.db.snapshot, /api/admin/snapshots)
+    # SNAPSHOT_DATABASE_URL: read replica to export from; empty = DATABASE_URL
+    SNAPSHOT_DIR: str = "snapshots"
+    SNAPSHOT_DATABASE_URL: str = ""
+    SNAPSHOT_BATCH_ROWS: int = 50000
+    SNAPSHOT_OVERLAP_SECONDS: int = 300
+    
+    # Schema written by `python -m app.core.openapi` at build time; empty = generate on first request
+    OPENAPI_CACHE_FILE: str = ""
+    
     class Config:
         env_file = ".env"
 
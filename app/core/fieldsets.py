@@ -0,0 +1,73 @@
+"""
+Sparse fieldsets for list endpoints
+Lets clients pass ?fields=id,title,status to narrow both the SELECT and the JSON payload
+"""
+from typing import Dict, List, Optional, Type
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import Query
+
+
+def field_columns(schema: Type[BaseModel], model) -> Dict[str, str]:
+    """
+    {response field: model column} for the schema fields that map to a column -
+    by name, or through the field's validation_alias (e.g. owner_id -> customer_id)
+    """
+    columns = set(inspect(model).columns.keys())
+    mapping = {}
+    for name, field in schema.model_fields.items():
+        column = field.validation_alias if isinstance(field.validation_alias, str) else name
+        if column in columns:
+            mapping[name] = column
+    return mapping
+
+
+def allowed_fields(schema: Type[BaseModel], model) -> List[str]:
+    """Fields that exist on the response schema AND map to a column on the model"""
+    return list(field_columns(schema, model))
+
+
+def parse_fields(
+    fields: Optional[str],
+    schema: Type[BaseModel],
+    model
+) -> Optional[Dict[str, str]]:
+    """
+    Parse and validate a comma separated ?fields= value against a response schema.
+    Returns {field: column} in request order, or None when no fieldset was
+    requested (full response).
+    The primary key "id" is always included so rows stay addressable.
+    """
+    if not fields:
+        return None
+
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    columns = field_columns(schema, model)
+
+    invalid = [f for f in requested if f not in columns]
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid field(s): {', '.join(invalid)}. Must be one of: {', '.join(columns)}"
+        )
+
+    # Keep request order, drop duplicates, always lead with id
+    selected = {"id": columns["id"]}
+    for name in requested:
+        selected.setdefault(name, columns[name])
+    return selected
+
+
+def sparse_response(query: Query, model, field_names: Dict[str, str]) -> JSONResponse:
+    """
+    Run the query selecting only the requested columns and serialize the rows as-is.
+    Columns are labelled with their response field names.
+    Skips ORM object construction and response_model validation entirely.
+    """
+    columns = [getattr(model, column).label(name) for name, column in field_names.items()]
+    rows = query.with_entities(*columns).all()
+    return JSONResponse(content=jsonable_encoder([row._asdict() for row in rows]))
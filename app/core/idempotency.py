@@ -0,0 +1,291 @@
+"""
+Idempotency-Key support for POST endpoints
+The first response per (user, key) is stored and replayed on retries without running the handler again
+"""
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Optional, Tuple
+
+from fastapi import Request, Response, status
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from jose import JWTError, jwt
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.security import SECRET_KEY, ALGORITHM
+from app.db.session import SessionLocal
+from app.models.idempotency_key import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# Results of IdempotencyStore.begin()
+NEW = "new"            # caller owns the key and should run the handler
+PENDING = "pending"    # another request with this key is still running
+DONE = "done"          # stored response available
+MISMATCH = "mismatch"  # key was already used for a different request
+
+
+@dataclass
+class StoredResponse:
+    status_code: int
+    body: bytes
+    media_type: Optional[str]
+
+
+class MemoryIdempotencyStore:
+    """Per-process store. Bounded by max_entries (oldest evicted first) and a TTL"""
+
+    def __init__(self, ttl_seconds: int, max_entries: int, lock_timeout: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.lock_timeout = lock_timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def begin(self, user: str, key: str, request_hash: str) -> Tuple[str, Optional[StoredResponse]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((user, key))
+            if entry is not None and entry["expires_at"] <= now:
+                del self._entries[(user, key)]
+                entry = None
+
+            # Abandoned in-flight entries are taken over
+            if entry is not None and entry["response"] is None and now - entry["started_at"] > self.lock_timeout:
+                del self._entries[(user, key)]
+                entry = None
+
+            if entry is None:
+                self._entries[(user, key)] = {
+                    "request_hash": request_hash,
+                    "response": None,
+                    "started_at": now,
+                    "expires_at": now + self.ttl_seconds,
+                }
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                return NEW, None
+
+            if entry["request_hash"] != request_hash:
+                return MISMATCH, None
+            if entry["response"] is None:
+                return PENDING, None
+            return DONE, entry["response"]
+
+    def complete(self, user: str, key: str, response: StoredResponse):
+        with self._lock:
+            entry = self._entries.get((user, key))
+            if entry is not None:
+                entry["response"] = response
+
+    def release(self, user: str, key: str):
+        with self._lock:
+            self._entries.pop((user, key), None)
+
+
+class DatabaseIdempotencyStore:
+    """Shared across workers via the idempotency_keys table. Expired rows are purged periodically"""
+
+    PURGE_EVERY = 100
+
+    def __init__(self, ttl_seconds: int, lock_timeout: int, session_factory=SessionLocal):
+        self.ttl_seconds = ttl_seconds
+        self.lock_timeout = lock_timeout
+        self.session_factory = session_factory
+        self._begin_count = 0
+
+    def begin(self, user: str, key: str, request_hash: str) -> Tuple[str, Optional[StoredResponse]]:
+        db = self.session_factory()
+        try:
+            self._begin_count += 1
+            if self._begin_count % self.PURGE_EVERY == 0:
+                self.purge_expired(db)
+
+            now = datetime.utcnow()
+            record = db.query(IdempotencyKey).filter(
+                IdempotencyKey.user_key == user,
+                IdempotencyKey.key == key
+            ).first()
+
+            abandoned = (
+                record is not None
+                and record.status_code is None
+                and record.created_at < now - timedelta(seconds=self.lock_timeout)
+            )
+            if record is not None and (record.expires_at <= now or abandoned):
+                db.delete(record)
+                db.commit()
+                record = None
+
+            if record is None:
+                db.add(IdempotencyKey(
+                    user_key=user,
+                    key=key,
+                    request_hash=request_hash,
+                    created_at=now,
+                    expires_at=now + timedelta(seconds=self.ttl_seconds)
+                ))
+                try:
+                    db.commit()
+                    return NEW, None
+                except IntegrityError:
+                    # Another worker claimed the key first
+                    db.rollback()
+                    return PENDING, None
+
+            if record.request_hash != request_hash:
+                return MISMATCH, None
+            if record.status_code is None:
+                return PENDING, None
+            return DONE, StoredResponse(
+                status_code=record.status_code,
+                body=(record.response_body or "").encode(),
+                media_type=record.media_type
+            )
+        finally:
+            db.close()
+
+    def complete(self, user: str, key: str, response: StoredResponse):
+        db = self.session_factory()
+        try:
+            db.query(IdempotencyKey).filter(
+                IdempotencyKey.user_key == user,
+                IdempotencyKey.key == key
+            ).update({
+                "status_code": response.status_code,
+                "response_body": response.body.decode(),
+                "media_type": response.media_type,
+            })
+            db.commit()
+        finally:
+            db.close()
+
+    def release(self, user: str, key: str):
+        db = self.session_factory()
+        try:
+            db.query(IdempotencyKey).filter(
+                IdempotencyKey.user_key == user,
+                IdempotencyKey.key == key
+            ).delete()
+            db.commit()
+        finally:
+            db.close()
+
+    def purge_expired(self, db):
+        db.query(IdempotencyKey).filter(
+            IdempotencyKey.expires_at <= datetime.utcnow()
+        ).delete()
+        db.commit()
+
+
+def create_store():
+    """Build the store selected by IDEMPOTENCY_BACKEND ("memory" or "database")"""
+    if settings.IDEMPOTENCY_BACKEND == "database":
+        return DatabaseIdempotencyStore(
+            ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+            lock_timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS
+        )
+    return MemoryIdempotencyStore(
+        ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+        max_entries=settings.IDEMPOTENCY_MAX_ENTRIES,
+        lock_timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS
+    )
+
+
+store = create_store()
+
+
+def idempotent(endpoint: Callable) -> Callable:
+    """Mark an endpoint as honouring the Idempotency-Key header (router must use IdempotentRoute)"""
+    endpoint.idempotent = True
+    return endpoint
+
+
+def token_subject(request: Request) -> Optional[str]:
+    """JWT subject of the caller, or None if the request isn't authenticated"""
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal.email
+
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except JWTError:
+        return None
+
+
+class IdempotentRoute(APIRoute):
+    """Route class that replays stored responses for endpoints marked with @idempotent"""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        if not getattr(self.endpoint, "idempotent", False):
+            return handler
+
+        async def idempotent_handler(request: Request) -> Response:
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            user = token_subject(request)
+            # No key, or unauthenticated (the handler will reject it): nothing to dedupe
+            if not key or user is None:
+                return await handler(request)
+
+            fingerprint = hashlib.sha256(
+                request.method.encode() + request.url.path.encode() + await request.body()
+            ).hexdigest()
+
+            deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+            while True:
+                state, stored = await run_in_threadpool(store.begin, user, key, fingerprint)
+                if state != PENDING:
+                    break
+                # Hold concurrent duplicates until the first request finishes
+                if time.monotonic() >= deadline:
+                    return JSONResponse(
+                        status_code=status.HTTP_409_CONFLICT,
+                        content={"detail": "A request with this Idempotency-Key is still being processed"}
+                    )
+                await asyncio.sleep(settings.IDEMPOTENCY_POLL_SECONDS)
+
+            if state == MISMATCH:
+                return JSONResponse(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    content={"detail": "Idempotency-Key was already used for a different request"}
+                )
+
+            if state == DONE:
+                return Response(
+                    content=stored.body,
+                    status_code=stored.status_code,
+                    media_type=stored.media_type,
+                    headers={REPLAYED_HEADER: "true"}
+                )
+
+            try:
+                response = await handler(request)
+            except BaseException:
+                await run_in_threadpool(store.release, user, key)
+                raise
+
+            # Only successful responses are stored; anything else may be retried for real
+            if 200 <= response.status_code < 300:
+                await run_in_threadpool(store.complete, user, key, StoredResponse(
+                    status_code=response.status_code,
+                    body=response.body,
+                    media_type=response.media_type
+                ))
+            else:
+                await run_in_threadpool(store.release, user, key)
+            return response
+
+        return idempotent_handler
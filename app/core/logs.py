@@ -0,0 +1,170 @@
+"""
+Structured JSON logging and the access log
+Records go through a QueueHandler to a QueueListener thread, so formatting
+and file writes never happen on the event loop or request threads. Output is
+one JSON object per line to LOG_FILE (size-rotated) or stderr.
+
+Pass structured data with `extra={"fields": {...}}`; the fields are merged
+into the JSON record.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+from app.core.config import settings
+from app.core.tracing import current_span
+from app.db.instrumentation import current_query_stats
+
+access_logger = logging.getLogger("app.access")
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            data.update(fields)
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the writer falls behind"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Formatting is left to the writer thread (the queue never leaves this process)
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging():
+    """Route the app's loggers through the background JSON writer (idempotent)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    if settings.LOG_FILE:
+        handler = logging.handlers.RotatingFileHandler(
+            settings.LOG_FILE,
+            maxBytes=settings.LOG_MAX_BYTES,
+            backupCount=settings.LOG_BACKUP_COUNT,
+            encoding="utf-8",
+        )
+    else:
+        handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter())
+
+    log_queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    app_logger = logging.getLogger("app")
+    app_logger.setLevel(settings.LOG_LEVEL)
+    app_logger.addHandler(DroppingQueueHandler(log_queue))
+
+
+def _restart_after_fork():
+    """Threads don't survive fork: give a forked worker (app.serve) its own queue and writer"""
+    global _listener
+    if _listener is None:
+        return
+    atexit.unregister(_listener.stop)
+    app_logger = logging.getLogger("app")
+    for handler in list(app_logger.handlers):
+        if isinstance(handler, DroppingQueueHandler):
+            app_logger.removeHandler(handler)
+    _listener = None
+    configure_logging()
+
+
+os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def sample_rate(route: str, status_code: int) -> float:
+    """Fraction of requests to log: polling routes only log a sample of their 2xx responses"""
+    if 200 <= status_code < 300 and route in settings.ACCESS_LOG_SAMPLED_ROUTES:
+        return settings.ACCESS_LOG_2XX_SAMPLE_RATE
+    return 1.0
+
+
+class AccessLogMiddleware:
+    """
+    Pure ASGI middleware writing one access record per request.
+    Runs inside QueryInstrumentationMiddleware so the request's DB stats are visible.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.ACCESS_LOG_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+        response_bytes = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, response_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.log(scope, status_code, time.perf_counter() - start, response_bytes)
+
+    def log(self, scope, status_code: int, elapsed: float, response_bytes: int):
+        route = getattr(scope.get("route"), "path", None) or "unmatched"
+        rate = sample_rate(route, status_code)
+        if rate < 1.0 and random.random() >= rate:
+            return
+
+        stats = current_query_stats.get()
+        span = current_span.get()
+        client = scope.get("client")
+        access_logger.info("request", extra={"fields": {
+            "method": scope["method"],
+            "route": route,
+            "path": scope["path"],
+            "status": status_code,
+            "duration_ms": round(elapsed * 1000, 2),
+            "db_time_ms": round(stats.total_time * 1000, 2) if stats else None,
+            "db_queries": stats.count if stats else None,
+            "response_bytes": response_bytes,
+            "principal_id": scope.get("state", {}).get("principal_id"),
+            "client": client[0] if client else None,
+            "trace_id": span.trace_id if span else None,
+            "sample_rate": rate,
+        }})
@@ -0,0 +1,288 @@
+"""
+Request and database metrics in Prometheus text format
+Each worker aggregates into plain dicts on its event loop thread (no locks).
+With METRICS_MULTIPROC_DIR set, workers periodically write a snapshot file
+there and /metrics merges every live worker's snapshot.
+"""
+import ipaddress
+import json
+import os
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.db.instrumentation import QueryStats, current_query_stats
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# name -> (type, help)
+METRICS = {
+    "http_requests_total": ("counter", "Requests by route template, method and status code"),
+    "http_request_duration_seconds": ("histogram", "Request latency"),
+    "http_request_size_bytes": ("histogram", "Request body size"),
+    "http_response_size_bytes": ("histogram", "Response body size"),
+    "db_queries_per_request": ("histogram", "SQL statements issued per request"),
+    "db_time_per_request_seconds": ("histogram", "Time spent in SQL statements per request"),
+    "db_pool_size": ("gauge", "Configured connection pool size"),
+    "db_pool_checked_out": ("gauge", "Connections currently checked out of the pool"),
+    "db_pool_checked_in": ("gauge", "Idle connections in the pool"),
+    "db_pool_overflow": ("gauge", "Connections opened beyond pool_size"),
+    "admission_active": ("gauge", "Requests currently admitted, by lane"),
+    "admission_queue_depth": ("gauge", "Requests waiting for admission, by lane"),
+    "admission_shed_total": ("counter", "Requests rejected with 503 because the queue was full, by lane"),
+    "admission_timeout_total": ("counter", "Requests rejected with 503 after waiting past the deadline, by lane"),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """Counters and histograms for one worker"""
+
+    def __init__(self):
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        # (name, labels) -> [bucket bounds, bucket counts, sum, count]
+        self.histograms: Dict[Tuple[str, Labels], list] = {}
+
+    def inc(self, name: str, labels: Labels, amount: float = 1):
+        key = (name, labels)
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name: str, labels: Labels, value: float, buckets: tuple):
+        key = (name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = [buckets, [0] * (len(buckets) + 1), 0.0, 0]
+        histogram[1][bisect_left(buckets, value)] += 1
+        histogram[2] += value
+        histogram[3] += 1
+
+    def snapshot(self) -> dict:
+        """JSON-serializable copy of all values"""
+        return {
+            "counters": [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+            "histograms": [
+                [name, list(labels), list(h[0]), list(h[1]), h[2], h[3]]
+                for (name, labels), h in self.histograms.items()
+            ],
+        }
+
+    def merge(self, snapshot: dict):
+        """Add another worker's snapshot into this registry"""
+        for name, labels, value in snapshot["counters"]:
+            self.inc(name, tuple(tuple(pair) for pair in labels), value)
+        for name, labels, buckets, counts, total, count in snapshot["histograms"]:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                self.histograms[key] = [tuple(buckets), list(counts), total, count]
+            else:
+                histogram[1] = [a + b for a, b in zip(histogram[1], counts)]
+                histogram[2] += total
+                histogram[3] += count
+
+
+registry = MetricsRegistry()
+_last_flush = 0.0
+
+
+def snapshot_path(pid: int) -> str:
+    return os.path.join(settings.METRICS_MULTIPROC_DIR, f"metrics_{pid}.json")
+
+
+def flush_snapshot(force: bool = False):
+    """Write this worker's snapshot for other workers to merge (rate limited)"""
+    global _last_flush
+    if not settings.METRICS_MULTIPROC_DIR:
+        return
+    now = time.monotonic()
+    if not force and now - _last_flush < settings.METRICS_FLUSH_INTERVAL_SECONDS:
+        return
+    _last_flush = now
+
+    os.makedirs(settings.METRICS_MULTIPROC_DIR, exist_ok=True)
+    path = snapshot_path(os.getpid())
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(registry.snapshot(), f)
+    os.replace(tmp_path, path)
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def collect() -> MetricsRegistry:
+    """This worker's registry, or all live workers merged in multi-process mode"""
+    if not settings.METRICS_MULTIPROC_DIR:
+        return registry
+
+    flush_snapshot(force=True)
+    merged = MetricsRegistry()
+    for filename in os.listdir(settings.METRICS_MULTIPROC_DIR):
+        if not (filename.startswith("metrics_") and filename.endswith(".json")):
+            continue
+        path = os.path.join(settings.METRICS_MULTIPROC_DIR, filename)
+        pid = int(filename[len("metrics_"):-len(".json")])
+        if not pid_alive(pid):
+            os.remove(path)
+            continue
+        try:
+            with open(path) as f:
+                merged.merge(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return merged
+
+
+def pool_gauges(engine) -> Dict[str, float]:
+    """Connection pool gauges (only pools that track them, e.g. QueuePool)"""
+    pool = engine.pool
+    gauges = {}
+    for name, method in [
+        ("db_pool_size", "size"),
+        ("db_pool_checked_out", "checkedout"),
+        ("db_pool_checked_in", "checkedin"),
+        ("db_pool_overflow", "overflow"),
+    ]:
+        if hasattr(pool, method):
+            gauges[name] = getattr(pool, method)()
+    return gauges
+
+
+def format_labels(labels) -> str:
+    if not labels:
+        return ""
+    escaped = [
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels
+    ]
+    return "{" + ",".join(escaped) + "}"
+
+
+def render(metrics: MetricsRegistry, gauges: List[Tuple[str, Labels, float]]) -> str:
+    """Prometheus text exposition format (version 0.0.4)"""
+    samples: Dict[str, List[str]] = {name: [] for name in METRICS}
+
+    for (name, labels), value in sorted(metrics.counters.items()):
+        samples.setdefault(name, []).append(f"{name}{format_labels(labels)} {value}")
+
+    for (name, labels), (buckets, counts, total, count) in sorted(metrics.histograms.items()):
+        lines = samples.setdefault(name, [])
+        cumulative = 0
+        for bound, bucket_count in zip(list(buckets) + ["+Inf"], counts):
+            cumulative += bucket_count
+            lines.append(f"{name}_bucket{format_labels(labels + (('le', str(bound)),))} {cumulative}")
+        lines.append(f"{name}_sum{format_labels(labels)} {total}")
+        lines.append(f"{name}_count{format_labels(labels)} {count}")
+
+    for name, labels, value in gauges:
+        samples.setdefault(name, []).append(f"{name}{format_labels(labels)} {value}")
+
+    output = []
+    for name, lines in samples.items():
+        if not lines:
+            continue
+        metric_type, help_text = METRICS.get(name, ("untyped", ""))
+        output.append(f"# HELP {name} {help_text}")
+        output.append(f"# TYPE {name} {metric_type}")
+        output.extend(lines)
+    return "\n".join(output) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency, sizes, status codes and per-request
+    SQL statement count/time, labelled by route template (never the raw path).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        # QueryInstrumentationMiddleware (outside us) normally owns the stats
+        stats = current_query_stats.get()
+        token = None
+        if stats is None:
+            stats = QueryStats()
+            token = current_query_stats.set(stats)
+        sizes = {"request": 0, "response": 0}
+        status_code = 500
+
+        async def receive_wrapper():
+            message = await receive()
+            if message["type"] == "http.request":
+                sizes["request"] += len(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                sizes["response"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            if token is not None:
+                current_query_stats.reset(token)
+            self.record(scope, status_code, time.perf_counter() - start, sizes, stats)
+
+    def record(self, scope, status_code: int, elapsed: float, sizes: dict, stats: QueryStats):
+        route = getattr(scope.get("route"), "path", None) or "unmatched"
+        labels = (("method", scope["method"]), ("route", route))
+
+        registry.inc("http_requests_total", labels + (("status", str(status_code)),))
+        registry.observe("http_request_duration_seconds", labels, elapsed, LATENCY_BUCKETS)
+        registry.observe("http_request_size_bytes", labels, sizes["request"], SIZE_BUCKETS)
+        registry.observe("http_response_size_bytes", labels, sizes["response"], SIZE_BUCKETS)
+        registry.observe("db_queries_per_request", labels, stats.count, QUERY_COUNT_BUCKETS)
+        registry.observe("db_time_per_request_seconds", labels, stats.total_time, LATENCY_BUCKETS)
+        flush_snapshot()
+
+
+def is_internal_client(host: Optional[str]) -> bool:
+    """Loopback or private network address (the /metrics route is not public)"""
+    try:
+        address = ipaddress.ip_address(host or "")
+    except ValueError:
+        return False
+    return address.is_loopback or address.is_private
+
+
+def render_metrics(engine) -> str:
+    """Full /metrics payload: merged request metrics plus this worker's live gauges"""
+    from app.core.admission import admission_stats
+
+    metrics = collect()
+    gauges: List[Tuple[str, Labels, float]] = []
+
+    worker = (("pid", str(os.getpid())),)
+    for name, value in pool_gauges(engine).items():
+        gauges.append((name, worker, value))
+
+    admission = admission_stats()
+    for lane, lane_stats in admission.get("lanes", {}).items():
+        lane_labels = worker + (("lane", lane),)
+        gauges.append(("admission_active", lane_labels, lane_stats["active"]))
+        gauges.append(("admission_queue_depth", lane_labels, lane_stats["queue_depth"]))
+        gauges.append(("admission_shed_total", lane_labels, lane_stats["shed_count"]))
+        gauges.append(("admission_timeout_total", lane_labels, lane_stats["timeout_count"]))
+
+    return render(metrics, gauges)
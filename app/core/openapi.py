@@ -0,0 +1,100 @@
+"""
+Prebuilt OpenAPI schema: `python -m app.core.openapi --output openapi.json`
+
+FastAPI builds the schema on the first /openapi.json (or /docs) request of
+every worker, walking all routes and their pydantic models. The image build
+writes it to a file instead and OPENAPI_CACHE_FILE points the app at it, so a
+fresh replica serves docs without paying for generation.
+
+The file records a fingerprint of the routes it was built from; if the app's
+routes no longer match (stale file, different code) it is ignored and the
+schema is generated as usual.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+
+from fastapi import FastAPI
+
+from app.core.config import settings
+
+# Named explicitly - this module also runs as __main__
+logger = logging.getLogger("app.core.openapi")
+
+CACHE_FORMAT = 1
+
+
+def routes_fingerprint(app: FastAPI) -> str:
+    """Hash of every route's path, methods and endpoint"""
+    digest = hashlib.sha256()
+    for route in app.routes:
+        endpoint = getattr(route, "endpoint", None)
+        digest.update(repr((
+            getattr(route, "path", ""),
+            sorted(getattr(route, "methods", None) or ()),
+            endpoint and f"{endpoint.__module__}.{endpoint.__qualname__}",
+        )).encode())
+    return digest.hexdigest()
+
+
+def write_openapi_cache(app: FastAPI, path: str) -> dict:
+    """Generate the schema and write it to `path`; returns the schema"""
+    # The class method, not a use_openapi_cache override that could return the old file
+    schema = FastAPI.openapi(app)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"format": CACHE_FORMAT, "routes": routes_fingerprint(app), "openapi": schema}, f)
+    os.replace(tmp_path, path)
+    return schema
+
+
+def load_openapi_cache(app: FastAPI, path: str):
+    """The cached schema at `path`, or None if it is missing or was built for other routes"""
+    try:
+        with open(path) as f:
+            cached = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        logger.warning("openapi_cache_unreadable", extra={"fields": {"path": path}}, exc_info=True)
+        return None
+    if cached.get("format") != CACHE_FORMAT or cached.get("routes") != routes_fingerprint(app):
+        logger.warning("openapi_cache_stale", extra={"fields": {"path": path}})
+        return None
+    return cached["openapi"]
+
+
+def use_openapi_cache(app: FastAPI, path: str = None):
+    """Serve the schema from the OPENAPI_CACHE_FILE when it matches the app"""
+    path = path or settings.OPENAPI_CACHE_FILE
+    if not path:
+        return
+    generate = app.openapi
+
+    def openapi():
+        if app.openapi_schema is None:
+            app.openapi_schema = load_openapi_cache(app, path)
+        if app.openapi_schema is None:
+            return generate()
+        return app.openapi_schema
+
+    app.openapi = openapi
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prebuild the OpenAPI schema for OPENAPI_CACHE_FILE")
+    parser.add_argument("--output", default=settings.OPENAPI_CACHE_FILE or "openapi.json")
+    args = parser.parse_args(argv)
+
+    from app.main import app
+
+    schema = write_openapi_cache(app, args.output)
+    logger.info("openapi_cache_written", extra={"fields": {"path": args.output, "paths": len(schema.get("paths", {}))}})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+On-demand sampling profiler for live requests
+A sampled fraction of matching requests (PROFILING_ENABLED) or any request an
+admin sends with the `X-Profile: 1` header is profiled by a background thread
+that snapshots every thread's stack at PROFILING_INTERVAL_MS. Only stacks
+running the matched route's endpoint or one of its dependencies are kept, so
+sync endpoints in the threadpool are covered (cProfile only sees the thread
+that enabled it). Concurrent requests to the same route can show up in each
+other's profiles.
+
+Each profile is written to PROFILING_DIR as:
+  <id>.prof       pstats-compatible (built from samples - call counts are sample counts)
+  <id>.collapsed  collapsed stacks for flamegraph.pl / speedscope
+  <id>.json       request metadata
+"""
+import inspect
+import json
+import marshal
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Set, Tuple
+
+from jose import JWTError, jwt
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import Match
+
+from app.core.config import settings
+from app.core.security import SECRET_KEY, ALGORITHM
+from app.db.session import SessionLocal
+from app.models.user import User
+from app.models.user_role import UserRole
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_PATTERN = re.compile(r"^[0-9]{8}T[0-9]{6}-[0-9a-f]{8}$")
+
+# (filename, first line, function name) - the key pstats uses
+FrameKey = Tuple[str, int, str]
+
+
+class StackSampler:
+    """Background thread counting the stacks that pass through one of `markers`"""
+
+    def __init__(self, markers: Set, interval: float):
+        self.markers = markers
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self.sample(frame)
+
+    def sample(self, frame):
+        stack = []
+        start = None
+        while frame is not None:
+            code = frame.f_code
+            stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+            if code in self.markers:
+                # Keep going - the outermost marker is where the stack starts
+                start = len(stack)
+            frame = frame.f_back
+        if start is not None:
+            self.samples[tuple(reversed(stack[:start]))] += 1
+
+
+def route_markers(route) -> Set:
+    """Code objects of the endpoint and all of its (sub-)dependencies"""
+    markers = set()
+    pending = [route.dependant]
+    while pending:
+        dependant = pending.pop()
+        call = getattr(dependant, "call", None)
+        # Decorated dependencies (e.g. traced get_current_user) share the wrapper's code
+        call = inspect.unwrap(call) if call is not None else None
+        code = getattr(call, "__code__", None) or getattr(getattr(call, "__call__", None), "__code__", None)
+        if code is not None:
+            markers.add(code)
+        pending.extend(dependant.dependencies)
+    return markers
+
+
+def to_pstats(samples: Counter, interval: float) -> Dict:
+    """
+    Build the dict pstats.Stats loads from a .prof file:
+    {func: (primitive calls, calls, own time, cumulative time, {caller: (same 4 fields)})}
+    """
+    own: Counter = Counter()
+    cumulative: Counter = Counter()
+    callers: Dict[FrameKey, Counter] = {}
+
+    for stack, count in samples.items():
+        own[stack[-1]] += count
+        for func in set(stack):
+            cumulative[func] += count
+        for caller, callee in zip(stack, stack[1:]):
+            callers.setdefault(callee, Counter())[caller] += count
+
+    stats = {}
+    for func, total in cumulative.items():
+        func_callers = {
+            caller: (count, count, 0.0, count * interval)
+            for caller, count in callers.get(func, {}).items()
+        }
+        stats[func] = (total, total, own[func] * interval, total * interval, func_callers)
+    return stats
+
+
+def to_collapsed(samples: Counter) -> str:
+    """One `frame;frame;frame count` line per distinct stack"""
+    lines = []
+    for stack, count in samples.most_common():
+        frames = ";".join(f"{name} ({os.path.basename(filename)}:{line})" for filename, line, name in stack)
+        lines.append(f"{frames} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def write_profile(profile_id: str, samples: Counter, interval: float, metadata: dict):
+    os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+    base = os.path.join(settings.PROFILING_DIR, profile_id)
+    with open(f"{base}.prof", "wb") as f:
+        marshal.dump(to_pstats(samples, interval), f)
+    with open(f"{base}.collapsed", "w") as f:
+        f.write(to_collapsed(samples))
+    # Metadata last - list_profiles only shows profiles whose .json exists
+    with open(f"{base}.json", "w") as f:
+        json.dump(metadata, f)
+    prune_profiles()
+
+
+def list_profiles() -> List[dict]:
+    """Metadata of stored profiles, newest first"""
+    if not os.path.isdir(settings.PROFILING_DIR):
+        return []
+    profiles = []
+    for filename in sorted(os.listdir(settings.PROFILING_DIR), reverse=True):
+        if filename.endswith(".json") and PROFILE_ID_PATTERN.match(filename[:-len(".json")]):
+            try:
+                with open(os.path.join(settings.PROFILING_DIR, filename)) as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    return profiles
+
+
+def prune_profiles():
+    """Keep only the newest PROFILING_MAX_PROFILES profiles"""
+    ids = sorted(
+        filename[:-len(".json")]
+        for filename in os.listdir(settings.PROFILING_DIR)
+        if filename.endswith(".json")
+    )
+    for profile_id in ids[:-settings.PROFILING_MAX_PROFILES or None]:
+        for suffix in (".json", ".prof", ".collapsed"):
+            try:
+                os.remove(os.path.join(settings.PROFILING_DIR, profile_id + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def token_subject(authorization: str):
+    """Subject of a valid `Bearer <token>` header, or None - no DB access"""
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except JWTError:
+        return None
+
+
+def load_user(email: str):
+    """The user a token names (one DB lookup), detached from its session"""
+    db = SessionLocal()
+    try:
+        return db.query(User).filter(User.email == email).first()
+    finally:
+        db.close()
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware deciding which requests to profile"""
+
+    def __init__(self, app):
+        self.app = app
+        self.active = 0
+
+    def match_route(self, scope):
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route
+        return None
+
+    def sampled(self, route) -> bool:
+        if not settings.PROFILING_ENABLED:
+            return False
+        if settings.PROFILING_ROUTES and route.path not in settings.PROFILING_ROUTES:
+            return False
+        return random.random() < settings.PROFILING_SAMPLE_RATE
+
+    def profile_subject(self, scope):
+        """
+        Token subject of an `X-Profile: 1` request, or None. Only admins can ask
+        for a profile; the token is verified here so bad or missing tokens never
+        cost a DB lookup.
+        """
+        headers = dict(scope["headers"])
+        if headers.get(PROFILE_HEADER) != b"1" or b"authorization" not in headers:
+            return None
+        return token_subject(headers[b"authorization"].decode("latin-1"))
+
+    async def requested_by_admin(self, scope, email: str) -> bool:
+        user = await run_in_threadpool(load_user, email)
+        if user is None:
+            return False
+        # get_current_user takes the principal from request.state instead of querying again
+        scope.setdefault("state", {})["principal"] = user
+        return user.role == UserRole.ADMIN
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.active >= settings.PROFILING_MAX_CONCURRENT:
+            await self.app(scope, receive, send)
+            return
+
+        # Settings and header first, so a disabled profiler never scans the routes
+        subject = self.profile_subject(scope)
+        if not (settings.PROFILING_ENABLED or subject):
+            await self.app(scope, receive, send)
+            return
+
+        route = self.match_route(scope)
+        if route is None or not hasattr(route, "dependant"):
+            await self.app(scope, receive, send)
+            return
+        if not (self.sampled(route) or (subject and await self.requested_by_admin(scope, subject))):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]}
+            await send(message)
+
+        interval = settings.PROFILING_INTERVAL_MS / 1000
+        sampler = StackSampler(route_markers(route), interval)
+        self.active += 1
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            await run_in_threadpool(sampler.stop)
+            self.active -= 1
+            metadata = {
+                "id": profile_id,
+                "method": scope["method"],
+                "route": route.path,
+                "path": scope["path"],
+                "status": status_code,
+                "duration_ms": round(duration * 1000, 2),
+                "samples": sum(sampler.samples.values()),
+                "interval_ms": settings.PROFILING_INTERVAL_MS,
+                "created_at": datetime.utcnow().isoformat(),
+            }
+            await run_in_threadpool(write_profile, profile_id, sampler.samples, interval, metadata)
@@ -1,28 +1,72 @@
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import List, Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.db.session import get_db
+from app.core.tracing import traced
 from app.models.user import User
+import multiprocessing
 import os
+import threading
 
 SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key-replace-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    """bcrypt CryptContext, built on first use - most requests only check a JWT"""
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_hash_pool_lock = threading.Lock()
+
+
+def hash_workers() -> int:
+    if settings.PASSWORD_HASH_WORKERS:
+        return settings.PASSWORD_HASH_WORKERS
+    from app.serve import available_cpus
+
+    return available_cpus()
+
+
+def get_hash_pool() -> ProcessPoolExecutor:
+    """Process pool for bcrypt, started on first use and kept for the life of the process"""
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            # spawn, not fork: forking a process with running threads can copy locks held by them
+            _hash_pool = ProcessPoolExecutor(hash_workers(), mp_context=multiprocessing.get_context("spawn"))
+        return _hash_pool
+
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """get_password_hash for many passwords, spread over a process per usable CPU"""
+    workers = hash_workers()
+    if workers == 1 or len(passwords) < 2:
+        return [get_password_hash(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (workers * 4))
+    return list(get_hash_pool().map(get_password_hash, passwords, chunksize=chunksize))
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -36,10 +80,21 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
+@traced("auth.get_current_user")
 def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> User:
+    # Batch sub-requests run as the principal already authenticated by /api/batch;
+    # an X-Profile request's user was loaded by the profiler in its own session
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        if inspect(principal).detached:
+            principal = db.merge(principal, load=False)
+        request.state.principal_id = principal.id
+        return principal
+    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -56,4 +111,6 @@ def get_current_user(
     user = db.query(User).filter(User.email == email).first()
     if user is None:
         raise credentials_exception
+    # Picked up by the access log
+    request.state.principal_id = user.id
     return user
\ No newline at end of file
@@ -0,0 +1,395 @@
+"""
+Lightweight request tracing with OpenTelemetry-compatible output
+Spans are kept in a contextvar (copied into the threadpool, so sync endpoints
+nest correctly) and exported by a background thread to TRACING_FILE. Each
+line is an OTLP/JSON ExportTraceServiceRequest, so files collected on an
+offline machine can later be replayed into any OpenTelemetry collector
+(otlpjsonfile receiver) or read directly with jq.
+
+Traced: the request (server span), dependency resolution (incl.
+get_current_user), the endpoint call, response serialization, each SQL
+statement, session commits and notification_service calls.
+Incoming W3C `traceparent` headers are honored; otherwise a fraction
+TRACING_SAMPLE_RATIO of requests is sampled. Unsampled requests cost one
+contextvar lookup per instrumented call.
+"""
+import atexit
+import functools
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+# OTLP enum values
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+MAX_STATEMENT_LENGTH = 2000
+
+
+class Span:
+    """One timed operation; becomes an OTLP span when ended"""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns",
+                 "attributes", "status", "events")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None,
+                 kind: int = SPAN_KIND_INTERNAL, attributes: Optional[dict] = None):
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes or {}
+        self.status = STATUS_UNSET
+        self.events = []
+
+    def child(self, name: str, kind: int = SPAN_KIND_INTERNAL, attributes: Optional[dict] = None) -> "Span":
+        return Span(name, self.trace_id, self.span_id, kind, attributes)
+
+    def record_exception(self, exc: BaseException):
+        self.status = STATUS_ERROR
+        self.events.append({
+            "timeUnixNano": str(time.time_ns()),
+            "name": "exception",
+            "attributes": otlp_attributes({
+                "exception.type": type(exc).__name__,
+                "exception.message": str(exc),
+            }),
+        })
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            exporter.export(self)
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": otlp_attributes(self.attributes),
+            "status": {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.events:
+            span["events"] = self.events
+        return span
+
+
+def otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_attributes(attributes: dict) -> List[dict]:
+    return [{"key": key, "value": otlp_value(value)} for key, value in attributes.items()]
+
+
+class JsonlSpanExporter:
+    """Batches ended spans on a background thread and appends them to a JSONL file"""
+
+    def __init__(self, max_queue: int = 10000, max_batch: int = 512, flush_interval: float = 1.0):
+        self.queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        if self._thread is None:
+            self._start()
+        try:
+            self.queue.put_nowait(span)
+        except queue.Full:
+            # Never block a request on tracing
+            self.dropped += 1
+
+    def force_flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything exported so far is on disk"""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self.queue.put(done)
+        return done.wait(timeout)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._thread.start()
+                atexit.register(self.force_flush)
+
+    def after_fork(self):
+        """A forked worker starts with an empty queue and no writer thread"""
+        if self._thread is not None:
+            atexit.unregister(self.force_flush)
+        self.queue = queue.Queue(maxsize=self.queue.maxsize)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _run(self):
+        while True:
+            batch: List[Span] = []
+            markers: List[threading.Event] = []
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+                while True:
+                    if isinstance(item, threading.Event):
+                        markers.append(item)
+                    else:
+                        batch.append(item)
+                    if len(batch) >= self.max_batch:
+                        break
+                    item = self.queue.get_nowait()
+            except queue.Empty:
+                pass
+
+            if batch:
+                try:
+                    self.write(batch)
+                except OSError:
+                    self.dropped += len(batch)
+            for marker in markers:
+                marker.set()
+
+    def write(self, batch: List[Span]):
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": otlp_attributes({
+                    "service.name": settings.TRACING_SERVICE_NAME,
+                    "process.pid": os.getpid(),
+                })},
+                "scopeSpans": [{
+                    "scope": {"name": "app.core.tracing"},
+                    "spans": [span.to_otlp() for span in batch],
+                }],
+            }]
+        }
+        directory = os.path.dirname(settings.TRACING_FILE)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(settings.TRACING_FILE, "a") as f:
+            f.write(json.dumps(request) + "\n")
+
+
+exporter = JsonlSpanExporter()
+os.register_at_fork(after_in_child=exporter.after_fork)
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+@contextmanager
+def start_span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes):
+    """Child of the current span; a no-op (yields None) when the request isn't sampled"""
+    parent = current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    span = parent.child(name, kind, attributes)
+    token = current_span.set(span)
+    try:
+        yield span
+    except BaseException as exc:
+        span.record_exception(exc)
+        raise
+    finally:
+        current_span.reset(token)
+        span.end()
+
+
+def traced(name: str):
+    """Decorator wrapping a sync function call in a span"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if current_span.get() is None:
+                return func(*args, **kwargs)
+            with start_span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def traced_async(name: str, func):
+    """Wrap a coroutine function in a span"""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        if current_span.get() is None:
+            return await func(*args, **kwargs)
+        with start_span(name):
+            return await func(*args, **kwargs)
+    wrapper.__traced__ = True
+    return wrapper
+
+
+# ==================== SQLALCHEMY ====================
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    parent = current_span.get()
+    span = None
+    if parent is not None:
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+        span = parent.child(f"db.{operation}", SPAN_KIND_CLIENT, {
+            "db.system": conn.dialect.name,
+            "db.statement": statement[:MAX_STATEMENT_LENGTH],
+            "db.operation": operation,
+        })
+    conn.info.setdefault("trace_spans", []).append(span)
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    span = conn.info["trace_spans"].pop()
+    if span is not None:
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            span.attributes["db.rowcount"] = cursor.rowcount
+        span.end()
+
+
+def handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("trace_spans"):
+        span = conn.info["trace_spans"].pop()
+        if span is not None:
+            span.record_exception(exception_context.original_exception)
+            span.end()
+
+
+def before_commit(session):
+    parent = current_span.get()
+    if parent is not None:
+        # Flush statements issued by the commit nest under this span
+        span = parent.child("db.session.commit")
+        session.info["trace_commit"] = (span, current_span.set(span))
+
+
+def end_commit_span(session):
+    span, token = session.info.pop("trace_commit", (None, None))
+    if span is not None:
+        current_span.reset(token)
+        span.end()
+
+
+def after_rollback(session):
+    if "trace_commit" in session.info:
+        session.info["trace_commit"][0].status = STATUS_ERROR
+    end_commit_span(session)
+
+
+def trace_engine(engine: Engine):
+    """Register statement and commit span listeners (idempotent)"""
+    if not event.contains(engine, "before_cursor_execute", before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", after_cursor_execute)
+        event.listen(engine, "handle_error", handle_error)
+    if not event.contains(Session, "before_commit", before_commit):
+        event.listen(Session, "before_commit", before_commit)
+        event.listen(Session, "after_commit", end_commit_span)
+        event.listen(Session, "after_rollback", after_rollback)
+
+
+# ==================== FASTAPI ====================
+
+def instrument_fastapi():
+    """
+    Span FastAPI's request handler stages. They have no hooks, so the module
+    functions the handler calls are wrapped (as OpenTelemetry instrumentations do).
+    """
+    import fastapi.routing
+
+    for attribute, name in [
+        ("solve_dependencies", "fastapi.dependencies"),
+        ("run_endpoint_function", "fastapi.endpoint"),
+        ("serialize_response", "fastapi.serialize_response"),
+    ]:
+        func = getattr(fastapi.routing, attribute, None)
+        if func is not None and not getattr(func, "__traced__", False):
+            setattr(fastapi.routing, attribute, traced_async(name, func))
+
+
+def parse_traceparent(value: Optional[bytes]):
+    """(trace id, parent span id, sampled) from a W3C traceparent header"""
+    if not value:
+        return None
+    match = TRACEPARENT.match(value.decode("latin-1").strip().lower())
+    if not match or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2), int(match.group(3), 16) & 1 == 1
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware starting the server span for sampled requests"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.TRACING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        incoming = parse_traceparent(dict(scope["headers"]).get(b"traceparent"))
+        if incoming is not None:
+            trace_id, parent_id, sampled = incoming
+        else:
+            trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+            sampled = random.random() < settings.TRACING_SAMPLE_RATIO
+        if not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        span = Span(f"{scope['method']} {scope['path']}", trace_id, parent_id, SPAN_KIND_SERVER, {
+            "http.request.method": scope["method"],
+            "url.path": scope["path"],
+        })
+        token = current_span.set(span)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                span.attributes["http.response.status_code"] = message["status"]
+                if message["status"] >= 500:
+                    span.status = STATUS_ERROR
+                message = {**message, "headers": [*message.get("headers", []), (b"x-trace-id", trace_id.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as exc:
+            span.record_exception(exc)
+            raise
+        finally:
+            current_span.reset(token)
+            route = getattr(scope.get("route"), "path", None)
+            if route:
+                # Low-cardinality name, as OpenTelemetry's HTTP conventions ask
+                span.name = f"{scope['method']} {route}"
+                span.attributes["http.route"] = route
+            span.end()
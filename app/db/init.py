@@ -1,4 +1,7 @@
+import logging
+
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.db.session import engine, SessionLocal
 from app.db.base_class import Base
 
@@ -8,39 +11,46 @@ from app.models.device import Device
 from app.models.work_order import WorkOrder
 from app.models.message import Message
 from app.models.notification import Notification
+from app.models.idempotency_key import IdempotencyKey
 
+# Named explicitly - this module also runs as __main__
+logger = logging.getLogger("app.db.init")
 
 
 def init_db():
     """Initialize database with tables and seed data"""
-    print("🔧 Creating database tables...")
+    logger.info("Creating database tables...")
     
     # Create all tables
     Base.metadata.create_all(bind=engine)
-    print("✅ Tables created!")
+    logger.info("Tables created")
     
     # List created tables
     from sqlalchemy import inspect
     inspector = inspect(engine)
     tables = inspector.get_table_names()
-    print(f"📊 Tables: {', '.join(tables)}")
+    logger.info("Tables: %s", ", ".join(tables))
     
-    # Seed database with test data
-    print("🌱 Seeding database...")
+    # Seed database with test data (never in production - use app.db.migrate there)
+    if settings.ENVIRONMENT == "production":
+        logger.warning("ENVIRONMENT=production: skipping seed data")
+        return
+    logger.info("Seeding database...")
     db = SessionLocal()
     try:
         # Import seed from app.db package
         from app.db.seed import seed_database
         
         seed_database(db)
-        print("✅ Database initialization complete!")
+        logger.info("Database initialization complete")
         
     except Exception as e:
-        print(f"⚠️  Seed error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Seed error: %s", e)
     finally:
         db.close()
 
 if __name__ == "__main__":
+    from app.core.logs import configure_logging
+
+    configure_logging()
     init_db()
\ No newline at end of file
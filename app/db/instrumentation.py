@@ -0,0 +1,184 @@
+"""
+Per-request SQL statement accounting
+Engine cursor events add each statement's count and time to the stats object
+of the request that issued it (tracked with a contextvar, which is copied into
+the threadpool that runs sync endpoints).
+
+Statements are grouped by fingerprint (literals and placeholder lists
+collapsed) so repeated shapes - e.g. an N+1 loop - show up as one entry.
+Slow statements and requests over the query budget are logged as structured
+records (see app.core.logs) on the "app.db.queries" logger.
+"""
+import logging
+import re
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.db.queries")
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDERS = re.compile(r"%\([^)]*\)s|%s|:\w+|\$\d+|\?")
+_PLACEHOLDER_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES_ROWS = re.compile(r"(VALUES\s*\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+", re.I)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Normalize a statement so calls differing only in values/list length match"""
+    sql = _COMMENTS.sub(" ", statement)
+    sql = _STRINGS.sub("?", sql)
+    sql = _NUMBERS.sub("?", sql)
+    sql = _PLACEHOLDERS.sub("?", sql)
+    sql = _PLACEHOLDER_LISTS.sub("(...)", sql)
+    sql = _VALUES_ROWS.sub(r"\1", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+class QueryStats:
+    """Statement count, DB time and slowest statement for one request"""
+
+    __slots__ = ("count", "total_time", "slowest_time", "slowest_statement", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement: Optional[str] = None
+        # statement -> [count, total time]; fingerprinted only when reported
+        self.statements: Dict[str, list] = {}
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.total_time += elapsed
+        if elapsed > self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+
+        entry = self.statements.get(statement)
+        if entry is None:
+            entry = self.statements[statement] = [0, 0.0]
+        entry[0] += 1
+        entry[1] += elapsed
+
+    def top_fingerprints(self, limit: int = 5) -> List[dict]:
+        """Most expensive statement shapes, merged by fingerprint"""
+        merged: Dict[str, list] = {}
+        for statement, (count, total) in self.statements.items():
+            entry = merged.setdefault(fingerprint(statement), [0, 0.0])
+            entry[0] += count
+            entry[1] += total
+        ranked = sorted(merged.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [
+            {"fingerprint": fp, "count": count, "time_ms": round(total * 1000, 2)}
+            for fp, (count, total) in ranked
+        ]
+
+    def over_budget(self) -> bool:
+        return (
+            self.count > settings.DB_REQUEST_QUERY_BUDGET
+            or self.total_time * 1000 > settings.DB_REQUEST_TIME_BUDGET_MS
+        )
+
+
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+    if elapsed * 1000 > settings.DB_SLOW_QUERY_MS:
+        # Parameters are left out on purpose - they can hold personal data
+        logger.warning("slow_query", extra={"fields": {
+            "duration_ms": round(elapsed * 1000, 2),
+            "fingerprint": fingerprint(statement),
+            "executemany": executemany,
+        }})
+
+
+def handle_error(exception_context):
+    # Failed statements never reach after_cursor_execute
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+def instrument_engine(engine: Engine):
+    """Register the cursor listeners on an engine (idempotent)"""
+    if not event.contains(engine, "before_cursor_execute", before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", after_cursor_execute)
+        event.listen(engine, "handle_error", handle_error)
+
+
+def server_timing(stats: QueryStats) -> bytes:
+    """Server-Timing header value, shown under Timing in browser devtools"""
+    return (
+        f'db;dur={stats.total_time * 1000:.1f};desc="{stats.count} queries", '
+        f'db-slowest;dur={stats.slowest_time * 1000:.1f}'
+    ).encode()
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Pure ASGI middleware that owns the request's QueryStats: adds a
+    Server-Timing header and logs a record when the request goes over the
+    query-count or DB-time budget.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.DB_SERVER_TIMING:
+                    # Statements issued while a streaming body is sent come too late to count here
+                    message = {**message, "headers": [*message.get("headers", []), (b"server-timing", server_timing(stats))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_query_stats.reset(token)
+            if stats.over_budget():
+                self.log_over_budget(scope, status_code, stats)
+
+    def log_over_budget(self, scope, status_code: int, stats: QueryStats):
+        logger.warning("db_budget_exceeded", extra={"fields": {
+            "method": scope["method"],
+            "route": getattr(scope.get("route"), "path", None) or "unmatched",
+            "path": scope["path"],
+            "status": status_code,
+            "query_count": stats.count,
+            "db_time_ms": round(stats.total_time * 1000, 2),
+            "slowest_ms": round(stats.slowest_time * 1000, 2),
+            "slowest_statement": fingerprint(stats.slowest_statement) if stats.slowest_statement else None,
+            "top_fingerprints": stats.top_fingerprints(),
+        }})
@@ -0,0 +1,95 @@
+"""
+Production schema setup: `python -m app.db.migrate`
+
+Runs `alembic upgrade head` once per deploy instead of create_all + seeding on
+every boot. Replicas starting together serialize on a PostgreSQL advisory
+lock; whoever gets it second finds the schema already at head and exits.
+
+Databases created by the old create_all boot path have tables but no
+alembic_version; they are stamped at LEGACY_REVISION first so only the newer
+migrations run. Those migrations tolerate objects that already exist, since a
+database created after a model change already has its tables and indexes.
+"""
+import logging
+import os
+import time
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
+
+# Named explicitly - this module also runs as __main__
+logger = logging.getLogger("app.db.migrate")
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "alembic.ini")
+# Arbitrary app-wide key for pg_advisory_lock
+MIGRATION_LOCK_KEY = 0x52455041  # "REPA"
+# Newest revision whose schema every create_all database has (the baseline boot path)
+LEGACY_REVISION = "add_messages_table"
+
+
+def alembic_config(connection: Connection) -> Config:
+    config = Config(ALEMBIC_INI)
+    config.attributes["connection"] = connection
+    return config
+
+
+def current_revision(connection: Connection):
+    return MigrationContext.configure(connection).get_current_revision()
+
+
+def migrate(database_url: str = None) -> dict:
+    """Upgrade the database to head under the migration lock. Returns what happened"""
+    engine = create_engine(database_url or settings.DATABASE_URL)
+    start = time.perf_counter()
+    try:
+        with engine.connect() as connection:
+            locked = connection.dialect.name == "postgresql"
+            if locked:
+                # Session-level lock: held across alembic's own transactions
+                connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+                connection.commit()
+            waited = time.perf_counter() - start
+            try:
+                config = alembic_config(connection)
+                head = ScriptDirectory.from_config(config).get_current_head()
+                before = current_revision(connection)
+
+                if before is None and inspect(connection).has_table("users"):
+                    logger.info("Stamping existing create_all schema at %s", LEGACY_REVISION)
+                    command.stamp(config, LEGACY_REVISION)
+                    connection.commit()
+                    before = LEGACY_REVISION
+
+                if before != head:
+                    logger.info("Upgrading schema %s -> %s", before, head)
+                    command.upgrade(config, "head")
+                    connection.commit()
+            finally:
+                if locked:
+                    connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+                    connection.commit()
+    finally:
+        engine.dispose()
+
+    result = {
+        "from": before,
+        "to": head,
+        "upgraded": before != head,
+        "lock_wait_s": round(waited, 3),
+        "duration_s": round(time.perf_counter() - start, 3),
+    }
+    logger.info("Schema at head", extra={"fields": result})
+    return result
+
+
+if __name__ == "__main__":
+    from app.core.logs import configure_logging
+
+    configure_logging()
+    migrate()
@@ -0,0 +1,171 @@
+"""
+Full-text search over work orders, their devices and their message threads
+
+SQLite: one FTS5 external-content table per source (work_orders_fts,
+devices_fts, messages_fts) kept in sync by triggers. Tokens are unicode61
+words; the last query word also matches as a prefix (typing "batt" finds
+"battery").
+PostgreSQL: GIN indexes on the to_tsvector('english', ...) expressions the
+search query uses, maintained by PostgreSQL itself; queries go through
+websearch_to_tsquery, so stemming and "quoted phrases" / -exclusions work.
+
+The DDL runs after Base.metadata.create_all and from the add_search_index
+migration. Each source contributes its SEARCH_MAX_HITS newest matches: walking
+a match list newest-first is cheap, while ranking every match of a common word
+across millions of messages is not. Those hits are scored, folded into work
+orders (a device hit counts for each of its work orders), ranked by their best
+hit and paginated.
+"""
+import re
+from typing import List, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
+from app.db.base_class import Base
+
+# source -> (table, searched columns, FTS5 bm25 column weights)
+SOURCES = {
+    "work_order": ("work_orders", ("title", "description", "technician_notes"), (10.0, 2.0, 1.0)),
+    "device": ("devices", ("brand", "model", "serial_number"), (1.0, 2.0, 5.0)),
+    "message": ("messages", ("message",), (1.0,)),
+}
+
+TS_CONFIG = "english"
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def _tsvector(table: str, columns) -> str:
+    document = " || ' ' || ".join(f"coalesce({table}.{column}, '')" for column in columns)
+    return f"to_tsvector('{TS_CONFIG}', {document})"
+
+
+def _sqlite_ddl(table: str, columns, weights) -> List[str]:
+    fts = f"{table}_fts"
+    names = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    delete = f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values});"
+    insert = f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{names}, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f"INSERT INTO {fts}({fts}, rank) VALUES ('rank', 'bm25({', '.join(map(str, weights))})')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {names} ON {table} BEGIN {delete} {insert} END",
+        # Backfill from the content table (and resync anything stale)
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def create_search_index(connection: Connection):
+    """Create (or resync) the search index for this connection's dialect"""
+    for table, columns, weights in SOURCES.values():
+        if connection.dialect.name == "postgresql":
+            statements = [
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_search ON {table} USING gin ({_tsvector(table, columns)})"
+            ]
+        else:
+            statements = _sqlite_ddl(table, columns, weights)
+        for statement in statements:
+            connection.exec_driver_sql(statement)
+
+
+def drop_search_index(connection: Connection):
+    for table, _, _ in SOURCES.values():
+        if connection.dialect.name == "postgresql":
+            connection.exec_driver_sql(f"DROP INDEX IF EXISTS ix_{table}_search")
+        else:
+            for suffix in ("ai", "ad", "au"):
+                connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {table}_fts_{suffix}")
+            connection.exec_driver_sql(f"DROP TABLE IF EXISTS {table}_fts")
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_after_tables(target, connection, **kw):
+    create_search_index(connection)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_before_tables(target, connection, **kw):
+    drop_search_index(connection)
+
+
+def fts5_query(q: str) -> str:
+    """User input as an FTS5 query: every word required, the last one also as a prefix"""
+    words = WORD_PATTERN.findall(q.lower())
+    if not words:
+        return ""
+    terms = [f'"{word}"' for word in words[:-1]]
+    terms.append(f'"{words[-1]}"*')
+    return " ".join(terms)
+
+
+def _sqlite_search_sql() -> str:
+    def hits(source: str) -> str:
+        table = SOURCES[source][0]
+        # rank is bm25 with the configured weights (more negative = better), only computed for returned rows
+        return (
+            f"SELECT rowid AS id, -rank AS score FROM {table}_fts "
+            f"WHERE {table}_fts MATCH :query ORDER BY rowid DESC LIMIT :hits"
+        )
+
+    return f"""
+        SELECT work_order_id, MAX(score) AS score, group_concat(DISTINCT source) AS sources FROM (
+            SELECT id AS work_order_id, score, 'work_order' AS source FROM ({hits("work_order")})
+            UNION ALL
+            SELECT w.id, h.score, 'device' FROM ({hits("device")}) h JOIN work_orders w ON w.device_id = h.id
+            UNION ALL
+            SELECT m.work_order_id, h.score, 'message' FROM ({hits("message")}) h JOIN messages m ON m.id = h.id
+        )
+        GROUP BY work_order_id
+        ORDER BY score DESC, work_order_id DESC
+        LIMIT :limit OFFSET :offset
+    """
+
+
+def _postgresql_search_sql() -> str:
+    def hits(source: str, select: str) -> str:
+        table, columns, _ = SOURCES[source]
+        vector = _tsvector(table, columns)
+        # ts_rank in the outer query so only the kept rows are scored
+        return (
+            f"SELECT {select}, ts_rank({vector}, q.query) AS score FROM ("
+            f"SELECT {table}.* FROM {table}, q WHERE {vector} @@ q.query ORDER BY {table}.id DESC LIMIT :hits"
+            f") AS {table}, q"
+        )
+
+    return f"""
+        WITH q AS (SELECT websearch_to_tsquery('{TS_CONFIG}', :query) AS query)
+        SELECT work_order_id, MAX(score) AS score, string_agg(DISTINCT source, ',') AS sources FROM (
+            SELECT h.id AS work_order_id, h.score, 'work_order' AS source
+            FROM ({hits("work_order", "work_orders.id")}) h
+            UNION ALL
+            SELECT w.id, h.score, 'device' FROM ({hits("device", "devices.id")}) h JOIN work_orders w ON w.device_id = h.id
+            UNION ALL
+            SELECT h.work_order_id, h.score, 'message' FROM ({hits("message", "messages.work_order_id")}) h
+        ) hits
+        GROUP BY work_order_id
+        ORDER BY score DESC, work_order_id DESC
+        LIMIT :limit OFFSET :offset
+    """
+
+
+SEARCH_SQL = {
+    "sqlite": _sqlite_search_sql(),
+    "postgresql": _postgresql_search_sql(),
+}
+
+
+def search_work_orders(connection: Connection, q: str, skip: int = 0, limit: int = 20) -> List[Tuple[int, float, List[str]]]:
+    """Ranked (work_order_id, score, matched sources) for one page of results"""
+    dialect = connection.dialect.name
+    query = fts5_query(q) if dialect == "sqlite" else q.strip()
+    if not query:
+        return []
+    rows = connection.execute(text(SEARCH_SQL[dialect]), {
+        "query": query, "hits": settings.SEARCH_MAX_HITS, "limit": limit, "offset": skip,
+    })
+    return [(work_order_id, score, sorted(sources.split(","))) for work_order_id, score, sources in rows]
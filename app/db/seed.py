@@ -1,23 +1,37 @@
+import argparse
+import csv
+import io
+import logging
+import random
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Iterable, List, Optional, Sequence
+
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.orm import Session
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from app.models.user import User  # Changed from UserRole
 from app.models.user_role import UserRole  # Import the enum separately
 from app.models.device import Device
-from app.models.work_order import WorkOrder
+from app.models.work_order import WorkOrder, WorkOrderStatus
 from app.models.message import Message, SenderType
+from app.models.notification import Notification, NotificationType
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = logging.getLogger("app.db.seed")
 
 def seed_database(db: Session):
     """Seed database with test data"""
     # Check if data already exists
     existing = db.query(User).first()  # Changed from UserRole
     if existing:
-        print("⚠️  Database already seeded - found existing user:", existing.email)
+        logger.info("Database already seeded - found existing user: %s", existing.email)
         return
     
-    print("📝 No existing data found, inserting seed data...")
+    logger.info("No existing data found, inserting seed data...")
     
     # Create test users with different roles
     admin = User(  # Changed from UserRole
@@ -57,7 +71,7 @@ def seed_database(db: Session):
     db.refresh(customer1)
     db.refresh(customer2)
     db.refresh(technician)
-    print(f"✅ Created users with roles")
+    logger.info("Created users with roles")
     
     # Create test devices
     device1 = Device(
@@ -107,7 +121,7 @@ def seed_database(db: Session):
     db.refresh(device3)
     db.refresh(device4)
     db.refresh(device5)
-    print(f"✅ Created {db.query(Device).count()} devices")
+    logger.info("Created %d devices", db.query(Device).count())
     
     # Create test work orders
     work_order1 = WorkOrder(
@@ -173,7 +187,7 @@ def seed_database(db: Session):
     db.refresh(work_order4)
     db.refresh(work_order5)
     db.refresh(work_order6)
-    print(f"✅ Created {db.query(WorkOrder).count()} work orders")
+    logger.info("Created %d work orders", db.query(WorkOrder).count())
     
     # Create test messages
     now = datetime.utcnow()
@@ -363,18 +377,284 @@ def seed_database(db: Session):
         message17, message18, message19
     ])
     db.commit()
-    print(f"✅ Created {db.query(Message).count()} messages")
-    
-    print("✅ Database seeded successfully!")
-    print("\n📋 Test users:")
-    print("  Admin:      admin@repairshop.com / admin123")
-    print("  Technician: tech@repairshop.com / tech123")
-    print("  User:       john@test.com / password123 (6 work orders)")  # Changed from Customer
-    print("  User:       jane@test.com / password123 (1 work order)")  # Changed from Customer
-    print("\n💬 Message threads created:")
-    print("  - Work Order 1 (Screen Replacement - In Progress): 5 messages")
-    print("  - Work Order 2 (Battery Replacement - Completed): 4 messages")
-    print("  - Work Order 3 (Water Damage - Pending): 3 messages")
-    print("  - Work Order 4 (Keyboard Not Working - Pending): 2 messages")
-    print("  - Work Order 5 (Camera Lens - Pending): 2 messages")
-    print("  - Work Order 6 (Charging Port - Pending): 3 messages")
\ No newline at end of file
+    logger.info("Created %d messages", db.query(Message).count())
+    
+    logger.info("Database seeded successfully")
+    logger.info(
+        "Test users: admin@repairshop.com / admin123, tech@repairshop.com / tech123, "
+        "john@test.com / password123 (6 work orders), jane@test.com / password123 (1 work order)"
+    )
+    logger.info("Message threads created for work orders 1-6")
+
+
+# ==================== BULK SYNTHETIC DATA ====================
+
+@dataclass(frozen=True)
+class ShopSize:
+    """Row targets for seed_bulk (messages is an average - threads vary in length)"""
+    customers: int
+    technicians: int
+    devices: int
+    work_orders: int
+    messages: int
+
+    def scaled(self, factor: float) -> "ShopSize":
+        return ShopSize(*(max(1, int(value * factor)) for value in (
+            self.customers, self.technicians, self.devices, self.work_orders, self.messages
+        )))
+
+
+SHOP_SIZES = {
+    "small": ShopSize(customers=500, technicians=5, devices=1_500, work_orders=3_000, messages=30_000),
+    "medium": ShopSize(customers=5_000, technicians=15, devices=15_000, work_orders=30_000, messages=300_000),
+    "large": ShopSize(customers=50_000, technicians=50, devices=150_000, work_orders=300_000, messages=3_000_000),
+}
+
+# Fixed so the same seed always produces identical rows
+BULK_REFERENCE_TIME = datetime(2025, 1, 1)
+BULK_PASSWORD = "password123"
+
+DEVICE_CATALOG = {
+    "Phone": [("Apple", "iPhone 13"), ("Apple", "iPhone 15 Pro"), ("Samsung", "Galaxy S23"), ("Google", "Pixel 8")],
+    "Laptop": [("Apple", "MacBook Air M2"), ("Dell", "XPS 13"), ("Lenovo", "ThinkPad X1"), ("HP", "Spectre x360")],
+    "Tablet": [("Apple", "iPad Pro"), ("Samsung", "Galaxy Tab S9"), ("Microsoft", "Surface Pro 9")],
+    "Desktop": [("Dell", "OptiPlex 7010"), ("HP", "EliteDesk 800"), ("Apple", "iMac 24")],
+    "Console": [("Sony", "PlayStation 5"), ("Nintendo", "Switch OLED")],
+}
+DEVICE_TYPE_WEIGHTS = {"Phone": 45, "Laptop": 30, "Tablet": 12, "Desktop": 8, "Console": 5}
+ISSUES = {
+    "Phone": ["Screen Replacement", "Battery Replacement", "Charging Port Repair", "Camera Lens Replacement", "Water Damage"],
+    "Laptop": ["Keyboard Replacement", "Battery Replacement", "Screen Replacement", "Data Recovery", "Fan Cleaning"],
+    "Tablet": ["Screen Replacement", "Battery Replacement", "Charging Port Repair"],
+    "Desktop": ["Power Supply Replacement", "Data Recovery", "Virus Removal", "RAM Upgrade"],
+    "Console": ["HDMI Port Repair", "Controller Drift Repair", "Overheating"],
+}
+
+# Status mix by work order age - old orders are mostly closed, recent ones still open
+STATUS_WEIGHTS_BY_AGE = [
+    (7, {WorkOrderStatus.PENDING: 35, WorkOrderStatus.DIAGNOSED: 20, WorkOrderStatus.APPROVED: 12,
+         WorkOrderStatus.IN_PROGRESS: 25, WorkOrderStatus.COMPLETED: 6, WorkOrderStatus.CANCELLED: 2}),
+    (30, {WorkOrderStatus.PENDING: 5, WorkOrderStatus.DIAGNOSED: 8, WorkOrderStatus.APPROVED: 10,
+          WorkOrderStatus.IN_PROGRESS: 22, WorkOrderStatus.COMPLETED: 30, WorkOrderStatus.DELIVERED: 20,
+          WorkOrderStatus.CANCELLED: 5}),
+    (None, {WorkOrderStatus.COMPLETED: 15, WorkOrderStatus.DELIVERED: 75, WorkOrderStatus.CANCELLED: 10}),
+]
+CLOSED_STATUSES = {WorkOrderStatus.COMPLETED, WorkOrderStatus.DELIVERED, WorkOrderStatus.CANCELLED}
+
+CUSTOMER_MESSAGES = [
+    "Hi, any update on my repair?",
+    "Is it still on track for this week?",
+    "Thanks! Please go ahead with the repair.",
+    "Can you send me a quote first?",
+    "When can I pick it up?",
+    "I also noticed the battery drains quickly, can you check that too?",
+]
+TECHNICIAN_MESSAGES = [
+    "We've received your device and started the diagnosis.",
+    "The replacement part has been ordered and should arrive in 2-3 days.",
+    "Diagnosis complete - the repair estimate is in your portal.",
+    "Your repair is finished and ready for pickup.",
+    "We ran into an extra issue, please give us a call when you can.",
+    "Quick update: testing the device now, looking good so far.",
+]
+FIRST_NAMES = ["James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda",
+               "David", "Elizabeth", "William", "Susan", "Maria", "Carlos", "Wei", "Aisha", "Noah", "Emma"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis",
+              "Rodriguez", "Martinez", "Nguyen", "Chen", "Patel", "Kim", "Okafor", "Muller"]
+
+USER_COLUMNS = ["id", "name", "email", "phone", "password_hash", "role", "created_at"]
+DEVICE_COLUMNS = ["id", "customer_id", "device_type", "brand", "model", "serial_number", "created_at"]
+WORK_ORDER_COLUMNS = ["id", "customer_id", "device_id", "title", "description", "status", "cost",
+                      "assigned_technician", "created_at", "updated_at"]
+MESSAGE_COLUMNS = ["id", "work_order_id", "sender_id", "sender_type", "message", "is_read", "created_at", "updated_at"]
+NOTIFICATION_COLUMNS = ["id", "user_id", "work_order_id", "type", "title", "message", "read", "created_at"]
+
+
+def weighted_choice(rng: random.Random, weights: dict):
+    return rng.choices(list(weights), list(weights.values()))[0]
+
+
+def status_for_age(rng: random.Random, age: timedelta) -> WorkOrderStatus:
+    for max_days, weights in STATUS_WEIGHTS_BY_AGE:
+        if max_days is None or age < timedelta(days=max_days):
+            return weighted_choice(rng, weights)
+
+
+def copy_rows(conn: Connection, table: str, columns: Sequence[str], rows: List[tuple]):
+    """Postgres COPY ... FROM STDIN (enums are stored by name, as SQLAlchemy does)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([
+            value.name if isinstance(value, Enum) else ("" if value is None else value)
+            for value in row
+        ])
+    buffer.seek(0)
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def bulk_insert(conn: Connection, table, columns: Sequence[str], rows: Iterable[tuple], chunk_size: int) -> int:
+    """Insert `rows` (tuples in `columns` order) in chunks: COPY on Postgres, Core executemany elsewhere"""
+    use_copy = conn.dialect.name == "postgresql"
+    total = 0
+    chunk = []
+
+    def flush():
+        if use_copy:
+            copy_rows(conn, table.name, columns, chunk)
+        else:
+            conn.execute(table.insert(), [dict(zip(columns, row)) for row in chunk])
+
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            flush()
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        flush()
+        total += len(chunk)
+
+    if conn.dialect.name == "postgresql" and total:
+        # Ids were assigned here, so move the serial sequence past them
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), (SELECT MAX(id) FROM {table.name}))"
+        ))
+    return total
+
+
+def seed_bulk(
+    engine: Engine,
+    size: ShopSize,
+    seed: int = 42,
+    now: datetime = BULK_REFERENCE_TIME,
+    password_hash: Optional[str] = None,
+    chunk_size: int = 5000,
+) -> dict:
+    """
+    Fill an empty database with a synthetic shop of `size`.
+    Deterministic for a given seed and `now`; ids are assigned here so no
+    rows need to be read back. Every user's password is BULK_PASSWORD, hashed once.
+    Returns the number of rows inserted per table.
+    """
+    rng = random.Random(seed)
+    password_hash = password_hash or pwd_context.hash(BULK_PASSWORD)
+    counts = {}
+
+    with engine.begin() as conn:
+        if conn.execute(select(func.count()).select_from(User.__table__)).scalar():
+            raise ValueError("seed_bulk needs an empty database - found existing users")
+
+        def timed_insert(name, table, columns, rows):
+            start = time.perf_counter()
+            counts[name] = bulk_insert(conn, table, columns, rows, chunk_size)
+            elapsed = time.perf_counter() - start
+            logger.info("Inserted %d %s in %.1fs (%.0f rows/s)", counts[name], name.replace("_", " "), elapsed, counts[name] / max(elapsed, 1e-9))
+
+        # Users: admin, technicians, then customers (ids 1..n in that order)
+        technician_ids = list(range(2, 2 + size.technicians))
+        first_customer = 2 + size.technicians
+        customer_ids = range(first_customer, first_customer + size.customers)
+
+        def user_rows():
+            yield (1, "Admin User", "admin@repairshop.com", "555-0001", password_hash, UserRole.ADMIN, now - timedelta(days=1000))
+            for user_id in technician_ids:
+                yield (user_id, f"Technician {user_id - 1}", f"tech{user_id - 1}@repairshop.com",
+                       f"555-1{user_id:04d}", password_hash, UserRole.TECHNICIAN, now - timedelta(days=rng.randint(30, 1000)))
+            for user_id in customer_ids:
+                first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                yield (user_id, f"{first} {last}", f"{first.lower()}.{last.lower()}.{user_id}@example.com",
+                       f"555-{rng.randint(0, 9999999):07d}", password_hash, UserRole.USER,
+                       now - timedelta(days=rng.randint(0, 1000), seconds=rng.randint(0, 86399)))
+        timed_insert("users", User.__table__, USER_COLUMNS, user_rows())
+
+        # Devices: most customers own one or two, a few own many
+        device_owners = [rng.choice(customer_ids) for _ in range(size.devices)]
+        device_types = [weighted_choice(rng, DEVICE_TYPE_WEIGHTS) for _ in range(size.devices)]
+
+        def device_rows():
+            for index, (customer_id, device_type) in enumerate(zip(device_owners, device_types)):
+                brand, model = rng.choice(DEVICE_CATALOG[device_type])
+                yield (index + 1, customer_id, device_type, brand, model, f"SN{seed:04d}{index + 1:010d}",
+                       now - timedelta(days=rng.randint(0, 900)))
+        timed_insert("devices", Device.__table__, DEVICE_COLUMNS, device_rows())
+
+        # Work orders skew recent; status follows age. Kept in memory (small) for threads
+        work_orders = []
+
+        def work_order_rows():
+            for work_order_id in range(1, size.work_orders + 1):
+                device_index = rng.randrange(size.devices)
+                age = timedelta(days=min(rng.expovariate(1 / 120), 730), seconds=rng.randint(0, 86399))
+                created_at = now - age
+                status = status_for_age(rng, age)
+                updated_at = min(created_at + timedelta(hours=rng.expovariate(1 / 48)), now)
+                technician_id = rng.choice(technician_ids)
+                work_orders.append((work_order_id, device_owners[device_index], technician_id, status, created_at, updated_at))
+                yield (work_order_id, device_owners[device_index], device_index + 1,
+                       rng.choice(ISSUES[device_types[device_index]]), "Customer reported issue at drop-off",
+                       status, round(rng.lognormvariate(4.5, 0.6), 2) if status != WorkOrderStatus.PENDING else None,
+                       f"Technician {technician_id - 1}", created_at, updated_at)
+        timed_insert("work_orders", WorkOrder.__table__, WORK_ORDER_COLUMNS, work_order_rows())
+
+        # Message threads: geometric-ish lengths, mostly alternating senders, recent ones unread
+        mean_thread = size.messages / size.work_orders
+
+        def message_rows():
+            message_id = 0
+            for work_order_id, customer_id, technician_id, status, created_at, updated_at in work_orders:
+                sent_at = created_at
+                from_customer = True
+                for _ in range(int(rng.expovariate(1 / mean_thread) + 0.5)):
+                    sent_at = min(sent_at + timedelta(minutes=rng.expovariate(1 / 600)), now)
+                    age = now - sent_at
+                    if from_customer:
+                        row = (customer_id, SenderType.CUSTOMER, rng.choice(CUSTOMER_MESSAGES), age > timedelta(hours=4))
+                    else:
+                        read = age > timedelta(days=2) or rng.random() < 0.3
+                        row = (technician_id, SenderType.TECHNICIAN, rng.choice(TECHNICIAN_MESSAGES), read)
+                    message_id += 1
+                    yield (message_id, work_order_id, row[0], row[1], row[2], int(row[3]), sent_at, sent_at)
+                    from_customer = not from_customer if rng.random() < 0.8 else from_customer
+        timed_insert("messages", Message.__table__, MESSAGE_COLUMNS, message_rows())
+
+        # One status-change notification for every order that has moved past pending
+        def notification_rows():
+            notification_id = 0
+            for work_order_id, customer_id, _, status, created_at, updated_at in work_orders:
+                if status == WorkOrderStatus.PENDING:
+                    continue
+                notification_id += 1
+                yield (notification_id, customer_id, work_order_id, NotificationType.STATUS_CHANGE,
+                       "Repair Status Updated", f"Work order #{work_order_id} is now {status.value.replace('_', ' ')}",
+                       status in CLOSED_STATUSES or now - updated_at > timedelta(days=3), updated_at)
+        timed_insert("notifications", Notification.__table__, NOTIFICATION_COLUMNS, notification_rows())
+
+    return counts
+
+
+if __name__ == "__main__":
+    from app.core.logs import configure_logging
+    from app.db.session import SessionLocal, engine
+
+    parser = argparse.ArgumentParser(description="Seed the database (small demo data, or a bulk synthetic shop)")
+    parser.add_argument("--bulk", choices=sorted(SHOP_SIZES), help="Generate a synthetic shop of this size")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply the --bulk size")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    configure_logging()
+    if args.bulk:
+        size = SHOP_SIZES[args.bulk].scaled(args.scale)
+        logger.info("Generating %s shop: %s", args.bulk, size)
+        seed_bulk(engine, size, seed=args.seed)
+    else:
+        db = SessionLocal()
+        try:
+            seed_database(db)
+        finally:
+            db.close()
@@ -1,11 +1,22 @@
+from fastapi import Request
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.tracing import trace_engine
+from app.db.instrumentation import instrument_engine
 
 engine = create_engine(settings.DATABASE_URL)
+instrument_engine(engine)
+trace_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-def get_db():
+def get_db(request: Request):
+    # Batch sub-requests reuse the session owned by the outer /api/batch request
+    shared = getattr(request.state, "db", None)
+    if shared is not None:
+        yield shared
+        return
+
     db = SessionLocal()
     try:
         yield db
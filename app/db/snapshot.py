@@ -0,0 +1,278 @@
+"""
+Columnar snapshots for analytics: `python -m app.db.snapshot --output-dir DIR`
+
+Dumps users, devices, work_orders, messages and notifications to Parquet (or
+Arrow IPC) files for offline analysis. Rows are read through a server-side
+cursor and written SNAPSHOT_BATCH_ROWS at a time (one Parquet row group /
+IPC record batch per batch), so memory is bounded by a batch, not a table.
+Point SNAPSHOT_DATABASE_URL at a read replica to keep the load off the
+primary.
+
+Layout of DIR:
+  <table>/<table>-<run>.parquet   one file per table per run (skipped when empty)
+  _state.json                     per-table watermarks for the next incremental run
+  _manifest.jsonl                 one line per run: mode, files, row counts
+
+Incremental runs export rows whose watermark column (updated_at; created_at
+for notifications) is at or after the previous run's cut-off minus
+SNAPSHOT_OVERLAP_SECONDS, so rows committed late by long transactions are not
+lost. A row can therefore appear in two consecutive runs; keep the copy with
+the latest updated_at. Notifications have no updated_at, so a later read
+change only shows up in a --full run. users and devices have no updated_at
+either and are written in full on every run. Password hashes are never
+exported.
+
+Requires pyarrow.
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import Boolean, DateTime, Enum, Float, Integer, create_engine, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.device import Device
+from app.models.message import Message
+from app.models.notification import Notification
+from app.models.user import User
+from app.models.work_order import WorkOrder
+from app.services.exports import export_value, stream_batches
+
+# Named explicitly - this module also runs as __main__
+logger = logging.getLogger("app.db.snapshot")
+
+# table -> (model, watermark column or None for a full dump, columns left out)
+SNAPSHOT_TABLES = {
+    "users": (User, None, {"password_hash"}),
+    "devices": (Device, None, set()),
+    "work_orders": (WorkOrder, "updated_at", set()),
+    "messages": (Message, "updated_at", set()),
+    "notifications": (Notification, "created_at", set()),
+}
+# format -> file suffix
+SNAPSHOT_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+STATE_FILE = "_state.json"
+MANIFEST_FILE = "_manifest.jsonl"
+
+# One snapshot at a time per process (CLI or admin endpoint)
+snapshot_lock = threading.Lock()
+
+
+def arrow_type(column):
+    import pyarrow as pa
+
+    if isinstance(column.type, Enum):
+        return pa.string()
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    return pa.string()
+
+
+def table_columns(table: str) -> list:
+    model, _, excluded = SNAPSHOT_TABLES[table]
+    return [column for column in model.__table__.columns if column.name not in excluded]
+
+
+def arrow_schema(table: str):
+    import pyarrow as pa
+
+    return pa.schema([pa.field(column.name, arrow_type(column), nullable=column.nullable) for column in table_columns(table)])
+
+
+def record_batch(schema, rows: List[tuple]):
+    """Rows (tuples in schema order) as one Arrow record batch"""
+    import pyarrow as pa
+
+    arrays = []
+    for index, field in enumerate(schema):
+        values = [row[index] for row in rows]
+        if pa.types.is_string(field.type):
+            values = [export_value(value) for value in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class _Writer:
+    """Parquet or Arrow IPC file writer with the same write/close interface"""
+
+    def __init__(self, path: str, schema, file_format: str):
+        if file_format == "parquet":
+            import pyarrow.parquet as pq
+
+            self.writer = pq.ParquetWriter(path, schema, compression="zstd")
+            self.write = self.writer.write_batch
+        else:
+            import pyarrow.ipc as ipc
+
+            self.writer = ipc.new_file(path, schema)
+            self.write = self.writer.write_batch
+
+    def close(self):
+        self.writer.close()
+
+
+def write_table(db: Session, table: str, path: str, file_format: str, since: Optional[datetime], until: datetime) -> int:
+    """Write the table's rows (in the watermark window, if any) to `path`; returns the row count"""
+    model, watermark, _ = SNAPSHOT_TABLES[table]
+    columns = table_columns(table)
+    schema = arrow_schema(table)
+
+    statement = select(*columns).order_by(model.__table__.c.id)
+    if watermark:
+        column = model.__table__.c[watermark]
+        statement = statement.where(column < until)
+        if since is not None:
+            statement = statement.where(column >= since)
+
+    tmp_path = f"{path}.tmp"
+    writer = None
+    rows = 0
+    try:
+        for batch in stream_batches(db, statement, settings.SNAPSHOT_BATCH_ROWS):
+            if writer is None:
+                writer = _Writer(tmp_path, schema, file_format)
+            writer.write(record_batch(schema, batch))
+            rows += len(batch)
+        if writer is not None:
+            writer.close()
+            os.replace(tmp_path, path)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+            os.remove(tmp_path)
+        raise
+    return rows
+
+
+def read_state(output_dir: str) -> Dict[str, dict]:
+    try:
+        with open(os.path.join(output_dir, STATE_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _write_json(path: str, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def write_snapshot(
+    db: Session,
+    output_dir: str,
+    file_format: str = "parquet",
+    tables: Optional[List[str]] = None,
+    full: bool = False,
+    now: Optional[datetime] = None,
+) -> dict:
+    """Export the tables once through `db`; returns the run's manifest entry"""
+    if file_format not in SNAPSHOT_FORMATS:
+        raise ValueError(f"Unknown snapshot format {file_format!r}")
+    tables = tables or list(SNAPSHOT_TABLES)
+    unknown = set(tables) - set(SNAPSHOT_TABLES)
+    if unknown:
+        raise ValueError(f"Unknown snapshot tables: {', '.join(sorted(unknown))}")
+
+    start = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    # Watermarks of tables not in this run are kept as they are
+    state = read_state(output_dir)
+    # Models stamp rows with datetime.utcnow(); the cut-off uses the same clock
+    until = now or datetime.utcnow()
+    run_id = until.strftime("%Y%m%dT%H%M%S")
+    overlap = timedelta(seconds=settings.SNAPSHOT_OVERLAP_SECONDS)
+    files = {}
+
+    for table in tables:
+        _, watermark, _ = SNAPSHOT_TABLES[table]
+        previous = state.get(table, {}).get("until")
+        since = datetime.fromisoformat(previous) - overlap if watermark and previous and not full else None
+
+        os.makedirs(os.path.join(output_dir, table), exist_ok=True)
+        name = f"{table}-{run_id}{SNAPSHOT_FORMATS[file_format]}"
+        rows = write_table(db, table, os.path.join(output_dir, table, name), file_format, since, until)
+        files[table] = {
+            "file": f"{table}/{name}" if rows else None,
+            "rows": rows,
+            "mode": "incremental" if since else "full",
+            "since": since.isoformat() if since else None,
+        }
+        if watermark:
+            state[table] = {"column": watermark, "until": until.isoformat()}
+        logger.info("snapshot_table_written", extra={"fields": {"table": table, **files[table]}})
+
+    entry = {
+        "run": run_id,
+        "format": file_format,
+        "until": until.isoformat(),
+        "tables": files,
+        "duration_s": round(time.perf_counter() - start, 3),
+    }
+    # State last: a failed run is simply redone from the old watermarks
+    with open(os.path.join(output_dir, MANIFEST_FILE), "a") as f:
+        f.write(json.dumps(entry) + "\n")
+    _write_json(os.path.join(output_dir, STATE_FILE), state)
+    return entry
+
+
+def snapshot(
+    output_dir: str,
+    file_format: str = "parquet",
+    tables: Optional[List[str]] = None,
+    full: bool = False,
+    database_url: Optional[str] = None,
+) -> dict:
+    """write_snapshot on its own connection (SNAPSHOT_DATABASE_URL, else DATABASE_URL), one run at a time"""
+    if not snapshot_lock.acquire(blocking=False):
+        raise RuntimeError("A snapshot is already running")
+    engine = create_engine(database_url or settings.SNAPSHOT_DATABASE_URL or settings.DATABASE_URL)
+    try:
+        with Session(engine) as db:
+            return write_snapshot(db, output_dir, file_format, tables, full)
+    finally:
+        engine.dispose()
+        snapshot_lock.release()
+
+
+def list_runs(output_dir: str) -> List[dict]:
+    """Manifest entries, newest first"""
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILE)) as f:
+            runs = [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+    return runs[::-1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write Parquet / Arrow snapshots of the database for analytics")
+    parser.add_argument("--output-dir", default=settings.SNAPSHOT_DIR)
+    parser.add_argument("--format", choices=sorted(SNAPSHOT_FORMATS), default="parquet")
+    parser.add_argument("--tables", nargs="+", choices=list(SNAPSHOT_TABLES), default=None)
+    parser.add_argument("--full", action="store_true", help="Ignore watermarks and export everything")
+    parser.add_argument("--database-url", default=None, help="Defaults to SNAPSHOT_DATABASE_URL, then DATABASE_URL")
+    args = parser.parse_args(argv)
+
+    entry = snapshot(args.output_dir, args.format, args.tables, args.full, args.database_url)
+    print(json.dumps(entry, indent=2))
+
+
+if __name__ == "__main__":
+    from app.core.logs import configure_logging
+
+    configure_logging()
+    main()
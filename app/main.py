@@ -1,19 +1,54 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.core.logs import AccessLogMiddleware, configure_logging
+from app.core.admission import AdmissionControlMiddleware, admission_stats
+from app.core.profiling import ProfilingMiddleware
+from app.core.tracing import TracingMiddleware, instrument_fastapi
+from app.core.metrics import MetricsMiddleware, is_internal_client, render_metrics
+from app.core.openapi import use_openapi_cache
+from app.db.instrumentation import QueryInstrumentationMiddleware
+from app.db.session import engine
+from app.services.typeahead import start_typeahead_refresh
 
 # Import routers
-from app.api import auth
+from app.api import auth, batch
 from app.api.customers import router as customers_router
-# from app.api.admin import router as admin_router
+from app.api.admin import router as admin_router
 from app.api.customers.messages import router as messages_router 
 from app.api.customers.notifications import router as notifications_router
 
+configure_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs in each worker (after fork), so every worker gets its own refresh thread
+    if settings.TYPEAHEAD_PRELOAD:
+        start_typeahead_refresh()
+    yield
+
+
 app = FastAPI(
     title="Repair Shop API",
     description="API for managing device repairs with customer and admin portals",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Middleware added last runs first. Request order, outermost to innermost:
+# Tracing -> QueryInstrumentation -> AccessLog -> Metrics -> CORS -> AdmissionControl -> Profiling
+
+# Innermost so queueing time in admission control isn't profiled
+app.add_middleware(ProfilingMiddleware)
+
+# Shed load before it reaches the DB pool (added first so CORS headers still wrap 503s)
+app.add_middleware(AdmissionControlMiddleware)
+
 # CORS Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -28,6 +63,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outside CORS and admission control so latency includes shed requests and CORS handling
+app.add_middleware(MetricsMiddleware)
+
+# Inside QueryInstrumentationMiddleware so DB time is available to the log
+app.add_middleware(AccessLogMiddleware)
+
+# Owns each request's SQL statement stats (read by MetricsMiddleware)
+app.add_middleware(QueryInstrumentationMiddleware)
+
+# Root span covers the whole middleware stack
+app.add_middleware(TracingMiddleware)
+instrument_fastapi()
+
 # Import all models so SQLAlchemy registers them
 from app.models import device, user, work_order, notification, message  # ADD THIS LINE
 
@@ -35,8 +83,9 @@ from app.models import device, user, work_order, notification, message  # ADD TH
 # Register routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(customers_router, prefix="/api/customers", tags=["Customers"])
-# app.include_router(admin_router, prefix="/api/admin", tags=["Admin"])
+app.include_router(admin_router, prefix="/api/admin", tags=["Admin"])
 app.include_router(messages_router, prefix="/api/customers", tags=["Messages"])
+app.include_router(batch.router, prefix="/api/batch", tags=["Batch"])
 
 
 # Health check endpoint
@@ -47,6 +96,18 @@ def health_check():
         "message": "Repair Shop API is running"
     }
 
+# Load / admission control stats for this worker
+@app.get("/api/health/load")
+def load_status():
+    return admission_stats()
+
+# Prometheus metrics (internal only - async so it reads the registry on the event loop)
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    if settings.METRICS_PRIVATE_ONLY and not is_internal_client(request.client and request.client.host):
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(render_metrics(engine), media_type="text/plain; version=0.0.4")
+
 # Root endpoint
 @app.get("/")
 def root():
@@ -54,4 +115,7 @@ def root():
         "message": "Repair Shop API",
         "docs": "/docs",
         "health": "/api/health"
-    }
\ No newline at end of file
+    }
+
+# Serve /openapi.json from OPENAPI_CACHE_FILE when set - after all routes, which it fingerprints
+use_openapi_cache(app)
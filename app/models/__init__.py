@@ -3,4 +3,8 @@ from app.models.user import User
 from app.models.device import Device
 from app.models.work_order import WorkOrder
 from app.models.message import Message
-from app.models.notification import Notification
\ No newline at end of file
+from app.models.notification import Notification
+from app.models.idempotency_key import IdempotencyKey
+
+# Adds the full-text search index to create_all / drop_all
+from app.db import search
@@ -7,7 +7,7 @@ class Device(Base):
     __tablename__ = "devices"
     
     id = Column(Integer, primary_key=True, index=True)
-    customer_id = Column(Integer, ForeignKey("users.id"))
+    customer_id = Column(Integer, ForeignKey("users.id"), index=True)
     device_type = Column(String)  # "Laptop", "Desktop", etc.
     brand = Column(String)
     model = Column(String)
@@ -0,0 +1,25 @@
+"""
+Stored responses for Idempotency-Key replay (database backend)
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, UniqueConstraint
+from datetime import datetime
+
+from app.db.base_class import Base
+
+
+class IdempotencyKey(Base):
+    """First response for a (user, Idempotency-Key) pair. status_code is NULL while in flight"""
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("user_key", "key", name="uq_idempotency_keys_user_key_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_key = Column(String, nullable=False)  # JWT subject (email)
+    key = Column(String, nullable=False)
+    request_hash = Column(String, nullable=False)
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    media_type = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -14,8 +14,8 @@ class Notification(Base):
     __tablename__ = "notifications"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False) 
-    work_order_id = Column(Integer, ForeignKey("work_orders.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    work_order_id = Column(Integer, ForeignKey("work_orders.id"), nullable=False, index=True)
     type = Column(SQLEnum(NotificationType), nullable=False)
     title = Column(String, nullable=False)
     message = Column(String, nullable=False)
@@ -21,6 +21,6 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
-    devices = relationship("Device", back_populates="owner")
+    devices = relationship("Device", back_populates="customer")
     work_orders = relationship("WorkOrder", back_populates="customer")
     notifications = relationship("Notification", back_populates="user")
\ No newline at end of file
@@ -17,16 +17,17 @@ class WorkOrder(Base):
     __tablename__ = "work_orders"
     
     id = Column(Integer, primary_key=True, index=True)
-    customer_id = Column(Integer, ForeignKey("users.id"), nullable=False)  
-    device_id = Column(Integer, ForeignKey("devices.id"), nullable=False)
+    customer_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    device_id = Column(Integer, ForeignKey("devices.id"), nullable=False, index=True)
     title = Column(String, nullable=False)
     description = Column(String)
-    status = Column(SQLEnum(WorkOrderStatus), default=WorkOrderStatus.PENDING)
+    status = Column(SQLEnum(WorkOrderStatus), default=WorkOrderStatus.PENDING, index=True)
     cost = Column(Float, nullable=True)
     technician_notes = Column(String, nullable=True)
     assigned_technician = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)  # set by the state machine on completion
     
    # Relationships
     customer = relationship("Customer", back_populates="work_orders")  
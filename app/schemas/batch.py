@@ -0,0 +1,30 @@
+"""
+Pydantic schemas for the batch request endpoint
+"""
+from pydantic import BaseModel, Field
+from typing import Any, List, Literal, Optional
+
+
+class BatchItem(BaseModel):
+    """A single sub-request to run against the API"""
+    id: Optional[str] = Field(None, description="Client supplied id echoed back in the result")
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"]
+    path: str = Field(..., description="API path including query string, e.g. /api/customers/devices/")
+    body: Optional[Any] = None
+
+
+class BatchRequest(BaseModel):
+    """List of sub-requests, run in order (consecutive GETs run concurrently)"""
+    items: List[BatchItem]
+
+
+class BatchItemResult(BaseModel):
+    """Result of one sub-request"""
+    id: Optional[str] = None
+    status: int
+    body: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    """Results in the same order as the request items"""
+    results: List[BatchItemResult]
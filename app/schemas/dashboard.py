@@ -0,0 +1,24 @@
+"""
+Pydantic schemas for the customer portal dashboard
+"""
+from pydantic import BaseModel
+from typing import List
+
+from app.schemas.device import DeviceResponse
+from app.schemas.work_order import WorkOrderResponse
+from app.schemas.message import MessageResponse
+
+
+class DashboardCounts(BaseModel):
+    """Badge counts shown in the portal header"""
+    unread_messages: int
+    unread_notifications: int
+    active_work_orders: int
+
+
+class DashboardResponse(BaseModel):
+    """Everything the customer portal needs for its first paint"""
+    counts: DashboardCounts
+    work_orders: List[WorkOrderResponse]
+    devices: List[DeviceResponse]
+    recent_messages: List[MessageResponse]
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
 from datetime import datetime
 
@@ -23,7 +23,7 @@ class DeviceUpdate(BaseModel):
 
 class DeviceResponse(DeviceBase):
     id: int
-    owner_id: int  
+    owner_id: int = Field(validation_alias="customer_id")  # Device.customer_id
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
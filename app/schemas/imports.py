@@ -0,0 +1,19 @@
+"""
+Pydantic schemas for bulk import reports
+"""
+from pydantic import BaseModel
+from typing import List
+
+
+class ImportRowError(BaseModel):
+    """Why one row was skipped; rows count from 1, not counting a CSV header"""
+    row: int
+    error: str
+
+
+class ImportResult(BaseModel):
+    """Outcome of one upload; errors lists at most IMPORT_MAX_ERRORS rows, failed counts them all"""
+    rows: int
+    created: int
+    failed: int
+    errors: List[ImportRowError]
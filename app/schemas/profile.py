@@ -0,0 +1,17 @@
+"""
+Pydantic schemas for stored request profiles
+"""
+from pydantic import BaseModel
+
+
+class ProfileResponse(BaseModel):
+    """Metadata of one profiled request"""
+    id: str
+    method: str
+    route: str
+    path: str
+    status: int
+    duration_ms: float
+    samples: int
+    interval_ms: float
+    created_at: str
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from app.models.work_order import WorkOrderStatus
+
+
+class SearchResult(BaseModel):
+    """A work order matching a search, with where it matched"""
+    work_order_id: int
+    title: str
+    status: WorkOrderStatus
+    assigned_technician: Optional[str] = None
+    device_id: int
+    device_brand: Optional[str] = None
+    device_model: Optional[str] = None
+    serial_number: Optional[str] = None
+    score: float
+    # Any of "work_order", "device", "message"
+    matched_in: List[str]
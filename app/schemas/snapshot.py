@@ -0,0 +1,28 @@
+"""
+Pydantic schemas for analytics snapshot runs
+"""
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+
+
+class SnapshotRequest(BaseModel):
+    """Options for one snapshot run; defaults export every table incrementally"""
+    format: str = "parquet"
+    tables: Optional[List[str]] = None
+    full: bool = False
+
+
+class SnapshotTable(BaseModel):
+    file: Optional[str] = None
+    rows: int
+    mode: str
+    since: Optional[str] = None
+
+
+class SnapshotRun(BaseModel):
+    """One line of the snapshot manifest"""
+    run: str
+    format: str
+    until: str
+    tables: Dict[str, SnapshotTable]
+    duration_s: float
@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from app.models.user_role import UserRole
+
+
+class UserSuggestion(BaseModel):
+    id: int
+    name: str
+    email: str
+    phone: Optional[str] = None
+    role: Optional[UserRole] = None
+
+
+class DeviceSuggestion(BaseModel):
+    id: int
+    customer_id: Optional[int] = None
+    device_type: Optional[str] = None
+    brand: Optional[str] = None
+    model: Optional[str] = None
+    serial_number: Optional[str] = None
+
+
+class TypeaheadResponse(BaseModel):
+    users: List[UserSuggestion] = []
+    devices: List[DeviceSuggestion] = []
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import List, Literal, Optional
 from app.models.work_order import WorkOrderStatus
 
 class WorkOrderBase(BaseModel):
@@ -25,6 +25,22 @@ class WorkOrderResponse(WorkOrderBase):
     device_id: int
     created_at: datetime
     updated_at: datetime
+    completed_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
+
+class WorkOrderBulkStatusUpdate(BaseModel):
+    ids: List[int]
+    status: WorkOrderStatus
+    technician_notes: Optional[str] = None
+
+class WorkOrderStatusResult(BaseModel):
+    id: int
+    result: Literal["updated", "unchanged", "invalid_transition", "conflict", "not_found"]
+    previous_status: Optional[WorkOrderStatus] = None
+
+class WorkOrderBulkStatusResponse(BaseModel):
+    status: WorkOrderStatus
+    updated: int
+    results: List[WorkOrderStatusResult]
@@ -0,0 +1,178 @@
+"""
+Production server runner: `python -m app.serve`
+
+Imports the app once, binds the listening socket, then forks the workers so
+they share the imported code copy-on-write (uvicorn --workers spawns fresh
+interpreters that each import everything again). Each worker is a
+uvicorn.Server on uvloop + httptools with backlog, keep-alive and connection
+limits from Settings.
+
+SIGTERM/SIGINT drain: workers stop accepting, finish in-flight requests for
+up to SERVER_GRACEFUL_TIMEOUT_SECONDS, then exit; stragglers are killed.
+Workers that die unexpectedly are replaced.
+"""
+import logging
+import math
+import os
+import signal
+import sys
+import time
+
+import uvicorn
+
+from app.core.config import settings
+
+# Named explicitly - this module runs as __main__
+logger = logging.getLogger("app.serve")
+
+RESPAWN_BACKOFF_SECONDS = 1.0
+
+
+def available_cpus() -> int:
+    """CPUs this process may use: affinity mask, capped by a cgroup v2 quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def available_memory_mb() -> int:
+    """Memory limit of the container (cgroup v2), else physical memory"""
+    try:
+        with open("/sys/fs/cgroup/memory.max") as f:
+            limit = f.read().strip()
+        if limit != "max":
+            return int(limit) // (1024 * 1024)
+    except (OSError, ValueError):
+        pass
+    return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024 * 1024)
+
+
+def worker_count() -> int:
+    """SERVER_WORKERS, or one async worker per usable CPU as far as memory allows"""
+    if settings.SERVER_WORKERS > 0:
+        return settings.SERVER_WORKERS
+    by_memory = available_memory_mb() // settings.SERVER_WORKER_MEMORY_MB
+    return max(1, min(available_cpus(), by_memory))
+
+
+def build_config(app) -> uvicorn.Config:
+    return uvicorn.Config(
+        app,
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        loop="uvloop",
+        http="httptools",
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEPALIVE_SECONDS,
+        limit_concurrency=settings.SERVER_LIMIT_CONCURRENCY,
+        limit_max_requests=settings.SERVER_LIMIT_MAX_REQUESTS,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        # app.core.logs writes the access log
+        access_log=False,
+        proxy_headers=True,
+    )
+
+
+def run_worker(config: uvicorn.Config, sock):
+    """Body of a forked worker; never returns"""
+    from app.db.session import engine
+
+    # Pooled connections (if any) belong to the parent; open our own
+    engine.dispose(close=False)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    try:
+        uvicorn.Server(config).run(sockets=[sock])
+    except BaseException:
+        logger.exception("worker_crashed")
+        os._exit(1)
+    os._exit(0)
+
+
+class Supervisor:
+    """Forks the workers and keeps that many running until told to stop"""
+
+    def __init__(self, config: uvicorn.Config, sock, workers: int):
+        self.config = config
+        self.sock = sock
+        self.workers = workers
+        self.children = set()
+        self.stopping = False
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            run_worker(self.config, self.sock)
+        self.children.add(pid)
+
+    def stop(self, signum, frame):
+        if not self.stopping:
+            logger.info("draining", extra={"fields": {"signal": signal.Signals(signum).name, "workers": len(self.children)}})
+        self.stopping = True
+        for pid in self.children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for _ in range(self.workers):
+            self.spawn()
+        logger.info("server_started", extra={"fields": {
+            "workers": self.workers, "host": self.config.host, "port": self.config.port,
+        }})
+
+        deadline = None
+        while self.children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                if self.stopping:
+                    deadline = deadline or time.monotonic() + settings.SERVER_GRACEFUL_TIMEOUT_SECONDS + 5
+                    if time.monotonic() > deadline:
+                        for child in self.children:
+                            os.kill(child, signal.SIGKILL)
+                time.sleep(0.1)
+                continue
+
+            self.children.discard(pid)
+            if not self.stopping:
+                logger.warning("worker_exited", extra={"fields": {"pid": pid, "status": os.waitstatus_to_exitcode(status)}})
+                time.sleep(RESPAWN_BACKOFF_SECONDS)
+                self.spawn()
+
+        logger.info("server_stopped")
+        return 0
+
+
+def main() -> int:
+    # Pre-import: everything the workers need is loaded once, before fork
+    from app.main import app
+
+    if settings.OPENAPI_CACHE_FILE:
+        # Load the prebuilt schema once, before fork, instead of in every worker
+        app.openapi()
+
+    config = build_config(app)
+    workers = worker_count()
+    if workers == 1:
+        uvicorn.Server(config).run()
+        return 0
+
+    config.load()
+    sock = config.bind_socket()
+    return Supervisor(config, sock, workers).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -23,12 +23,12 @@ def create_message_notification(
     
     # Create notification for the customer
     notification = Notification(
-        customer_id=work_order.customer_id,
+        user_id=work_order.customer_id,
         work_order_id=work_order.id,
         type=NotificationType.TECH_NOTE,
         title=f"New message on Repair #{work_order.id}",
         message=f"{work_order.assigned_technician or 'Your technician'} sent you a message",
-        is_read=0
+        read=False
     )
     
     db.add(notification)
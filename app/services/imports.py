@@ -0,0 +1,333 @@
+"""
+Bulk import of users, devices and work orders
+(POST /api/admin/imports/..., or `python -m app.services.imports KIND FILE`)
+
+The upload (CSV with a header row, or NDJSON) is parsed as it arrives and
+handled IMPORT_BATCH_ROWS records at a time: rows are validated against
+UserCreateAdmin / DeviceCreate / WorkOrderCreate, checked against the
+database with one set-based query per lookup (emails, owners, devices, taken
+serial numbers), inserted with one multi-row INSERT and committed. Memory and
+lock time are bounded by a batch however large the file is. Bad rows are
+skipped and reported by row number; the other rows of the same batch are
+still imported. Progress is logged after every batch (import_progress).
+
+User passwords are hashed in a process pool (hash_passwords), so a roster of
+thousands costs rows x bcrypt time / CPUs instead of tying up a worker.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import sys
+from typing import AsyncIterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.security import hash_passwords
+from app.models.device import Device
+from app.models.user import User
+from app.models.user_role import UserRole
+from app.models.work_order import WorkOrder
+from app.schemas.device import DeviceCreate
+from app.schemas.user import UserCreateAdmin
+from app.schemas.work_order import WorkOrderCreate
+from app.services.typeahead import DeviceEntry, UserEntry, make_entry, typeahead
+
+# Named explicitly - this module also runs as __main__
+logger = logging.getLogger("app.services.imports")
+
+IMPORT_FORMATS = ("ndjson", "csv")
+
+# (row number, parsed fields or None, parse error or None)
+Record = Tuple[int, Optional[dict], Optional[str]]
+
+
+class ImportReport:
+    """Counts and the first IMPORT_MAX_ERRORS row errors of one import"""
+
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+
+    def error(self, row: int, message: str):
+        self.failed += 1
+        if len(self.errors) < settings.IMPORT_MAX_ERRORS:
+            self.errors.append({"row": row, "error": message})
+
+    def counts(self) -> dict:
+        return {"rows": self.rows, "created": self.created, "failed": self.failed}
+
+    def as_dict(self) -> dict:
+        return {**self.counts(), "errors": sorted(self.errors, key=lambda error: error["row"])}
+
+
+async def text_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    UTF-8 lines (newline kept) of a byte stream; a spreadsheet's BOM is dropped.
+    Invalid UTF-8 raises UnicodeDecodeError once the lines before it are out.
+    """
+    pending = b""
+    buffer = ""
+    started = False
+    async for chunk in chunks:
+        data = pending + chunk
+        invalid = None
+        try:
+            text, pending = data.decode("utf-8"), b""
+        except UnicodeDecodeError as exc:
+            # Either a character split across chunks (finished by the next one) or bad bytes
+            text, pending = data[:exc.start].decode("utf-8"), data[exc.start:]
+            if exc.reason != "unexpected end of data":
+                invalid = exc
+        if not started and text:
+            text, started = text.removeprefix("\ufeff"), True
+        buffer += text
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line + "\n"
+        if invalid:
+            raise invalid
+    buffer += pending.decode("utf-8")
+    if buffer:
+        yield buffer
+
+
+async def ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[Record]:
+    row = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            fields = json.loads(line)
+        except ValueError:
+            yield row, None, "Invalid JSON"
+            continue
+        if not isinstance(fields, dict):
+            yield row, None, "Expected a JSON object"
+            continue
+        yield row, fields, None
+
+
+async def csv_records(lines: AsyncIterator[str]) -> AsyncIterator[Record]:
+    """Rows keyed by the header; empty cells are left out so optional fields default"""
+    header = None
+    pending: List[str] = []
+    quotes = 0
+    row = 0
+    async for line in lines:
+        pending.append(line)
+        quotes += line.count('"')
+        # An odd number of quotes means a quoted field continues on the next line
+        if quotes % 2:
+            continue
+        values = next(csv.reader(pending), [])
+        pending, quotes = [], 0
+        if not any(value.strip() for value in values):
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, None, f"Expected {len(header)} fields, got {len(values)}"
+            continue
+        yield row, {name: value.strip() for name, value in zip(header, values) if value.strip()}, None
+    if pending:
+        yield row + 1, None, "Unterminated quoted field"
+
+
+RECORD_READERS = {
+    "ndjson": ndjson_records,
+    "csv": csv_records,
+}
+
+
+def validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" if error["loc"] else error["msg"]
+        for error in exc.errors()
+    )
+
+
+def validate_batch(batch: List[Record], schema, report: ImportReport) -> list:
+    """(row, schema instance) for every row that parses and validates"""
+    valid = []
+    for row, fields, error in batch:
+        report.rows += 1
+        if error:
+            report.error(row, error)
+            continue
+        try:
+            valid.append((row, schema.model_validate(fields)))
+        except ValidationError as exc:
+            report.error(row, validation_message(exc))
+    return valid
+
+
+def insert_batch(db: Session, model, rows: List[Tuple[int, dict]], report: ImportReport) -> List[int]:
+    """One multi-row INSERT for the batch; returns the new ids in row order"""
+    if not rows:
+        return []
+    try:
+        ids = db.scalars(
+            insert(model).returning(model.id, sort_by_parameter_order=True),
+            [values for _, values in rows],
+        ).all()
+        db.commit()
+    except IntegrityError:
+        # A concurrent write took a serial number after the lookup
+        db.rollback()
+        for row, _ in rows:
+            report.error(row, "Conflicts with a concurrent change, retry the row")
+        return []
+    report.created += len(ids)
+    return ids
+
+
+def import_device_batch(db: Session, batch: List[Record], report: ImportReport) -> List[DeviceEntry]:
+    valid = validate_batch(batch, DeviceCreate, report)
+    owner_ids = {device.owner_id for _, device in valid}
+    known_owners = set(db.scalars(select(User.id).where(User.id.in_(owner_ids)))) if owner_ids else set()
+    serials = {device.serial_number for _, device in valid if device.serial_number}
+    taken = set(db.scalars(select(Device.serial_number).where(Device.serial_number.in_(serials)))) if serials else set()
+
+    rows = []
+    for row, device in valid:
+        if device.owner_id not in known_owners:
+            report.error(row, f"Unknown owner_id {device.owner_id}")
+            continue
+        if device.serial_number:
+            if device.serial_number in taken:
+                report.error(row, f"Duplicate serial_number {device.serial_number}")
+                continue
+            taken.add(device.serial_number)
+        rows.append((row, {"customer_id": device.owner_id, **device.model_dump(exclude={"owner_id"})}))
+
+    ids = insert_batch(db, Device, rows, report)
+    return [
+        make_entry(DeviceEntry, (device_id, *(values[field] for field in DeviceEntry._fields[1:])))
+        for device_id, (_, values) in zip(ids, rows)
+    ]
+
+
+def import_work_order_batch(db: Session, batch: List[Record], report: ImportReport) -> List[int]:
+    valid = validate_batch(batch, WorkOrderCreate, report)
+    device_ids = {work_order.device_id for _, work_order in valid}
+    owners = dict(db.execute(select(Device.id, Device.customer_id).where(Device.id.in_(device_ids))).all()) if device_ids else {}
+
+    rows = []
+    for row, work_order in valid:
+        if work_order.device_id not in owners:
+            report.error(row, f"Unknown device_id {work_order.device_id}")
+            continue
+        rows.append((row, {**work_order.model_dump(), "customer_id": owners[work_order.device_id]}))
+
+    return insert_batch(db, WorkOrder, rows, report)
+
+
+def import_user_batch(db: Session, batch: List[Record], report: ImportReport) -> List[UserEntry]:
+    valid = validate_batch(batch, UserCreateAdmin, report)
+    emails = {user.email for _, user in valid}
+    taken = set(db.scalars(select(User.email).where(User.email.in_(emails)))) if emails else set()
+
+    accepted = []
+    for row, user in valid:
+        if user.email in taken:
+            report.error(row, f"Email already registered: {user.email}")
+            continue
+        taken.add(user.email)
+        accepted.append((row, user))
+
+    # The slow part: bcrypt, in a process per CPU
+    hashes = hash_passwords([user.password for _, user in accepted])
+    rows = [
+        (row, {**user.model_dump(exclude={"password"}), "role": user.role or UserRole.USER, "password_hash": password_hash})
+        for (row, user), password_hash in zip(accepted, hashes)
+    ]
+
+    ids = insert_batch(db, User, rows, report)
+    return [
+        make_entry(UserEntry, (user_id, *(values[field] for field in UserEntry._fields[1:])))
+        for user_id, (_, values) in zip(ids, rows)
+    ]
+
+
+# kind -> (batch importer, setting with its batch size, typeahead index the new rows go to)
+IMPORTERS = {
+    "devices": (import_device_batch, "IMPORT_BATCH_ROWS", "devices"),
+    "work-orders": (import_work_order_batch, "IMPORT_BATCH_ROWS", None),
+    "users": (import_user_batch, "IMPORT_USER_BATCH_ROWS", "users"),
+}
+
+
+async def run_import(db: Session, kind: str, chunks: AsyncIterator[bytes], import_format: str) -> dict:
+    """Feed the upload to the kind's importer a batch at a time (in the threadpool); returns the report"""
+    import_batch, batch_setting, index = IMPORTERS[kind]
+    batch_rows = getattr(settings, batch_setting)
+    report = ImportReport()
+    entries = []
+
+    async def flush(batch: List[Record]):
+        added = await run_in_threadpool(import_batch, db, batch, report)
+        if index:
+            entries.extend(added)
+        logger.info("import_progress", extra={"fields": {"kind": kind, **report.counts()}})
+
+    batch: List[Record] = []
+    try:
+        async for record in RECORD_READERS[import_format](text_lines(chunks)):
+            batch.append(record)
+            if len(batch) >= batch_rows:
+                await flush(batch)
+                batch = []
+    except UnicodeDecodeError:
+        # Rows read so far are still imported; nothing after the bad bytes is
+        batch.append((report.rows + len(batch) + 1, None, "Not valid UTF-8, import stopped"))
+    if batch:
+        await flush(batch)
+
+    # One merge into the typeahead index for the whole upload
+    if entries:
+        typeahead.entries_added(index, entries)
+    return report.as_dict()
+
+
+async def file_chunks(path: str, size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    with open(path, "rb") as f:
+        while chunk := f.read(size):
+            yield chunk
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk import users, devices or work orders from a CSV or NDJSON file")
+    parser.add_argument("kind", choices=list(IMPORTERS))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, default=None, help="Defaults to csv for .csv files, else ndjson")
+    args = parser.parse_args(argv)
+    import_format = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        result = asyncio.run(run_import(db, args.kind, file_chunks(args.path), import_format))
+    finally:
+        db.close()
+    print(json.dumps(result, indent=2))
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    from app.core.logs import configure_logging
+
+    configure_logging()
+    sys.exit(main())
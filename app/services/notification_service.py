@@ -1,14 +1,34 @@
 """
 Service for creating notifications
 """
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
+from typing import Iterable, Tuple
 from app.models.notification import Notification, NotificationType
-from app.models.work_order import WorkOrder
+from app.models.work_order import WorkOrder, WorkOrderStatus
+from app.core.tracing import traced
 from datetime import datetime
 
+# One per WorkOrderStatus (the state machine checks this at import)
+STATUS_MESSAGES = {
+    WorkOrderStatus.PENDING: "Your repair request has been received",
+    WorkOrderStatus.DIAGNOSED: "Your device has been diagnosed",
+    WorkOrderStatus.APPROVED: "Your repair has been approved",
+    WorkOrderStatus.IN_PROGRESS: "Your repair is now in progress",
+    WorkOrderStatus.COMPLETED: "Great news! Your repair is complete",
+    WorkOrderStatus.DELIVERED: "Your device has been returned to you",
+    WorkOrderStatus.CANCELLED: "Your repair has been cancelled",
+}
+
+
+def status_change_message(work_order_id: int, new_status: str) -> str:
+    return f"Work order #{work_order_id}: {STATUS_MESSAGES.get(new_status, 'Status updated')}"
+
+
+@traced("notification_service.create_notification")
 def create_notification(
     db: Session,
-    customer_id: int,
+    user_id: int,
     notification_type: NotificationType,
     title: str,
     message: str,
@@ -16,7 +36,7 @@ def create_notification(
 ):
     """Create a notification for a customer"""
     notification = Notification(
-        customer_id=customer_id,
+        user_id=user_id,
         work_order_id=work_order_id,
         type=notification_type,
         title=title,
@@ -30,31 +50,50 @@ def create_notification(
     return notification
 
 
+@traced("notification_service.notify_status_change")
 def notify_status_change(db: Session, work_order: WorkOrder, new_status: str):
     """Notify customer when work order status changes"""
-    status_messages = {
-        "pending": "Your repair request has been received",
-        "in_progress": "Your repair is now in progress",
-        "waiting_parts": "Waiting for parts to arrive",
-        "completed": "Great news! Your repair is complete",
-        "cancelled": "Your repair has been cancelled"
-    }
-    
     return create_notification(
         db=db,
-        customer_id=work_order.customer_id,
+        user_id=work_order.customer_id,
         notification_type=NotificationType.STATUS_CHANGE,
         title="Repair Status Updated",
-        message=f"Work order #{work_order.id}: {status_messages.get(new_status, 'Status updated')}",
+        message=status_change_message(work_order.id, new_status),
         work_order_id=work_order.id
     )
 
 
+@traced("notification_service.notify_status_changes")
+def notify_status_changes(db: Session, changes: Iterable[Tuple[int, int, str]]) -> int:
+    """
+    notify_status_change for many (work_order_id, user_id, new_status)
+    with one multi-row INSERT. Does not commit: the caller commits it with
+    the status update.
+    """
+    now = datetime.utcnow()
+    rows = [
+        {
+            "user_id": user_id,
+            "work_order_id": work_order_id,
+            "type": NotificationType.STATUS_CHANGE,
+            "title": "Repair Status Updated",
+            "message": status_change_message(work_order_id, new_status),
+            "read": False,
+            "created_at": now,
+        }
+        for work_order_id, user_id, new_status in changes
+    ]
+    if rows:
+        db.execute(insert(Notification), rows)
+    return len(rows)
+
+
+@traced("notification_service.notify_new_message")
 def notify_new_message(db: Session, work_order: WorkOrder, sender_name: str):
     """Notify customer about new message from technician"""
     return create_notification(
         db=db,
-        customer_id=work_order.customer_id,
+        user_id=work_order.customer_id,
         notification_type=NotificationType.MESSAGE,
         title=f"New message from {sender_name}",
         message=f"You have a new message about work order #{work_order.id}",
@@ -62,11 +101,12 @@ def notify_new_message(db: Session, work_order: WorkOrder, sender_name: str):
     )
 
 
+@traced("notification_service.notify_tech_note")
 def notify_tech_note(db: Session, work_order: WorkOrder):
     """Notify customer when technician adds notes"""
     return create_notification(
         db=db,
-        customer_id=work_order.customer_id,
+        user_id=work_order.customer_id,
         notification_type=NotificationType.TECH_NOTE,
         title="Technician Note Added",
         message=f"The technician has added notes to work order #{work_order.id}",
@@ -0,0 +1,311 @@
+"""
+In-memory prefix index for counter typeahead (GET /api/admin/typeahead)
+
+Each index is a sorted list of (key, id) pairs: a lookup is one bisect to the
+first key starting with the typed prefix and a short forward scan, so it costs
+microseconds and never touches the database. Keys are normalized text
+("john smith", every word suffix of names and models) plus a compact form
+without separators for phone numbers and serials ("5550100", "dl7731").
+
+Every worker builds its own copy on startup in a background thread and
+rebuilds it every TYPEAHEAD_REBUILD_SECONDS; the admin routers update the
+local copy on each write, the periodic rebuild picks up writes made through
+other workers or other code paths. Memory is bounded by
+TYPEAHEAD_MAX_ENTRIES keys per index (keys cut at TYPEAHEAD_MAX_KEY_LENGTH);
+entities past the cap are not indexed and a warning is logged.
+"""
+import heapq
+import logging
+import re
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.device import Device
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+# Entries looked at per query form before ranking; keeps lookups bounded for short prefixes
+SCAN_FACTOR = 8
+
+# Stored per item; a namedtuple costs no more than a plain tuple
+UserEntry = namedtuple("UserEntry", ["id", "name", "email", "phone", "role"])
+DeviceEntry = namedtuple("DeviceEntry", ["id", "customer_id", "device_type", "brand", "model", "serial_number"])
+KIND_ENTRIES = {"users": (User, UserEntry), "devices": (Device, DeviceEntry)}
+INTERNED_FIELDS = {"device_type", "brand", "model"}
+
+
+def normalize(value: Optional[str]) -> str:
+    """Lowercase words separated by single spaces"""
+    return " ".join(WORD_PATTERN.findall((value or "").lower()))
+
+
+def compact(value: Optional[str]) -> str:
+    """Lowercase letters and digits only: "DL-77 31" -> "dl7731" """
+    return "".join(WORD_PATTERN.findall((value or "").lower())).replace("_", "")
+
+
+def word_suffixes(value: Optional[str]) -> List[str]:
+    """"Mary Ann Smith" -> ["mary ann smith", "ann smith", "smith"]"""
+    words = normalize(value).split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+def entry_keys(entry) -> List[str]:
+    if isinstance(entry, UserEntry):
+        return word_suffixes(entry.name) + [normalize(entry.email), compact(entry.phone)]
+    return word_suffixes(entry.model) + [normalize(f"{entry.brand or ''} {entry.model or ''}"), compact(entry.serial_number)]
+
+
+def make_entry(entry_type, values):
+    """Entry from field values; low-cardinality strings (brand, model...) are interned"""
+    return entry_type._make(
+        sys.intern(value) if field in INTERNED_FIELDS and value else value
+        for field, value in zip(entry_type._fields, values)
+    )
+
+
+def to_entry(kind: str, obj):
+    """Index entry for a model instance"""
+    _, entry_type = KIND_ENTRIES[kind]
+    return make_entry(entry_type, (getattr(obj, field) for field in entry_type._fields))
+
+
+class PrefixIndex:
+    """
+    Sorted keys with a parallel array of item ids, plus each item's entry (its
+    keys are derived from the entry again on removal). Keys are interned: word
+    suffixes ("smith", "galaxy s23") repeat a lot.
+    """
+
+    def __init__(self, max_entries: int, max_key_length: int):
+        self.max_entries = max_entries
+        self.max_key_length = max_key_length
+        self.keys: List[str] = []
+        self.ids = array("q")
+        self.items: Dict[int, tuple] = {}
+        self.skipped = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _keys(self, entry) -> List[str]:
+        return [sys.intern(key) for key in {key[:self.max_key_length] for key in entry_keys(entry) if key}]
+
+    def load(self, entries: Iterable[tuple]):
+        """Bulk build: collect everything, sort once"""
+        pairs = []
+        for entry in entries:
+            keys = self._keys(entry)
+            if len(pairs) + len(keys) > self.max_entries:
+                self.skipped += 1
+                continue
+            self.items[entry.id] = entry
+            pairs.extend((key, entry.id) for key in keys)
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.ids = array("q", (item_id for _, item_id in pairs))
+
+    def upsert(self, entry: tuple):
+        self.remove(entry.id)
+        keys = self._keys(entry)
+        if len(self.keys) + len(keys) > self.max_entries:
+            self.skipped += 1
+            return
+        self.items[entry.id] = entry
+        for key in keys:
+            position = bisect_right(self.keys, key)
+            self.keys.insert(position, key)
+            self.ids.insert(position, entry.id)
+
+    def merge(self, entries: List[tuple]):
+        """Add many new items with one pass over the keys instead of an insert per key"""
+        pairs = []
+        for entry in entries:
+            self.remove(entry.id)
+            keys = self._keys(entry)
+            if len(self.keys) + len(pairs) + len(keys) > self.max_entries:
+                self.skipped += 1
+                continue
+            self.items[entry.id] = entry
+            pairs.extend((key, entry.id) for key in keys)
+        pairs.sort()
+        merged = list(heapq.merge(zip(self.keys, self.ids), pairs))
+        self.keys = [key for key, _ in merged]
+        self.ids = array("q", (item_id for _, item_id in merged))
+
+    def remove(self, item_id: int):
+        entry = self.items.pop(item_id, None)
+        if entry is None:
+            return
+        for key in self._keys(entry):
+            position = bisect_left(self.keys, key)
+            end = bisect_right(self.keys, key, lo=position)
+            while position < end and self.ids[position] != item_id:
+                position += 1
+            if position < end:
+                del self.keys[position]
+                del self.ids[position]
+
+    def search(self, prefixes: Iterable[str], limit: int) -> List[tuple]:
+        """Entries of the best `limit` items with a key starting with any prefix.
+        Shorter matching keys rank first, so an exact match beats a longer name."""
+        best: Dict[int, Tuple[int, str]] = {}
+        for prefix in prefixes:
+            prefix = prefix[:self.max_key_length]
+            position = bisect_left(self.keys, prefix)
+            end = min(len(self.keys), position + limit * SCAN_FACTOR)
+            while position < end:
+                key = self.keys[position]
+                if not key.startswith(prefix):
+                    break
+                item_id = self.ids[position]
+                rank = (len(key), key)
+                if item_id not in best or rank < best[item_id]:
+                    best[item_id] = rank
+                position += 1
+        ranked = sorted(best, key=lambda item_id: (best[item_id], item_id))[:limit]
+        return [self.items[item_id] for item_id in ranked]
+
+
+class Typeahead:
+    """Per-process user and device prefix indexes"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Held for a whole rebuild, so a request arriving mid-build waits for it
+        self.build_lock = threading.Lock()
+        self.ready = threading.Event()
+        self.indexes = self._empty()
+        # Writes seen while a rebuild is reading the database, replayed onto the new indexes
+        self.pending: Optional[List[tuple]] = None
+        self.built_at: Optional[float] = None
+
+    @staticmethod
+    def _empty() -> Dict[str, PrefixIndex]:
+        return {
+            kind: PrefixIndex(settings.TYPEAHEAD_MAX_ENTRIES, settings.TYPEAHEAD_MAX_KEY_LENGTH)
+            for kind in KIND_ENTRIES
+        }
+
+    def rebuild(self, db):
+        """Load every user and device into fresh indexes and swap them in"""
+        with self.build_lock:
+            self._rebuild(db)
+
+    def ensure_ready(self, db):
+        """Build now unless a build already finished (or wait for the one running)"""
+        if not self.ready.is_set():
+            with self.build_lock:
+                if not self.ready.is_set():
+                    self._rebuild(db)
+
+    def _rebuild(self, db):
+        start = time.perf_counter()
+        with self.lock:
+            self.pending = []
+        try:
+            indexes = self._empty()
+            for kind, (model, entry_type) in KIND_ENTRIES.items():
+                rows = db.execute(
+                    select(*(getattr(model, field) for field in entry_type._fields)).execution_options(yield_per=10000)
+                )
+                indexes[kind].load(make_entry(entry_type, row) for row in rows)
+        except BaseException:
+            with self.lock:
+                self.pending = None
+            raise
+
+        with self.lock:
+            for kind, method, args in self.pending:
+                getattr(indexes[kind], method)(*args)
+            self.pending = None
+            self.indexes = indexes
+            self.built_at = time.time()
+        self.ready.set()
+
+        for kind, index in indexes.items():
+            if index.skipped:
+                logger.warning("typeahead_index_full", extra={"fields": {"index": kind, "skipped": index.skipped}})
+        logger.info("typeahead_rebuilt", extra={"fields": {
+            "users": len(indexes["users"].items),
+            "devices": len(indexes["devices"].items),
+            "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+        }})
+
+    def _apply(self, kind: str, method: str, *args):
+        with self.lock:
+            getattr(self.indexes[kind], method)(*args)
+            if self.pending is not None:
+                self.pending.append((kind, method, args))
+
+    def user_changed(self, user: User):
+        self._apply("users", "upsert", to_entry("users", user))
+
+    def user_deleted(self, user_id: int):
+        self._apply("users", "remove", user_id)
+
+    def device_changed(self, device: Device):
+        self._apply("devices", "upsert", to_entry("devices", device))
+
+    def entries_added(self, kind: str, entries: List[tuple]):
+        """Many new users or devices at once (bulk imports)"""
+        self._apply(kind, "merge", entries)
+
+    def device_deleted(self, device_id: int):
+        self._apply("devices", "remove", device_id)
+
+    def suggest(self, kind: str, q: str, limit: int) -> List[dict]:
+        prefixes = {form for form in (normalize(q), compact(q)) if form}
+        if not prefixes:
+            return []
+        with self.lock:
+            entries = self.indexes[kind].search(prefixes, limit)
+        return [entry._asdict() for entry in entries]
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready.is_set(),
+            "built_at": self.built_at,
+            "indexes": {
+                kind: {"items": len(index.items), "keys": len(index), "skipped": index.skipped}
+                for kind, index in self.indexes.items()
+            },
+        }
+
+
+typeahead = Typeahead()
+_refresh_thread: Optional[threading.Thread] = None
+
+
+def start_typeahead_refresh() -> threading.Thread:
+    """Build the indexes now and keep rebuilding them, in a daemon thread (once per process)"""
+    global _refresh_thread
+    from app.db.session import SessionLocal
+
+    if _refresh_thread is not None and _refresh_thread.is_alive():
+        return _refresh_thread
+
+    def refresh():
+        while True:
+            db = SessionLocal()
+            try:
+                typeahead.rebuild(db)
+            except Exception:
+                logger.exception("typeahead_rebuild_failed")
+            finally:
+                db.close()
+            time.sleep(settings.TYPEAHEAD_REBUILD_SECONDS)
+
+    _refresh_thread = threading.Thread(target=refresh, name="typeahead-refresh", daemon=True)
+    _refresh_thread.start()
+    return _refresh_thread
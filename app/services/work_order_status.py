@@ -0,0 +1,205 @@
+"""
+Work order state machine
+
+STAFF_TRANSITIONS / CUSTOMER_TRANSITIONS say which WorkOrderStatus moves
+are allowed, HOOK_RULES which side effects a move has. Both are compiled once
+at import, and compilation fails if a status has no row, so adding a status
+means deciding its moves:
+- SOURCES[actor][to]: the statuses `to` can be reached from. One move is a set
+  lookup (can_transition); a bulk update is one lookup per row
+  (validate_many). The UPDATE only matches rows still in the status that was
+  checked, and hooks run only for the rows it returns, so a row changed
+  concurrently is left alone and reported as a conflict.
+- HOOKS[(from, to)]: the side-effect hooks of that move.
+
+Hooks are set-based: each runs once with every change of the request that
+has it (one multi-row INSERT for any number of work orders) and none commits,
+so a status change and its effects land in the caller's transaction.
+Timestamps are part of the UPDATE itself (status_values).
+"""
+from collections import namedtuple
+from datetime import datetime
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from sqlalchemy import insert, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.models.message import Message, SenderType
+from app.models.user import User
+from app.models.user_role import UserRole
+from app.models.work_order import WorkOrder, WorkOrderStatus
+from app.services.notification_service import STATUS_MESSAGES, notify_status_changes
+
+S = WorkOrderStatus
+
+# from -> statuses technicians and admins can move a work order to
+STAFF_TRANSITIONS = {
+    S.PENDING: (S.DIAGNOSED, S.IN_PROGRESS, S.CANCELLED),
+    S.DIAGNOSED: (S.APPROVED, S.CANCELLED),
+    S.APPROVED: (S.IN_PROGRESS, S.CANCELLED),
+    S.IN_PROGRESS: (S.COMPLETED, S.CANCELLED),
+    S.COMPLETED: (S.DELIVERED, S.IN_PROGRESS),
+    S.DELIVERED: (),
+    S.CANCELLED: (S.PENDING,),
+}
+# Customers may only withdraw a request before work starts
+CUSTOMER_TRANSITIONS = {
+    S.PENDING: (S.CANCELLED,),
+}
+
+# What the bulk and single endpoints report per work order
+StatusChange = namedtuple("StatusChange", ["work_order_id", "customer_id", "from_status", "to_status"])
+
+
+def status_label(status: WorkOrderStatus) -> str:
+    return status.value.replace("_", " ")
+
+
+def notify_customer(db: Session, changes: List[StatusChange], actor: User, now: datetime):
+    """Status change notification, except to a customer for their own change"""
+    notify_status_changes(db, [
+        (change.work_order_id, change.customer_id, change.to_status)
+        for change in changes
+        if change.customer_id != actor.id
+    ])
+
+
+def post_system_message(db: Session, changes: List[StatusChange], actor: User, now: datetime):
+    """A line in each work order's thread recording the move"""
+    db.execute(insert(Message), [
+        {
+            "work_order_id": change.work_order_id,
+            "sender_id": actor.id,
+            "sender_type": SenderType.SYSTEM,
+            "message": f"Status changed from {status_label(change.from_status)} to {status_label(change.to_status)}",
+            "is_read": 0,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for change in changes
+    ])
+
+
+# (from or None for any, to or None for any, hook), in the order hooks run
+HOOK_RULES = [
+    (None, None, notify_customer),
+    (None, S.COMPLETED, post_system_message),
+    (None, S.CANCELLED, post_system_message),
+    (S.COMPLETED, S.IN_PROGRESS, post_system_message),
+]
+
+
+def status_values(to_status: WorkOrderStatus, now: datetime) -> dict:
+    """Columns set by a move to `to_status`; completed_at is kept on delivery, cleared on reopening"""
+    values = {"status": to_status, "updated_at": now}
+    if to_status == S.COMPLETED:
+        values["completed_at"] = now
+    elif to_status != S.DELIVERED:
+        values["completed_at"] = None
+    return values
+
+
+def _compile():
+    missing = set(WorkOrderStatus) - set(STAFF_TRANSITIONS)
+    if missing:
+        raise RuntimeError(f"No transitions defined from {', '.join(sorted(s.value for s in missing))}")
+    missing = set(WorkOrderStatus) - set(STATUS_MESSAGES)
+    if missing:
+        raise RuntimeError(f"No status message for {', '.join(sorted(s.value for s in missing))}")
+
+    sources: Dict[str, Dict[WorkOrderStatus, FrozenSet[WorkOrderStatus]]] = {}
+    pairs = set()
+    for actor, transitions in (("staff", STAFF_TRANSITIONS), ("customer", CUSTOMER_TRANSITIONS)):
+        by_target = {status: set() for status in WorkOrderStatus}
+        for from_status, targets in transitions.items():
+            for to_status in targets:
+                by_target[to_status].add(from_status)
+                pairs.add((from_status, to_status))
+        sources[actor] = {status: frozenset(froms) for status, froms in by_target.items()}
+
+    hooks = {
+        (from_status, to_status): tuple(
+            hook for rule_from, rule_to, hook in HOOK_RULES
+            if rule_from in (None, from_status) and rule_to in (None, to_status)
+        )
+        for from_status, to_status in pairs
+    }
+    return sources, hooks
+
+
+SOURCES, HOOKS = _compile()
+
+
+def actor_kind(user: User) -> str:
+    return "staff" if user.role in (UserRole.ADMIN, UserRole.TECHNICIAN) else "customer"
+
+
+def allowed_targets(from_status: WorkOrderStatus, actor: User) -> List[WorkOrderStatus]:
+    """Statuses `actor` can move a work order in `from_status` to, in WorkOrderStatus order"""
+    sources = SOURCES[actor_kind(actor)]
+    return [status for status in WorkOrderStatus if from_status in sources[status]]
+
+
+def can_transition(from_status: WorkOrderStatus, to_status: WorkOrderStatus, actor: User) -> bool:
+    return from_status in SOURCES[actor_kind(actor)][to_status]
+
+
+def validate_many(statuses: Sequence[WorkOrderStatus], to_status: WorkOrderStatus, actor: User) -> List[bool]:
+    """can_transition for many current statuses to one target"""
+    sources = SOURCES[actor_kind(actor)][to_status]
+    return [status in sources for status in statuses]
+
+
+def run_hooks(db: Session, changes: List[StatusChange], actor: User, now: datetime):
+    by_hook = {}
+    for change in changes:
+        for hook in HOOKS[(change.from_status, change.to_status)]:
+            by_hook.setdefault(hook, []).append(change)
+    for hook, hook_changes in by_hook.items():
+        hook(db, hook_changes, actor, now)
+
+
+def change_statuses(
+    db: Session,
+    rows: Sequence[Tuple[int, WorkOrderStatus, int]],
+    to_status: WorkOrderStatus,
+    actor: User,
+    values: Optional[dict] = None,
+) -> Tuple[List[dict], List[StatusChange]]:
+    """
+    Move the (id, status, customer_id) rows to `to_status`: one UPDATE plus
+    each hook once. `values` are extra columns for the changed rows. Returns a
+    result per row (updated / unchanged / invalid_transition / conflict when
+    the row no longer had `status`, with the previous status) and the changes
+    made. Does not commit.
+    """
+    now = datetime.utcnow()
+    results = []
+    moves = []
+    for (work_order_id, status, customer_id), allowed in zip(rows, validate_many([row[1] for row in rows], to_status, actor)):
+        if status == to_status:
+            result = "unchanged"
+        elif allowed:
+            result = "updated"
+            moves.append(StatusChange(work_order_id, customer_id, status, to_status))
+        else:
+            result = "invalid_transition"
+        results.append({"id": work_order_id, "result": result, "previous_status": status})
+
+    changes = []
+    if moves:
+        # Only rows still in the status validated above; RETURNING says which those were
+        changed = set(db.scalars(
+            update(WorkOrder)
+            .where(tuple_(WorkOrder.id, WorkOrder.status).in_([(move.work_order_id, move.from_status) for move in moves]))
+            .values(**(values or {}), **status_values(to_status, now))
+            .returning(WorkOrder.id)
+            .execution_options(synchronize_session=False)
+        ))
+        changes = [move for move in moves if move.work_order_id in changed]
+        if len(changes) < len(moves):
+            for result in results:
+                if result["result"] == "updated" and result["id"] not in changed:
+                    result["result"] = "conflict"
+        run_hooks(db, changes, actor, now)
+    return results, changes
@@ -0,0 +1,3 @@
+"""
+Load-test harness: large-shop dataset generator and scenario driver
+"""
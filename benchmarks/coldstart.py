@@ -0,0 +1,135 @@
+"""
+Cold-start profile
+Imports app.main in fresh interpreters under `python -X importtime` and
+reports where the time goes (self time per top-level package, cumulative time
+per app module), then times a cold process end to end - import, first
+/api/health, first /openapi.json - with and without the prebuilt schema
+(OPENAPI_CACHE_FILE).
+
+    python -m benchmarks.coldstart --runs 5
+    python -m benchmarks.coldstart --runs 5 --top 30 --output coldstart.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from typing import Dict, List
+
+# Runs in the child: one cold process from import to first responses
+FIRST_REQUESTS = """
+import json, time
+start = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+client = TestClient(app)
+assert client.get("/api/health").status_code == 200
+health = time.perf_counter()
+assert client.get("/openapi.json").status_code == 200
+openapi = time.perf_counter()
+print(json.dumps({
+    "import_s": imported - start,
+    "first_health_s": health - imported,
+    "first_openapi_s": openapi - health,
+    "total_s": openapi - start,
+}))
+"""
+
+
+def parse_importtime(stderr: str) -> List[dict]:
+    """`-X importtime` lines as {"module", "self_us", "cumulative_us", "depth"}"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        prefix, cumulative_us, name = line.split("|")
+        rows.append({
+            "module": name.strip(),
+            "self_us": int(prefix.split(":")[1]),
+            "cumulative_us": int(cumulative_us),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+        })
+    return rows
+
+
+def import_profile(env: dict) -> List[dict]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def summarize_imports(runs: List[List[dict]], top: int) -> dict:
+    """Median over runs of total, per-package self time and per-app-module cumulative time"""
+    totals, packages, app_modules = [], defaultdict(list), defaultdict(list)
+    for rows in runs:
+        totals.append(sum(row["self_us"] for row in rows))
+        by_package = defaultdict(int)
+        for row in rows:
+            by_package[row["module"].split(".")[0]] += row["self_us"]
+            if row["module"].startswith("app."):
+                app_modules[row["module"]].append(row["cumulative_us"])
+        for package, self_us in by_package.items():
+            packages[package].append(self_us)
+
+    def ranked(samples: Dict[str, List[int]]) -> Dict[str, float]:
+        medians = {name: statistics.median(values) for name, values in samples.items()}
+        return {
+            name: round(us / 1000, 1)
+            for name, us in sorted(medians.items(), key=lambda item: item[1], reverse=True)[:top]
+        }
+
+    return {
+        "total_ms": round(statistics.median(totals) / 1000, 1),
+        "self_ms_by_package": ranked(packages),
+        "cumulative_ms_by_app_module": ranked(app_modules),
+    }
+
+
+def first_requests(env: dict, runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", FIRST_REQUESTS], env=env, capture_output=True, text=True, check=True)
+        samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return {key: round(statistics.median(s[key] for s in samples), 3) for key in samples[0]}
+
+
+def run(args) -> dict:
+    env = dict(os.environ, OPENAPI_CACHE_FILE="", LOG_LEVEL="WARNING")
+    report = {
+        "config": {"runs": args.runs},
+        "imports": summarize_imports([import_profile(env) for _ in range(args.runs)], args.top),
+        "cold_process": {"generated_openapi": first_requests(env, args.runs)},
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache_file = os.path.join(directory, "openapi.json")
+        subprocess.run(
+            [sys.executable, "-m", "app.core.openapi", "--output", cache_file],
+            env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        report["cold_process"]["prebuilt_openapi"] = first_requests(dict(env, OPENAPI_CACHE_FILE=cache_file), args.runs)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile app.main imports and cold-process first requests")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Entries per ranking")
+    parser.add_argument("--output", default=None, help="Write the JSON report here as well as stdout")
+    args = parser.parse_args(argv)
+
+    output = json.dumps(run(args), indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Large-shop dataset for load tests
+Thin wrapper over app.db.seed.seed_bulk: creates the schema, then fills it
+with the "large" synthetic shop (~50k customers, 150k devices, 300k work
+orders and ~3M messages) scaled by --scale, e.g. --scale 0.01 for a quick run.
+Every user's password is BULK_PASSWORD, hashed once.
+"""
+import argparse
+import time
+
+from sqlalchemy import create_engine
+
+from app.db.base_class import Base
+from app.db.seed import SHOP_SIZES, ShopSize, seed_bulk
+from app.models import idempotency_key  # noqa: F401 - registers the table
+
+
+def sizes_for(scale: float) -> ShopSize:
+    return SHOP_SIZES["large"].scaled(scale)
+
+
+def generate(database_url: str, scale: float = 1.0, seed: int = 42, password_hash: str = None) -> dict:
+    """Create the schema and fill it with a large shop. Returns row counts"""
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    try:
+        return seed_bulk(engine, sizes_for(scale), seed=seed, password_hash=password_hash, chunk_size=10_000)
+    except ValueError as e:
+        raise SystemExit(f"{database_url}: {e}")
+    finally:
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a large-shop dataset for load tests")
+    parser.add_argument("--database-url", default="sqlite:///./bench.db")
+    parser.add_argument("--scale", type=float, default=1.0, help="Fraction of the full-size shop")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = generate(args.database_url, args.scale, args.seed)
+    print(f"Generated {counts} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
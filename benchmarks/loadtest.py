@@ -0,0 +1,240 @@
+"""
+Load-test driver
+Runs weighted portal/admin scenarios concurrently with async httpx, either
+against the ASGI app in-process or a running server (--base-url), and
+prints a JSON report with p50/p95/p99 latency and throughput per scenario.
+
+    python -m benchmarks.dataset --database-url sqlite:///./bench.db --scale 0.05
+    python -m benchmarks.loadtest --database-url sqlite:///./bench.db --duration 30 --concurrency 50
+
+For --base-url the server must use the same database and SECRET_KEY.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from collections import Counter
+from datetime import timedelta
+from typing import Dict, List
+
+import httpx
+from sqlalchemy import create_engine, select
+
+# name -> relative weight
+SCENARIOS = {
+    "dashboard": 15,
+    "thread_read": 25,
+    "message_send": 5,
+    "unread_poll": 45,
+    "admin_grid": 10,
+}
+TOKEN_LIFETIME = timedelta(hours=12)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Linear interpolation between closest ranks"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(latencies: List[float], statuses: Counter, elapsed: float) -> dict:
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": sum(count for status, count in statuses.items() if status >= 400 or status == 0),
+        "status_codes": {str(status): count for status, count in sorted(statuses.items())},
+        "throughput_rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(sum(values) / len(values) * 1000, 2) if values else 0.0,
+            "p50": round(percentile(values, 0.50) * 1000, 2),
+            "p95": round(percentile(values, 0.95) * 1000, 2),
+            "p99": round(percentile(values, 0.99) * 1000, 2),
+            "max": round(values[-1] * 1000, 2) if values else 0.0,
+        },
+    }
+
+
+class Recorder:
+    """Latencies and status codes per scenario, ignoring the warmup period"""
+
+    def __init__(self, warmup_until: float):
+        self.warmup_until = warmup_until
+        self.latencies: Dict[str, List[float]] = {name: [] for name in SCENARIOS}
+        self.statuses: Dict[str, Counter] = {name: Counter() for name in SCENARIOS}
+
+    def record(self, scenario: str, started: float, elapsed: float, status: int):
+        if started < self.warmup_until:
+            return
+        self.latencies[scenario].append(elapsed)
+        self.statuses[scenario][status] += 1
+
+    def report(self, elapsed: float, config: dict) -> dict:
+        all_latencies = [value for values in self.latencies.values() for value in values]
+        all_statuses = sum(self.statuses.values(), Counter())
+        return {
+            "config": config,
+            "duration_s": round(elapsed, 2),
+            "overall": summarize(all_latencies, all_statuses, elapsed),
+            "scenarios": {
+                name: summarize(self.latencies[name], self.statuses[name], elapsed)
+                for name in SCENARIOS
+            },
+        }
+
+
+def load_principals(database_url: str, customers: int, seed: int) -> dict:
+    """Sample customers (with their work order ids) and an admin, and mint tokens for them"""
+    from app.core.security import create_access_token
+    from app.models.user import User
+    from app.models.user_role import UserRole
+    from app.models.work_order import WorkOrder
+
+    engine = create_engine(database_url)
+    with engine.connect() as conn:
+        admin_email = conn.execute(
+            select(User.email).where(User.role == UserRole.ADMIN).limit(1)
+        ).scalar()
+        customer_rows = conn.execute(
+            select(User.id, User.email).where(User.role == UserRole.USER)
+        ).all()
+        sample = random.Random(seed).sample(customer_rows, min(customers, len(customer_rows)))
+        work_orders: Dict[int, List[int]] = {customer_id: [] for customer_id, _ in sample}
+        ids = list(work_orders)
+        for start in range(0, len(ids), 500):
+            for work_order_id, customer_id in conn.execute(
+                select(WorkOrder.id, WorkOrder.customer_id).where(WorkOrder.customer_id.in_(ids[start:start + 500]))
+            ):
+                work_orders[customer_id].append(work_order_id)
+    engine.dispose()
+
+    if admin_email is None or not sample:
+        raise SystemExit("Dataset has no admin or customers - run benchmarks.dataset first")
+
+    def headers(email):
+        token = create_access_token({"sub": email}, expires_delta=TOKEN_LIFETIME)
+        return {"Authorization": f"Bearer {token}"}
+
+    return {
+        "admin": headers(admin_email),
+        # Customers without work orders can still load the dashboard and poll
+        "customers": [
+            {"headers": headers(email), "work_orders": work_orders[customer_id]}
+            for customer_id, email in sample
+        ],
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, name: str, rng: random.Random, principals: dict, args) -> int:
+    customer = rng.choice(principals["customers"])
+    headers = customer["headers"]
+
+    if name == "dashboard":
+        response = await client.get("/api/customers/dashboard", headers=headers)
+    elif name == "thread_read" and customer["work_orders"]:
+        work_order_id = rng.choice(customer["work_orders"])
+        response = await client.get(f"/api/customers/messages/work-order/{work_order_id}", headers=headers)
+    elif name == "message_send" and customer["work_orders"]:
+        work_order_id = rng.choice(customer["work_orders"])
+        response = await client.post(
+            f"/api/customers/messages/work-order/{work_order_id}",
+            headers=headers,
+            json={"message": "Any update on my repair?"},
+        )
+    elif name == "admin_grid":
+        response = await client.get(
+            "/api/admin/work-orders/", headers=principals["admin"], params=args.admin_grid_params
+        )
+    else:
+        # unread_poll, and the thread scenarios for customers without work orders
+        response = await client.get("/api/customers/notifications/unread-count", headers=headers)
+        if response.status_code < 400:
+            response = await client.get("/api/customers/messages/unread-count", headers=headers)
+    return response.status_code
+
+
+async def virtual_user(client, rng: random.Random, principals: dict, recorder: Recorder, deadline: float, args):
+    names = list(SCENARIOS)
+    weights = [SCENARIOS[name] for name in names]
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        started = time.perf_counter()
+        try:
+            status = await run_scenario(client, name, rng, principals, args)
+        except httpx.HTTPError:
+            status = 0
+        recorder.record(name, started, time.perf_counter() - started, status)
+        if args.think_time:
+            await asyncio.sleep(rng.expovariate(1 / args.think_time))
+
+
+async def run(args) -> dict:
+    principals = load_principals(args.database_url, args.customers, args.seed)
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+    else:
+        from app.main import app
+        transport = httpx.ASGITransport(app=app)
+        client = httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout)
+
+    start = time.perf_counter()
+    recorder = Recorder(start + args.warmup)
+    deadline = start + args.warmup + args.duration
+    async with client:
+        await asyncio.gather(*[
+            virtual_user(client, random.Random(args.seed + i), principals, recorder, deadline, args)
+            for i in range(args.concurrency)
+        ])
+    elapsed = time.perf_counter() - start - args.warmup
+
+    return recorder.report(elapsed, {
+        "target": args.base_url or "in-process",
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "warmup_s": args.warmup,
+        "customers": len(principals["customers"]),
+        "scenario_weights": SCENARIOS,
+    })
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Drive concurrent portal/admin scenarios and report latency")
+    parser.add_argument("--database-url", default="sqlite:///./bench.db")
+    parser.add_argument("--base-url", default=None, help="Running server, e.g. http://127.0.0.1:8000 (default: in-process)")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds (after warmup)")
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between a user's requests (s)")
+    parser.add_argument("--customers", type=int, default=1000, help="Distinct customers to act as")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Write the JSON report here as well as stdout")
+    parser.add_argument("--access-log", action="store_true", help="Keep the in-process app's access log on")
+    args = parser.parse_args(argv)
+    args.admin_grid_params = {"status": "pending", "fields": "title,status,device_id,updated_at"}
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Settings are read at import, so point the in-process app at the dataset first
+    os.environ["DATABASE_URL"] = args.database_url
+    if not args.access_log:
+        os.environ["ACCESS_LOG_ENABLED"] = "false"
+
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
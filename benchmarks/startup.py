@@ -0,0 +1,118 @@
+"""
+Startup-time benchmark
+Boots the API the old way (app.db.init + uvicorn --reload) and the production
+way (app.db.migrate + app.serve with N workers) several times against the same
+database, and reports how long the DB step takes and how long until
+/api/health answers. The first boot of each mode builds the schema; the rest
+are restarts, which is what every deploy and autoscaled replica pays.
+
+    python -m benchmarks.startup --runs 5 --workers 4
+"""
+import argparse
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+MODES = {
+    "legacy": {
+        "prepare": [sys.executable, "-m", "app.db.init"],
+        "serve": [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", "{port}", "--reload"],
+        "env": {},
+    },
+    "production": {
+        "prepare": [sys.executable, "-m", "app.db.migrate"],
+        "serve": [sys.executable, "-m", "app.serve"],
+        "env": {"SERVER_HOST": "127.0.0.1", "SERVER_PORT": "{port}", "SERVER_WORKERS": "{workers}"},
+    },
+}
+
+
+def wait_healthy(url: str, timeout: float) -> bool:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return True
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.02)
+    return False
+
+
+def boot(mode: str, env: dict, args) -> dict:
+    """One boot: run the DB step, start the server, wait for health, stop it"""
+    spec = MODES[mode]
+    start = time.perf_counter()
+    subprocess.run(spec["prepare"], env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    prepared = time.perf_counter()
+
+    def fill(value):
+        return value.format(port=args.port, workers=args.workers)
+
+    # Own process group so the reloader / worker children are stopped too
+    server = subprocess.Popen(
+        [fill(arg) for arg in spec["serve"]],
+        env=dict(env, **{key: fill(value) for key, value in spec["env"].items()}),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True,
+    )
+    try:
+        healthy = wait_healthy(f"http://127.0.0.1:{args.port}/api/health", args.timeout)
+        ready = time.perf_counter()
+    finally:
+        os.killpg(server.pid, signal.SIGTERM)
+        server.wait(timeout=30)
+
+    return {
+        "db_step_s": round(prepared - start, 3),
+        "server_start_s": round(ready - prepared, 3),
+        "total_s": round(ready - start, 3),
+        "healthy": healthy,
+    }
+
+
+def run(args) -> dict:
+    report = {"config": {"runs": args.runs, "workers": args.workers}, "modes": {}}
+    for mode in args.modes:
+        database = os.path.abspath(f"startup_{mode}.db")
+        if os.path.exists(database):
+            os.remove(database)
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{database}", ENVIRONMENT=mode)
+        boots = [boot(mode, env, args) for _ in range(args.runs)]
+        restarts = boots[1:] or boots
+        report["modes"][mode] = {
+            "first_boot": boots[0],
+            "restart_median": {
+                key: round(statistics.median(b[key] for b in restarts), 3)
+                for key in ("db_step_s", "server_start_s", "total_s")
+            },
+            "all_healthy": all(b["healthy"] for b in boots),
+        }
+        os.remove(database)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare boot time of the legacy and production startup paths")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for /api/health")
+    parser.add_argument("--modes", nargs="+", choices=sorted(MODES), default=list(MODES))
+    parser.add_argument("--output", default=None, help="Write the JSON report here as well as stdout")
+    args = parser.parse_args(argv)
+
+    output = json.dumps(run(args), indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
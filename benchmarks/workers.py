@@ -0,0 +1,87 @@
+"""
+Worker-count benchmark
+Starts `python -m app.serve` with each requested worker count against the
+same dataset, drives it with the load-test scenarios (benchmarks.loadtest
+over HTTP) and prints one JSON report comparing throughput and latency.
+
+    python -m benchmarks.dataset --database-url sqlite:///./bench.db --scale 0.05
+    python -m benchmarks.workers --database-url sqlite:///./bench.db --workers 1 4 --duration 30
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+
+from benchmarks import loadtest
+from benchmarks.startup import wait_healthy
+
+
+def measure(workers: int, args) -> dict:
+    env = dict(
+        os.environ,
+        DATABASE_URL=args.database_url,
+        SERVER_HOST="127.0.0.1",
+        SERVER_PORT=str(args.port),
+        SERVER_WORKERS=str(workers),
+        ACCESS_LOG_ENABLED="false",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.serve"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True,
+    )
+    try:
+        base_url = f"http://127.0.0.1:{args.port}"
+        if not wait_healthy(f"{base_url}/api/health", args.timeout):
+            raise SystemExit(f"Server with {workers} worker(s) did not become healthy")
+        load_args = loadtest.parse_args([
+            "--database-url", args.database_url,
+            "--base-url", base_url,
+            "--concurrency", str(args.concurrency),
+            "--duration", str(args.duration),
+            "--warmup", str(args.warmup),
+            "--customers", str(args.customers),
+        ])
+        return asyncio.run(loadtest.run(load_args))
+    finally:
+        os.killpg(server.pid, signal.SIGTERM)
+        server.wait(timeout=60)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare app.serve worker counts on the load-test scenarios")
+    parser.add_argument("--database-url", default="sqlite:///./bench.db")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument("--customers", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for /api/health")
+    parser.add_argument("--output", default=None, help="Write the JSON report here as well as stdout")
+    args = parser.parse_args(argv)
+
+    reports = {str(workers): measure(workers, args) for workers in args.workers}
+    report = {
+        "reports": reports,
+        "comparison": {
+            workers: {
+                "throughput_rps": data["overall"]["throughput_rps"],
+                "p50_ms": data["overall"]["latency_ms"]["p50"],
+                "p99_ms": data["overall"]["latency_ms"]["p99"],
+                "errors": data["overall"]["errors"],
+            }
+            for workers, data in reports.items()
+        },
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@ from app.db.session import engine
 from app.db.base_class import Base
 
 # Import all models so they're registered with Base
-from app.models.user import Customer
+from app.models.user import User
 from app.models.device import Device
 from app.models.work_order import WorkOrder
 from app.models.notification import Notification
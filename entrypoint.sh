@@ -1,7 +1,18 @@
 #!/bin/bash
-# called by Dockerfile, runs DB init and starts api server
+# called by Dockerfile, prepares the DB and starts api server
+# ENVIRONMENT=production (the image default): migrate once under a lock, no
+# seeding, app.serve workers (SERVER_* settings), no reload.
+# Anything else: create_all + seed + --reload.
 set -e
 
+if [ "$ENVIRONMENT" = "production" ]; then
+    echo "🔧 Applying database migrations..."
+    python -m app.db.migrate
+
+    echo "🚀 Starting API server..."
+    exec python -m app.serve
+fi
+
 echo "⏳ Waiting for database..."
 sleep 2
 
@@ -1,49 +1,112 @@
+"""
+Shared test fixtures
+
+The schema is created once per test session; every test then runs inside a
+transaction on a single connection that is rolled back afterwards, so commits
+made by the test or the app only release a SAVEPOINT and nothing leaks
+between tests.
+
+The database defaults to a named in-memory SQLite database (shared cache, kept
+alive for the session). Set TEST_DATABASE_URL to use something else, e.g.
+"sqlite:///./test_{worker}.db" or a PostgreSQL URL. "{worker}" is replaced by
+the pytest-xdist worker id ("main" without xdist) so `pytest -n auto` gives
+each worker its own database.
+"""
+import json
+import os
+from contextlib import contextmanager
+
+# Read by Settings at import - the minimum bcrypt cost keeps user fixtures fast
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# Tests build the typeahead index from their own session instead of a background thread
+os.environ.setdefault("TYPEAHEAD_PRELOAD", "false")
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.main import app
 from app.db.base_class import Base
 from app.db.session import get_db
 
 # Import all models so they're registered with Base
-from app.models.user import Customer
+from app.models.user import User
+from app.models.user_role import UserRole
 from app.models.device import Device
 from app.models.work_order import WorkOrder
+from app.models import idempotency_key  # noqa: F401
 
-from app.models.user import Customer, UserRole
 from app.core.security import get_password_hash
 
-# Use SQLite in-memory database for tests (no PostgreSQL needed!)
-SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///./test.db"
+WORKER_ID = os.environ.get("PYTEST_XDIST_WORKER", "main")
+SQLALCHEMY_TEST_DATABASE_URL = os.environ.get(
+    "TEST_DATABASE_URL",
+    "sqlite:///file:repair_shop_test_{worker}?mode=memory&cache=shared&uri=true",
+).format(worker=WORKER_ID)
+
+
+def make_test_engine(url: str):
+    if not url.startswith("sqlite"):
+        return create_engine(url)
 
-# Create test engine
-engine = create_engine(
-    SQLALCHEMY_TEST_DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Only needed for SQLite
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+
+    # pysqlite's own transaction handling breaks SAVEPOINT; let SQLAlchemy emit BEGIN
+    @event.listens_for(engine, "connect")
+    def disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    return engine
+
+
+@pytest.fixture(scope="session")
+def engine():
+    """Test engine with the schema created once for the whole session"""
+    engine = make_test_engine(SQLALCHEMY_TEST_DATABASE_URL)
+    # An in-memory database lives only as long as a connection to it is open
+    keepalive = engine.connect()
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    try:
+        yield engine
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        keepalive.close()
+        engine.dispose()
 
 
 @pytest.fixture(scope="function")
-def db():
+def db(engine):
     """
-    Create a fresh database session for each test.
-    Creates all tables before the test and drops them after.
+    Session for one test, bound to a connection whose outer transaction is
+    rolled back afterwards. session.commit() releases a SAVEPOINT instead.
     """
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
-    
-    # Create a new session
-    db = TestingSessionLocal()
-    
+    connection = engine.connect()
+    transaction = connection.begin()
+    db = Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
+
     try:
         yield db
     finally:
         db.close()
-        # Drop all tables after test
-        Base.metadata.drop_all(bind=engine)
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture
+def session_factory(db):
+    """
+    sessionmaker for code that opens its own sessions (idempotency store,
+    profiler). Bound to the test connection, so its commits are SAVEPOINTs
+    rolled back with the test as well.
+    """
+    return sessionmaker(bind=db.bind, autoflush=False, join_transaction_mode="create_savepoint")
 
 
 @pytest.fixture(scope="function")
@@ -56,14 +119,14 @@ def client(db):
             yield db
         finally:
             pass
-    
+
     # Override the dependency
     app.dependency_overrides[get_db] = override_get_db
-    
+
     # Create test client
     with TestClient(app) as test_client:
         yield test_client
-    
+
     # Clear overrides
     app.dependency_overrides.clear()
 
@@ -72,7 +135,7 @@ def client(db):
 def admin_token(client, db):
     """Create an admin user and return auth token"""
     # Create admin user
-    admin = Customer(
+    admin = User(
         name="Admin Test",
         email="admin@test.com",
         phone="555-0000",
@@ -81,7 +144,7 @@ def admin_token(client, db):
     )
     db.add(admin)
     db.commit()
-    
+
     # Login and get token
     response = client.post("/api/auth/login", json={
         "email": "admin@test.com",
@@ -94,19 +157,104 @@ def admin_token(client, db):
 def customer_token(client, db):
     """Create a customer user and return auth token"""
     # Create customer user
-    customer = Customer(
+    customer = User(
         name="Customer Test",
         email="customer@test.com",
         phone="555-0001",
         password_hash=get_password_hash("customer123"),
-        role=UserRole.CUSTOMER
+        role=UserRole.USER
     )
     db.add(customer)
     db.commit()
-    
+
     # Login and get token
     response = client.post("/api/auth/login", json={
         "email": "customer@test.com",
         "password": "customer123"
     })
-    return response.json()["access_token"]
\ No newline at end of file
+    return response.json()["access_token"]
+
+
+# ==================== QUERY ASSERTIONS ====================
+
+class QueryRecorder:
+    """
+    Records the SQL issued on the test engine inside `with recorder.record():`
+    so tests can bound the query count and check plans for full table scans.
+    """
+    RECORDED = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+    def __init__(self, engine, db: Session):
+        self.engine = engine
+        self.db = db
+        self.statements = []
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(self.RECORDED):
+            # One parameter set is enough to EXPLAIN an executemany
+            self.statements.append((statement, parameters[0] if executemany else parameters))
+
+    @contextmanager
+    def record(self):
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", self.before_cursor_execute)
+        try:
+            yield self
+        finally:
+            event.remove(self.engine, "before_cursor_execute", self.before_cursor_execute)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def assert_max_queries(self, limit: int):
+        assert self.count <= limit, (
+            f"{self.count} queries (limit {limit}):\n" + "\n".join(statement for statement, _ in self.statements)
+        )
+
+    def full_scans(self) -> dict:
+        """Full table scans in the plans of the recorded reads/updates, as {table: statement}"""
+        conn = self.db.connection()
+        scans = {}
+        for statement, parameters in self.statements:
+            if statement.lstrip().upper().startswith("INSERT"):
+                continue
+            for table in plan_scans(conn, statement, parameters):
+                scans.setdefault(table, statement)
+        return scans
+
+    def assert_indexed(self, allow=()):
+        """Fail if any recorded statement scans a whole table (other than `allow`)"""
+        scans = {table: statement for table, statement in self.full_scans().items() if table not in allow}
+        assert not scans, "Full table scans:\n" + "\n".join(f"{table}: {statement}" for table, statement in scans.items())
+
+
+def plan_scans(conn: Connection, statement: str, parameters) -> list:
+    """Tables read with a sequential scan in the plan of `statement` (SQLite and PostgreSQL)"""
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        # e.g. "SCAN messages" or "SCAN work_orders USING INDEX ..." - but not subqueries/constants
+        return [
+            detail.split()[1] for *_, detail in rows
+            if detail.startswith("SCAN ") and not detail.startswith(("SCAN CONSTANT", "SCAN ("))
+        ]
+    if conn.dialect.name == "postgresql":
+        # Tiny test tables make a seq scan the cheapest plan - only report it when no index applies
+        conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        tables = []
+        nodes = [plan[0]["Plan"]]
+        while nodes:
+            node = nodes.pop()
+            if node["Node Type"] == "Seq Scan":
+                tables.append(node["Relation Name"])
+            nodes.extend(node.get("Plans", []))
+        return tables
+    return []
+
+
+@pytest.fixture
+def queries(engine, db):
+    """QueryRecorder for the test engine"""
+    return QueryRecorder(engine, db)
@@ -0,0 +1,110 @@
+"""
+Tests for structured JSON logging and the access log middleware
+"""
+import json
+import logging
+import queue
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.core.logs import AccessLogMiddleware, DroppingQueueHandler, JsonFormatter
+from app.db.instrumentation import QueryInstrumentationMiddleware, instrument_engine
+
+# Private in-memory engine - the routes only run constant SELECTs, no schema needed
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+instrument_engine(engine)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Small app with the access log inside query instrumentation, as in main"""
+    monkeypatch.setattr(settings, "ACCESS_LOG_ENABLED", True)
+    monkeypatch.setattr(settings, "ACCESS_LOG_SAMPLED_ROUTES", ["/poll"])
+    monkeypatch.setattr(settings, "ACCESS_LOG_2XX_SAMPLE_RATE", 0.0)
+    app = FastAPI()
+    app.add_middleware(AccessLogMiddleware)
+    app.add_middleware(QueryInstrumentationMiddleware)
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int, request: Request):
+        request.state.principal_id = 7
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return {"id": item_id}
+
+    @app.get("/poll")
+    def poll():
+        return {"count": 0}
+
+    return TestClient(app)
+
+
+def access_records(caplog):
+    return [record.fields for record in caplog.records if record.name == "app.access"]
+
+
+# ==================== FORMATTER TESTS ====================
+
+def test_json_formatter_merges_fields():
+    """Structured fields end up at the top level of the JSON line"""
+    record = logging.LogRecord("app.test", logging.INFO, __file__, 1, "hello %s", ("world",), None)
+    record.fields = {"route": "/x", "status": 200}
+
+    data = json.loads(JsonFormatter().format(record))
+
+    assert data["message"] == "hello world"
+    assert data["level"] == "INFO"
+    assert data["route"] == "/x"
+    assert data["status"] == 200
+
+
+def test_queue_handler_drops_instead_of_blocking():
+    """A full queue drops records rather than stalling the caller"""
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    record = logging.LogRecord("app.test", logging.INFO, __file__, 1, "msg", None, None)
+
+    handler.emit(record)
+    handler.emit(record)
+
+    assert handler.dropped == 1
+
+
+# ==================== MIDDLEWARE TESTS ====================
+
+def test_access_record_fields(client, caplog):
+    """Records carry route template, principal, DB stats and response size"""
+    with caplog.at_level("INFO", logger="app.access"):
+        response = client.get("/items/5")
+
+    record, = access_records(caplog)
+    assert record["route"] == "/items/{item_id}"
+    assert record["path"] == "/items/5"
+    assert record["status"] == 200
+    assert record["principal_id"] == 7
+    assert record["db_queries"] == 1
+    assert record["response_bytes"] == len(response.content)
+    assert record["sample_rate"] == 1.0
+
+
+def test_polling_routes_sampled(client, caplog):
+    """Successful polls follow the sample rate; other routes are always logged"""
+    with caplog.at_level("INFO", logger="app.access"):
+        client.get("/poll")
+        client.get("/items/1")
+
+    assert [record["route"] for record in access_records(caplog)] == ["/items/{item_id}"]
+
+
+def test_access_log_disabled(client, caplog, monkeypatch):
+    """ACCESS_LOG_ENABLED turns the middleware into a pass-through"""
+    monkeypatch.setattr(settings, "ACCESS_LOG_ENABLED", False)
+
+    with caplog.at_level("INFO", logger="app.access"):
+        client.get("/items/1")
+
+    assert access_records(caplog) == []
@@ -0,0 +1,118 @@
+"""
+Tests for admission control / load shedding
+"""
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.core.admission import Limiter, AdmissionControlMiddleware
+from app.core.config import settings
+
+
+# ==================== LIMITER TESTS ====================
+
+async def test_limiter_admits_up_to_limit():
+    """Requests under the limit are admitted immediately"""
+    limiter = Limiter(limit=2, max_queue=0)
+
+    assert await limiter.acquire(0.1)
+    assert await limiter.acquire(0.1)
+    assert limiter.active == 2
+
+
+async def test_limiter_sheds_when_queue_full():
+    """Once the queue is full, new requests are shed immediately"""
+    limiter = Limiter(limit=1, max_queue=0)
+    await limiter.acquire(0.1)
+
+    assert not await limiter.acquire(1.0)
+    assert limiter.shed_count == 1
+
+
+async def test_limiter_queue_times_out():
+    """Queued requests give up at the deadline"""
+    limiter = Limiter(limit=1, max_queue=5)
+    await limiter.acquire(0.1)
+
+    assert not await limiter.acquire(0.05)
+    assert limiter.timeout_count == 1
+    assert limiter.queue_depth == 0
+
+
+async def test_limiter_hands_slot_to_waiter():
+    """release() passes the slot to the oldest waiter"""
+    limiter = Limiter(limit=1, max_queue=5)
+    await limiter.acquire(0.1)
+
+    waiter = asyncio.create_task(limiter.acquire(1.0))
+    await asyncio.sleep(0)
+    assert limiter.queue_depth == 1
+
+    limiter.release()
+    assert await waiter
+    assert limiter.active == 1
+
+    limiter.release()
+    assert limiter.active == 0
+
+
+# ==================== MIDDLEWARE TESTS ====================
+
+@pytest.fixture
+def admission_settings(monkeypatch):
+    """Tight limits so a couple of requests saturate a route"""
+    monkeypatch.setattr(settings, "ADMISSION_ENABLED", True)
+    monkeypatch.setattr(settings, "ADMISSION_ROUTE_CONCURRENCY", 1)
+    monkeypatch.setattr(settings, "ADMISSION_MAX_CONCURRENCY", 10)
+    monkeypatch.setattr(settings, "ADMISSION_MAX_QUEUE", 0)
+    monkeypatch.setattr(settings, "ADMISSION_RETRY_AFTER_SECONDS", 3)
+    monkeypatch.setattr(settings, "ADMISSION_PRIORITY_ROUTES", ["/health"])
+
+
+@pytest.fixture
+def slow_app(admission_settings):
+    """Small app with a route that blocks until released"""
+    app = FastAPI()
+    app.add_middleware(AdmissionControlMiddleware)
+    app.state.gate = asyncio.Event()
+
+    @app.get("/slow")
+    async def slow():
+        await app.state.gate.wait()
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    return app
+
+
+async def test_middleware_sheds_excess_requests(slow_app):
+    """Second request to a saturated route gets a quick 503 with Retry-After"""
+    transport = httpx.ASGITransport(app=slow_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        first = asyncio.create_task(client.get("/slow"))
+        await asyncio.sleep(0.05)
+
+        shed = await client.get("/slow")
+        assert shed.status_code == 503
+        assert shed.headers["retry-after"] == "3"
+
+        # Other routes are unaffected
+        health = await client.get("/health")
+        assert health.status_code == 200
+
+        slow_app.state.gate.set()
+        assert (await first).status_code == 200
+
+
+async def test_middleware_unknown_path_passes_through(slow_app):
+    """Unknown paths are left to the router's 404"""
+    transport = httpx.ASGITransport(app=slow_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/nope")
+
+    assert response.status_code == 404
@@ -0,0 +1,127 @@
+"""
+Tests for the batch request endpoint
+"""
+import pytest
+from datetime import datetime
+
+from app.core.config import settings
+from app.models.user import User
+from app.models.device import Device
+from app.models.work_order import WorkOrder, WorkOrderStatus
+from app.models.message import Message
+from app.core.security import create_access_token
+
+
+@pytest.fixture
+def test_customer(db):
+    """Create a test customer"""
+    customer = User(
+        name="John Test",
+        email="test@example.com",
+        phone="555-0100",
+        password_hash="dummy_hash"
+    )
+    db.add(customer)
+    db.commit()
+    db.refresh(customer)
+    return customer
+
+
+@pytest.fixture
+def test_work_order(db, test_customer):
+    """Create a test work order"""
+    device = Device(
+        customer_id=test_customer.id,
+        device_type="Phone",
+        serial_number="BATCH-001"
+    )
+    db.add(device)
+    db.commit()
+    db.refresh(device)
+
+    work_order = WorkOrder(
+        customer_id=test_customer.id,
+        device_id=device.id,
+        title="Screen Replacement",
+        status=WorkOrderStatus.IN_PROGRESS,
+        created_at=datetime.utcnow()
+    )
+    db.add(work_order)
+    db.commit()
+    db.refresh(work_order)
+    return work_order
+
+
+@pytest.fixture
+def auth_headers(test_customer):
+    """Create authorization headers"""
+    token = create_access_token({"sub": test_customer.email})
+    return {"Authorization": f"Bearer {token}"}
+
+
+# ==================== TESTS ====================
+
+def test_batch_runs_items_in_order(client, db, auth_headers, test_work_order):
+    """Each item gets its own status and body, in request order"""
+    response = client.post(
+        "/api/batch",
+        headers=auth_headers,
+        json={"items": [
+            {"id": "send", "method": "POST",
+             "path": f"/api/customers/messages/work-order/{test_work_order.id}",
+             "body": {"message": "Any update?"}},
+            {"id": "count", "method": "GET", "path": "/api/customers/messages/unread-count"},
+            {"id": "missing", "method": "GET", "path": "/api/customers/messages/work-order/99999"},
+        ]}
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+
+    assert [r["id"] for r in results] == ["send", "count", "missing"]
+    assert results[0]["status"] == 201
+    assert results[0]["body"]["message"] == "Any update?"
+    assert results[1] == {"id": "count", "status": 200, "body": {"unread_count": 0}}
+    assert results[2]["status"] == 404
+
+    assert db.query(Message).count() == 1
+
+
+def test_batch_query_string(client, auth_headers, test_work_order):
+    """Query strings in the item path are passed through"""
+    response = client.post(
+        "/api/batch",
+        headers=auth_headers,
+        json={"items": [{"method": "GET", "path": "/api/customers/messages/recent?limit=1"}]}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["results"][0]["status"] == 200
+
+
+def test_batch_size_cap(client, auth_headers):
+    """Batches larger than BATCH_MAX_ITEMS are rejected up front"""
+    items = [{"method": "GET", "path": "/api/health"}] * (settings.BATCH_MAX_ITEMS + 1)
+    response = client.post("/api/batch", headers=auth_headers, json={"items": items})
+
+    assert response.status_code == 400
+
+
+def test_batch_rejects_nested_batch(client, auth_headers):
+    """A batch cannot call itself"""
+    response = client.post(
+        "/api/batch",
+        headers=auth_headers,
+        json={"items": [{"method": "POST", "path": "/api/batch", "body": {"items": []}}]}
+    )
+
+    assert response.status_code == 400
+
+
+def test_batch_requires_auth(client):
+    """Batch endpoint requires authentication"""
+    response = client.post(
+        "/api/batch",
+        json={"items": [{"method": "GET", "path": "/api/health"}]}
+    )
+    assert response.status_code == 401
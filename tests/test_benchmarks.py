@@ -0,0 +1,82 @@
+"""
+Tests for the load-test harness (report math and dataset generation)
+"""
+from collections import Counter
+
+import pytest
+
+from sqlalchemy import create_engine, func, select
+
+from benchmarks.coldstart import parse_importtime, summarize_imports
+from benchmarks.dataset import generate, sizes_for
+from benchmarks.loadtest import Recorder, percentile, summarize
+from app.models.message import Message
+from app.models.work_order import WorkOrder
+
+
+def test_percentile_interpolates():
+    """Percentiles interpolate between ranks"""
+    values = [0.01, 0.02, 0.03, 0.04]
+
+    assert percentile(values, 0.5) == pytest.approx(0.025)
+    assert percentile(values, 0.99) == pytest.approx(0.0397)
+    assert percentile([], 0.5) == 0.0
+
+
+def test_summarize_counts_errors_and_throughput():
+    """Report has counts, error totals, throughput and latency percentiles"""
+    summary = summarize([0.1, 0.2, 0.3], Counter({200: 2, 503: 1}), elapsed=1.5)
+
+    assert summary["requests"] == 3
+    assert summary["errors"] == 1
+    assert summary["throughput_rps"] == 2.0
+    assert summary["latency_ms"]["p50"] == 200.0
+    assert summary["status_codes"] == {"200": 2, "503": 1}
+
+
+def test_recorder_skips_warmup():
+    """Requests started during warmup are not measured"""
+    recorder = Recorder(warmup_until=10.0)
+    recorder.record("dashboard", started=5.0, elapsed=0.1, status=200)
+    recorder.record("dashboard", started=11.0, elapsed=0.2, status=200)
+
+    report = recorder.report(elapsed=1.0, config={})
+
+    assert report["scenarios"]["dashboard"]["requests"] == 1
+    assert report["overall"]["requests"] == 1
+
+
+def test_generate_small_shop(tmp_path):
+    """A scaled-down shop has the requested row counts"""
+    url = f"sqlite:///{tmp_path / 'bench.db'}"
+    counts = generate(url, scale=0.0002, password_hash="precomputed")
+
+    sizes = sizes_for(0.0002)
+    assert counts["work_orders"] == sizes.work_orders
+    assert counts["messages"] > 0
+
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(WorkOrder.__table__)).scalar() == sizes.work_orders
+        assert conn.execute(select(func.count()).select_from(Message.__table__)).scalar() == counts["messages"]
+    engine.dispose()
+
+
+def test_parse_importtime():
+    """importtime lines become per-module self / cumulative times with nesting depth"""
+    rows = parse_importtime(
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     jose.constants\n"
+        "import time:       300 |        420 |   jose\n"
+        "import time:      1000 |       1420 | app.core.security\n"
+    )
+
+    assert [row["module"] for row in rows] == ["jose.constants", "jose", "app.core.security"]
+    assert [row["depth"] for row in rows] == [2, 1, 0]
+    assert rows[2]["self_us"] == 1000
+    assert rows[2]["cumulative_us"] == 1420
+
+    summary = summarize_imports([rows], top=1)
+    assert summary["total_ms"] == 1.4
+    assert summary["self_ms_by_package"] == {"app": 1.0}
+    assert summary["cumulative_ms_by_app_module"] == {"app.core.security": 1.4}
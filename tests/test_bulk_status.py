@@ -0,0 +1,141 @@
+"""
+Tests for bulk work order status updates
+"""
+import pytest
+
+from sqlalchemy import event, select
+
+from app.core.config import settings
+from app.models.user import User
+from app.models.user_role import UserRole
+from app.models.device import Device
+from app.models.notification import Notification, NotificationType
+from app.models.work_order import WorkOrder, WorkOrderStatus
+from app.core.security import create_access_token
+from app.services.notification_service import notify_status_change, notify_status_changes
+
+
+@pytest.fixture
+def technician_headers(db):
+    """Authorization headers for a technician"""
+    technician = User(name="Tech Test", email="tech@example.com", password_hash="x", role=UserRole.TECHNICIAN)
+    db.add(technician)
+    db.commit()
+    token = create_access_token({"sub": technician.email})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def test_work_orders(db):
+    """Four work orders of two customers: in progress, approved, in progress, completed"""
+    work_orders = []
+    for n in range(2):
+        customer = User(name=f"Customer {n}", email=f"customer{n}@example.com", password_hash="x")
+        db.add(customer)
+        db.commit()
+        device = Device(customer_id=customer.id, device_type="Phone", serial_number=f"BULK-{n}")
+        db.add(device)
+        db.commit()
+        for status in [WorkOrderStatus.IN_PROGRESS, WorkOrderStatus.COMPLETED if n else WorkOrderStatus.APPROVED]:
+            work_orders.append(WorkOrder(customer_id=customer.id, device_id=device.id, title="Repair", status=status))
+    db.add_all(work_orders)
+    db.commit()
+    return work_orders
+
+
+def patch_statuses(client, headers, **body):
+    return client.patch("/api/admin/work-orders/status", json=body, headers=headers)
+
+
+def test_bulk_status_update(client, db, technician_headers, test_work_orders):
+    ids = [w.id for w in test_work_orders]
+
+    response = patch_statuses(client, technician_headers, ids=ids + [999999, ids[0]], status="completed", technician_notes="Done")
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["updated"] == 2
+    assert body["results"] == [
+        {"id": ids[0], "result": "updated", "previous_status": "in_progress"},
+        {"id": ids[1], "result": "invalid_transition", "previous_status": "approved"},
+        {"id": ids[2], "result": "updated", "previous_status": "in_progress"},
+        {"id": ids[3], "result": "unchanged", "previous_status": "completed"},
+        {"id": 999999, "result": "not_found", "previous_status": None},
+    ]
+    db.expire_all()
+    rows = db.execute(select(WorkOrder.status, WorkOrder.technician_notes).where(WorkOrder.id.in_(ids)).order_by(WorkOrder.id)).all()
+    assert [status for status, _ in rows] == [
+        WorkOrderStatus.COMPLETED, WorkOrderStatus.APPROVED, WorkOrderStatus.COMPLETED, WorkOrderStatus.COMPLETED,
+    ]
+    assert [notes for _, notes in rows] == ["Done", None, "Done", None]
+
+
+def test_bulk_status_notifies_customers(client, db, technician_headers, test_work_orders):
+    ids = [w.id for w in test_work_orders]
+
+    patch_statuses(client, technician_headers, ids=ids, status="completed")
+
+    notifications = db.scalars(select(Notification).where(Notification.work_order_id.in_(ids)).order_by(Notification.work_order_id)).all()
+    assert [n.work_order_id for n in notifications] == [ids[0], ids[2]]
+    assert [n.user_id for n in notifications] == [test_work_orders[0].customer_id, test_work_orders[2].customer_id]
+    assert notifications[0].type == NotificationType.STATUS_CHANGE
+    assert notifications[0].message == f"Work order #{ids[0]}: Great news! Your repair is complete"
+
+
+def test_single_and_bulk_notifications_agree(db, test_work_orders):
+    """notify_status_change and notify_status_changes write the same row"""
+    work_order = test_work_orders[0]
+
+    single = notify_status_change(db, work_order, WorkOrderStatus.COMPLETED)
+    notify_status_changes(db, [(work_order.id, work_order.customer_id, WorkOrderStatus.COMPLETED)])
+    db.commit()
+
+    rows = db.scalars(select(Notification).where(Notification.work_order_id == work_order.id)).all()
+    assert len(rows) == 2
+    assert {(n.user_id, n.type, n.title, n.message) for n in rows} == {
+        (work_order.customer_id, single.type, single.title, single.message)
+    }
+
+
+def test_bulk_status_is_set_based(client, db, engine, technician_headers, test_work_orders):
+    """One SELECT, one UPDATE and one INSERT per side effect however many ids are sent"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0])
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        patch_statuses(client, technician_headers, ids=[w.id for w in test_work_orders], status="completed")
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    # Notifications, then the system messages in the threads
+    writes = [statement for statement in statements if statement in ("UPDATE", "INSERT")]
+    assert writes == ["UPDATE", "INSERT", "INSERT"]
+
+
+@pytest.mark.parametrize("body", [
+    {"ids": [1], "status": "waiting_for_parts"},
+    {"ids": [], "status": "completed"},
+])
+def test_bulk_status_rejects_bad_requests(client, technician_headers, body):
+    response = patch_statuses(client, technician_headers, **body)
+
+    assert response.status_code in (400, 422)
+
+
+def test_bulk_status_limit(client, technician_headers, monkeypatch):
+    monkeypatch.setattr(settings, "WORK_ORDER_BULK_MAX_IDS", 2)
+
+    response = patch_statuses(client, technician_headers, ids=[1, 2, 3], status="completed")
+
+    assert response.status_code == 400
+
+
+def test_bulk_status_requires_staff(client, db, test_work_orders):
+    token = create_access_token({"sub": "customer0@example.com"})
+
+    response = patch_statuses(client, {"Authorization": f"Bearer {token}"}, ids=[test_work_orders[0].id], status="completed")
+
+    assert response.status_code == 403
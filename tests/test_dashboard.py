@@ -0,0 +1,148 @@
+"""
+Tests for the customer dashboard endpoint
+"""
+import pytest
+from datetime import datetime, timedelta
+
+from app.models.user import User
+from app.models.device import Device
+from app.models.work_order import WorkOrder, WorkOrderStatus
+from app.models.message import Message, SenderType
+from app.models.notification import Notification, NotificationType
+from app.core.security import create_access_token
+
+
+@pytest.fixture
+def test_customer(db):
+    """Create a test customer"""
+    customer = User(
+        name="John Test",
+        email="test@example.com",
+        phone="555-0100",
+        password_hash="dummy_hash"
+    )
+    db.add(customer)
+    db.commit()
+    db.refresh(customer)
+    return customer
+
+
+@pytest.fixture
+def test_shop(db, test_customer):
+    """Create a device, two work orders, messages and notifications for the customer"""
+    device = Device(
+        customer_id=test_customer.id,
+        device_type="Laptop",
+        brand="Dell",
+        model="XPS 13",
+        serial_number="DASH-001"
+    )
+    db.add(device)
+    db.commit()
+    db.refresh(device)
+
+    now = datetime.utcnow()
+    active = WorkOrder(
+        customer_id=test_customer.id,
+        device_id=device.id,
+        title="Keyboard Not Working",
+        status=WorkOrderStatus.IN_PROGRESS,
+        assigned_technician="Tech Smith",
+        updated_at=now
+    )
+    done = WorkOrder(
+        customer_id=test_customer.id,
+        device_id=device.id,
+        title="Battery Replacement",
+        status=WorkOrderStatus.COMPLETED,
+        updated_at=now - timedelta(days=1)
+    )
+    db.add_all([active, done])
+    db.commit()
+
+    db.add_all([
+        Message(
+            work_order_id=active.id,
+            sender_id=test_customer.id,
+            sender_type=SenderType.CUSTOMER,
+            message="Any update?",
+            is_read=1,
+            created_at=now - timedelta(hours=2)
+        ),
+        Message(
+            work_order_id=active.id,
+            sender_id=99,
+            sender_type=SenderType.TECHNICIAN,
+            message="Replacing the keyboard now",
+            is_read=0,
+            created_at=now - timedelta(hours=1)
+        ),
+        Notification(
+            user_id=test_customer.id,
+            work_order_id=active.id,
+            type=NotificationType.STATUS_CHANGE,
+            title="Repair Status Updated",
+            message="Your repair is now in progress",
+            read=False
+        ),
+    ])
+    db.commit()
+    return active, done
+
+
+@pytest.fixture
+def auth_headers(test_customer):
+    """Create authorization headers"""
+    token = create_access_token({"sub": test_customer.email})
+    return {"Authorization": f"Bearer {token}"}
+
+
+# ==================== TESTS ====================
+
+def test_dashboard_returns_everything(client, auth_headers, test_customer, test_shop):
+    """Dashboard bundles counts, work orders, devices and recent messages"""
+    response = client.get("/api/customers/dashboard", headers=auth_headers)
+
+    assert response.status_code == 200
+    data = response.json()
+
+    assert data["counts"] == {
+        "unread_messages": 1,
+        "unread_notifications": 1,
+        "active_work_orders": 1,
+    }
+    assert len(data["devices"]) == 1
+    assert data["devices"][0]["owner_id"] == test_customer.id
+    assert [wo["title"] for wo in data["work_orders"]] == ["Keyboard Not Working", "Battery Replacement"]
+
+    # Newest message first, technician name resolved from the work order
+    assert data["recent_messages"][0]["sender_name"] == "Tech Smith"
+    assert data["recent_messages"][1]["sender_name"] == "John Test"
+
+
+def test_dashboard_recent_limit(client, auth_headers, test_shop):
+    """recent_limit caps the recent message list"""
+    response = client.get("/api/customers/dashboard?recent_limit=1", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert len(response.json()["recent_messages"]) == 1
+
+    for recent_limit in (0, 51):
+        response = client.get(f"/api/customers/dashboard?recent_limit={recent_limit}", headers=auth_headers)
+        assert response.status_code == 422
+
+
+def test_dashboard_empty(client, auth_headers):
+    """A new customer gets an empty dashboard, not an error"""
+    response = client.get("/api/customers/dashboard", headers=auth_headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["counts"]["unread_messages"] == 0
+    assert data["work_orders"] == []
+
+
+def test_dashboard_unauthorized(client):
+    """Dashboard requires authentication"""
+    response = client.get("/api/customers/dashboard")
+    assert response.status_code == 401
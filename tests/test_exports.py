@@ -0,0 +1,201 @@
+"""
+Tests for the streaming NDJSON / CSV admin exports
+"""
+import csv
+import io
+import json
+import pytest
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.user import User
+from app.models.user_role import UserRole
+from app.models.device import Device
+from app.models.work_order import WorkOrder, WorkOrderStatus
+from app.models.message import Message, SenderType
+from app.core.security import create_access_token
+from app.services.exports import export_stream
+
+NOW = datetime(2026, 3, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def test_admin(db):
+    """Create a test admin"""
+    admin = User(
+        name="Admin Test",
+        email="admin@example.com",
+        phone="555-0000",
+        password_hash="dummy_hash",
+        role=UserRole.ADMIN
+    )
+    db.add(admin)
+    db.commit()
+    db.refresh(admin)
+    return admin
+
+
+@pytest.fixture
+def admin_headers(test_admin):
+    """Authorization headers for the admin"""
+    token = create_access_token({"sub": test_admin.email})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def test_shop(db):
+    """Three work orders a day apart, each with a two-message thread"""
+    customer = User(name="John Test", email="test@example.com", phone="555-0100", password_hash="x")
+    db.add(customer)
+    db.commit()
+    device = Device(customer_id=customer.id, device_type="Laptop", brand="Dell", model="XPS 13", serial_number="EXP-001")
+    db.add(device)
+    db.commit()
+
+    statuses = [WorkOrderStatus.COMPLETED, WorkOrderStatus.IN_PROGRESS, WorkOrderStatus.COMPLETED]
+    work_orders = [
+        WorkOrder(
+            customer_id=customer.id,
+            device_id=device.id,
+            title=f"Repair, \"part\" {i}",
+            status=status,
+            cost=100.0 + i,
+            created_at=NOW - timedelta(days=i),
+        )
+        for i, status in enumerate(statuses)
+    ]
+    db.add_all(work_orders)
+    db.commit()
+    for work_order in work_orders:
+        db.add_all([
+            Message(
+                work_order_id=work_order.id,
+                sender_id=customer.id,
+                sender_type=SenderType.CUSTOMER,
+                message=f"Question about {work_order.id}\nsecond line",
+                is_read=1,
+                created_at=work_order.created_at + timedelta(hours=1),
+            ),
+            Message(
+                work_order_id=work_order.id,
+                sender_id=99,
+                sender_type=SenderType.TECHNICIAN,
+                message="Answer",
+                is_read=0,
+                created_at=work_order.created_at + timedelta(hours=2),
+            ),
+        ])
+    db.commit()
+    return work_orders
+
+
+def get_export(client, headers, path, **params):
+    response = client.get(f"/api/admin/exports/{path}", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    return response
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_work_orders_ndjson(client, admin_headers, test_shop):
+    response = get_export(client, admin_headers, "work-orders")
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"].startswith('attachment; filename="work-orders-')
+    rows = ndjson(response)
+    assert [row["id"] for row in rows] == sorted(w.id for w in test_shop)
+    first = rows[0]
+    assert first["status"] == "completed"
+    assert first["cost"] == 100.0
+    assert first["customer_email"] == "test@example.com"
+    assert first["serial_number"] == "EXP-001"
+    assert first["created_at"] == NOW.isoformat()
+
+
+def test_work_orders_csv(client, admin_headers, test_shop):
+    response = get_export(client, admin_headers, "work-orders", format="csv")
+
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 3
+    assert rows[0]["title"] == 'Repair, "part" 0'
+    assert rows[0]["cost"] == "100.0"
+    assert rows[0]["status"] == "completed"
+
+
+def test_work_orders_filtered_by_status_and_dates(client, admin_headers, test_shop):
+    completed = ndjson(get_export(client, admin_headers, "work-orders", status="completed"))
+    assert {row["id"] for row in completed} == {test_shop[0].id, test_shop[2].id}
+
+    window = ndjson(get_export(
+        client, admin_headers, "work-orders",
+        created_from=(NOW - timedelta(days=1)).isoformat(), created_to=NOW.isoformat(),
+    ))
+    assert [row["id"] for row in window] == [test_shop[1].id]
+
+
+def test_messages_ndjson_grouped_by_thread(client, admin_headers, test_shop):
+    rows = ndjson(get_export(client, admin_headers, "messages"))
+
+    assert len(rows) == 6
+    assert [row["work_order_id"] for row in rows] == sorted(row["work_order_id"] for row in rows)
+    assert rows[0]["sender_type"] == "customer"
+    assert rows[0]["message"].endswith("\nsecond line")
+
+
+def test_messages_filtered(client, admin_headers, test_shop):
+    by_status = ndjson(get_export(client, admin_headers, "messages", status="in_progress"))
+    assert {row["work_order_id"] for row in by_status} == {test_shop[1].id}
+
+    by_work_order = ndjson(get_export(client, admin_headers, "messages", work_order_id=test_shop[2].id))
+    assert len(by_work_order) == 2
+
+    late = ndjson(get_export(client, admin_headers, "messages", created_from=(NOW + timedelta(minutes=90)).isoformat()))
+    assert [row["message"] for row in late] == ["Answer"]
+
+
+def test_messages_csv_keeps_newlines(client, admin_headers, test_shop):
+    response = get_export(client, admin_headers, "messages", format="csv", work_order_id=test_shop[0].id)
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert rows[0]["message"] == f"Question about {test_shop[0].id}\nsecond line"
+
+
+def test_empty_csv_export_has_header(client, admin_headers, test_shop):
+    response = get_export(client, admin_headers, "work-orders", format="csv", status="cancelled")
+
+    assert response.text.splitlines()[0].startswith("id,status,title,cost")
+    assert len(response.text.splitlines()) == 1
+
+
+@pytest.mark.parametrize("params", [{"format": "xml"}, {"status": "lost"}])
+def test_invalid_parameters(client, admin_headers, test_shop, params):
+    response = client.get("/api/admin/exports/work-orders", params=params, headers=admin_headers)
+
+    assert response.status_code == 400
+
+
+def test_export_requires_admin(client, db, test_shop):
+    technician = User(name="Tech", email="tech@example.com", password_hash="x", role=UserRole.TECHNICIAN)
+    db.add(technician)
+    db.commit()
+    token = create_access_token({"sub": technician.email})
+
+    response = client.get("/api/admin/exports/messages", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 403
+
+
+def test_export_streams_one_chunk_per_batch(db, test_shop, monkeypatch):
+    """Rows are fetched and encoded a batch at a time"""
+    monkeypatch.setattr(settings, "EXPORT_BATCH_ROWS", 2)
+    statement = select(Message.id, Message.message).order_by(Message.id)
+
+    chunks = list(export_stream(db, statement, "ndjson"))
+
+    assert len(chunks) == 3
+    assert all(len(chunk.splitlines()) == 2 for chunk in chunks)
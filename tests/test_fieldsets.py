@@ -0,0 +1,161 @@
+"""
+Tests for sparse fieldsets (?fields=) on list endpoints
+"""
+import pytest
+from datetime import datetime
+
+from app.models.user import User
+from app.models.user_role import UserRole
+from app.models.device import Device
+from app.models.work_order import WorkOrder, WorkOrderStatus
+from app.models.notification import Notification, NotificationType
+from app.core.security import create_access_token
+
+
+@pytest.fixture
+def test_admin(db):
+    """Create a test admin"""
+    admin = User(
+        name="Admin Test",
+        email="admin@example.com",
+        phone="555-0000",
+        password_hash="dummy_hash",
+        role=UserRole.ADMIN
+    )
+    db.add(admin)
+    db.commit()
+    db.refresh(admin)
+    return admin
+
+
+@pytest.fixture
+def test_customer(db):
+    """Create a test customer"""
+    customer = User(
+        name="John Test",
+        email="test@example.com",
+        phone="555-0100",
+        password_hash="dummy_hash",
+        role=UserRole.USER
+    )
+    db.add(customer)
+    db.commit()
+    db.refresh(customer)
+    return customer
+
+
+@pytest.fixture
+def test_work_order(db, test_customer):
+    """Create a test work order with long free-text fields"""
+    device = Device(
+        customer_id=test_customer.id,
+        device_type="Phone",
+        brand="Apple",
+        model="iPhone 14",
+        serial_number="FIELDS-001"
+    )
+    db.add(device)
+    db.commit()
+    db.refresh(device)
+
+    work_order = WorkOrder(
+        customer_id=test_customer.id,
+        device_id=device.id,
+        title="Screen Replacement",
+        description="x" * 2000,
+        technician_notes="y" * 2000,
+        status=WorkOrderStatus.IN_PROGRESS,
+        created_at=datetime.utcnow(),
+        updated_at=datetime.utcnow()
+    )
+    db.add(work_order)
+    db.commit()
+    db.refresh(work_order)
+    return work_order
+
+
+def headers_for(user):
+    """Authorization headers for a user"""
+    return {"Authorization": f"Bearer {create_access_token({'sub': user.email})}"}
+
+
+# ==================== TESTS ====================
+
+def test_work_orders_sparse_fields(client, test_admin, test_work_order):
+    """Only the requested columns (plus id) come back"""
+    response = client.get(
+        "/api/admin/work-orders/?fields=title,status,updated_at",
+        headers=headers_for(test_admin)
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+
+    assert len(data) == 1
+    assert set(data[0].keys()) == {"id", "title", "status", "updated_at"}
+    assert data[0]["status"] == "in_progress"
+
+
+def test_work_orders_without_fields_returns_full_payload(client, test_admin, test_work_order):
+    """Omitting ?fields= keeps the full WorkOrderResponse"""
+    response = client.get(
+        "/api/admin/work-orders/",
+        headers=headers_for(test_admin)
+    )
+
+    assert response.status_code == 200
+    assert "description" in response.json()[0]
+
+
+def test_devices_alias_fields_selectable(client, test_admin, test_customer, test_work_order):
+    """Every field of the default device response can be selected, including the owner_id alias"""
+    full = client.get("/api/admin/devices/", headers=headers_for(test_admin)).json()[0]
+
+    response = client.get(f"/api/admin/devices/?fields={','.join(full)}", headers=headers_for(test_admin))
+    assert response.status_code == 200, response.text
+    assert response.json() == [full]
+
+    response = client.get("/api/admin/devices/?fields=owner_id", headers=headers_for(test_admin))
+    assert response.json() == [{"id": full["id"], "owner_id": test_customer.id}]
+
+
+def test_invalid_field_rejected(client, test_admin, test_work_order):
+    """Fields that aren't on the response schema are rejected"""
+    response = client.get(
+        "/api/admin/work-orders/?fields=title,password_hash",
+        headers=headers_for(test_admin)
+    )
+
+    assert response.status_code == 400
+    assert "password_hash" in response.json()["detail"]
+
+
+def test_users_cannot_select_password_hash(client, test_admin):
+    """password_hash is a column but not part of UserResponse"""
+    response = client.get(
+        "/api/admin/users/?fields=password_hash",
+        headers=headers_for(test_admin)
+    )
+
+    assert response.status_code == 400
+
+
+def test_notifications_sparse_fields(client, db, test_customer, test_work_order):
+    """Customer notification list supports ?fields="""
+    db.add(Notification(
+        user_id=test_customer.id,
+        work_order_id=test_work_order.id,
+        type=NotificationType.STATUS_CHANGE,
+        title="Status updated",
+        message="Your repair status changed",
+        read=False
+    ))
+    db.commit()
+
+    response = client.get(
+        "/api/customers/notifications/?fields=title,read",
+        headers=headers_for(test_customer)
+    )
+
+    assert response.status_code == 200
+    assert response.json() == [{"id": 1, "title": "Status updated", "read": False}]
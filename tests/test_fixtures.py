@@ -0,0 +1,43 @@
+"""
+Tests for the shared transactional fixtures in conftest.py
+"""
+import pytest
+from sqlalchemy import func, select
+
+from app.core.security import get_password_hash
+from app.models.user import User
+
+
+@pytest.mark.parametrize("run", [1, 2])
+def test_commits_rolled_back_between_tests(db, run):
+    """Whichever run goes second still starts from an empty table"""
+    assert db.scalar(select(func.count()).select_from(User)) == 0
+
+    db.add(User(name="Rollback Test", email="rollback@example.com", phone="555-0100", password_hash="dummy_hash"))
+    db.commit()
+
+    assert db.scalar(select(func.count()).select_from(User)) == 1
+
+
+def test_rollback_inside_test_keeps_earlier_commits(db):
+    """session.rollback() only undoes work since the last commit"""
+    db.add(User(name="Kept", email="kept@example.com", phone="555-0100", password_hash="dummy_hash"))
+    db.commit()
+    db.add(User(name="Dropped", email="dropped@example.com", phone="555-0101", password_hash="dummy_hash"))
+    db.flush()
+    db.rollback()
+
+    assert db.scalars(select(User.email)).all() == ["kept@example.com"]
+
+
+def test_login_with_fast_hash(client, db):
+    """Passwords hash at the minimum bcrypt cost in tests and still log in"""
+    password_hash = get_password_hash("customer123")
+    db.add(User(name="Fast Hash", email="fast@example.com", phone="555-0100", password_hash=password_hash))
+    db.commit()
+
+    response = client.post("/api/auth/login", data={"username": "fast@example.com", "password": "customer123"})
+
+    assert password_hash.startswith("$2b$04$")
+    assert response.status_code == 200
+    assert response.json()["access_token"]
@@ -0,0 +1,190 @@
+"""
+Tests for Idempotency-Key replay on POST endpoints
+"""
+import pytest
+from datetime import datetime
+
+from app.core import idempotency
+from app.core.idempotency import (
+    MemoryIdempotencyStore, DatabaseIdempotencyStore, StoredResponse,
+    NEW, PENDING, DONE, MISMATCH
+)
+from app.models.user import User
+from app.models.device import Device
+from app.models.work_order import WorkOrder, WorkOrderStatus
+from app.models.message import Message
+from app.core.security import create_access_token
+
+
+@pytest.fixture(scope="function")
+def client(client, monkeypatch):
+    """Shared test client with an empty idempotency store"""
+    monkeypatch.setattr(idempotency, "store", MemoryIdempotencyStore(
+        ttl_seconds=60, max_entries=100, lock_timeout=60
+    ))
+    return client
+
+
+@pytest.fixture
+def test_customer(db):
+    """Create a test customer"""
+    customer = User(
+        name="John Test",
+        email="test@example.com",
+        phone="555-0100",
+        password_hash="dummy_hash"
+    )
+    db.add(customer)
+    db.commit()
+    db.refresh(customer)
+    return customer
+
+
+@pytest.fixture
+def test_device(db, test_customer):
+    """Create a test device"""
+    device = Device(
+        customer_id=test_customer.id,
+        device_type="Phone",
+        serial_number="IDEM-001"
+    )
+    db.add(device)
+    db.commit()
+    db.refresh(device)
+    return device
+
+
+@pytest.fixture
+def test_work_order(db, test_customer, test_device):
+    """Create a test work order"""
+    work_order = WorkOrder(
+        customer_id=test_customer.id,
+        device_id=test_device.id,
+        title="Screen Replacement",
+        status=WorkOrderStatus.IN_PROGRESS,
+        created_at=datetime.utcnow()
+    )
+    db.add(work_order)
+    db.commit()
+    db.refresh(work_order)
+    return work_order
+
+
+@pytest.fixture
+def auth_headers(test_customer):
+    """Create authorization headers"""
+    token = create_access_token({"sub": test_customer.email})
+    return {"Authorization": f"Bearer {token}"}
+
+
+# ==================== ENDPOINT TESTS ====================
+
+def test_send_message_replayed(client, db, auth_headers, test_work_order):
+    """A retry with the same key returns the first response and creates no new row"""
+    headers = {**auth_headers, "Idempotency-Key": "abc-123"}
+    url = f"/api/customers/messages/work-order/{test_work_order.id}"
+
+    first = client.post(url, headers=headers, json={"message": "Any update?"})
+    second = client.post(url, headers=headers, json={"message": "Any update?"})
+
+    assert first.status_code == 201
+    assert second.status_code == 201
+    assert second.json() == first.json()
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert db.query(Message).count() == 1
+
+
+def test_send_message_without_key_not_deduped(client, db, auth_headers, test_work_order):
+    """Without the header every request runs"""
+    url = f"/api/customers/messages/work-order/{test_work_order.id}"
+
+    client.post(url, headers=auth_headers, json={"message": "Hello"})
+    client.post(url, headers=auth_headers, json={"message": "Hello"})
+
+    assert db.query(Message).count() == 2
+
+
+def test_key_reused_with_different_body(client, auth_headers, test_work_order):
+    """Reusing a key for a different payload is rejected"""
+    headers = {**auth_headers, "Idempotency-Key": "abc-123"}
+    url = f"/api/customers/messages/work-order/{test_work_order.id}"
+
+    client.post(url, headers=headers, json={"message": "First"})
+    response = client.post(url, headers=headers, json={"message": "Second"})
+
+    assert response.status_code == 422
+
+
+def test_failed_request_not_stored(client, db, auth_headers, test_work_order):
+    """Error responses are not replayed, so a corrected retry runs for real"""
+    headers = {**auth_headers, "Idempotency-Key": "abc-123"}
+
+    missing = client.post(
+        "/api/customers/messages/work-order/99999",
+        headers=headers,
+        json={"message": "Hello"}
+    )
+    retry = client.post(
+        "/api/customers/messages/work-order/99999",
+        headers=headers,
+        json={"message": "Hello"}
+    )
+
+    assert missing.status_code == 404
+    assert retry.status_code == 404
+    assert "Idempotent-Replayed" not in retry.headers
+
+
+# ==================== STORE TESTS ====================
+
+def test_memory_store_lifecycle():
+    """begin -> PENDING for duplicates -> DONE after complete"""
+    store = MemoryIdempotencyStore(ttl_seconds=60, max_entries=10, lock_timeout=60)
+
+    assert store.begin("u", "k", "h") == (NEW, None)
+    assert store.begin("u", "k", "h") == (PENDING, None)
+    assert store.begin("u", "k", "other") == (MISMATCH, None)
+
+    stored = StoredResponse(status_code=201, body=b"{}", media_type="application/json")
+    store.complete("u", "k", stored)
+    assert store.begin("u", "k", "h") == (DONE, stored)
+
+    # Keys are scoped per user
+    assert store.begin("someone-else", "k", "h") == (NEW, None)
+
+
+def test_memory_store_is_bounded():
+    """Oldest entries are evicted once max_entries is reached"""
+    store = MemoryIdempotencyStore(ttl_seconds=60, max_entries=2, lock_timeout=60)
+
+    for key in ["a", "b", "c"]:
+        store.begin("u", key, "h")
+
+    assert store.begin("u", "a", "h") == (NEW, None)
+
+
+def test_memory_store_ttl():
+    """Expired entries are treated as new"""
+    store = MemoryIdempotencyStore(ttl_seconds=0, max_entries=10, lock_timeout=60)
+    store.begin("u", "k", "h")
+    store.complete("u", "k", StoredResponse(201, b"{}", "application/json"))
+
+    assert store.begin("u", "k", "h") == (NEW, None)
+
+
+def test_database_store_lifecycle(session_factory):
+    """Database backend claims keys with a unique row and replays the stored body"""
+    store = DatabaseIdempotencyStore(ttl_seconds=60, lock_timeout=60, session_factory=session_factory)
+
+    assert store.begin("u", "k", "h") == (NEW, None)
+    assert store.begin("u", "k", "h") == (PENDING, None)
+
+    store.complete("u", "k", StoredResponse(201, b'{"id": 1}', "application/json"))
+    state, stored = store.begin("u", "k", "h")
+
+    assert state == DONE
+    assert stored.status_code == 201
+    assert stored.body == b'{"id": 1}'
+
+    store.release("u", "k")
+    assert store.begin("u", "k", "h") == (NEW, None)
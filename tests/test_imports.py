@@ -0,0 +1,245 @@
+"""
+Tests for the streaming bulk import of devices and work orders
+"""
+import asyncio
+import json
+import pytest
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.user import User
+from app.models.user_role import UserRole
+from app.models.device import Device
+from app.models.work_order import WorkOrder, WorkOrderStatus
+from app.core import security
+from app.core.security import create_access_token, hash_passwords, verify_password
+from app.services.imports import file_chunks, run_import, text_lines
+from app.services.typeahead import typeahead
+
+
+@pytest.fixture
+def test_admin(db):
+    """Create a test admin"""
+    admin = User(
+        name="Admin Test",
+        email="admin@example.com",
+        phone="555-0000",
+        password_hash="dummy_hash",
+        role=UserRole.ADMIN
+    )
+    db.add(admin)
+    db.commit()
+    db.refresh(admin)
+    return admin
+
+
+@pytest.fixture
+def admin_headers(test_admin):
+    """Authorization headers for the admin"""
+    token = create_access_token({"sub": test_admin.email})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def test_customer(db):
+    """A customer who already owns one device"""
+    customer = User(name="Corp Customer", email="it@corp.example.com", password_hash="x")
+    db.add(customer)
+    db.commit()
+    device = Device(customer_id=customer.id, device_type="Laptop", brand="Dell", model="XPS 13", serial_number="CORP-000")
+    db.add(device)
+    db.commit()
+    return customer
+
+
+def read_lines(*chunks):
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    async def collect():
+        return [line async for line in text_lines(stream())]
+
+    return asyncio.run(collect())
+
+
+def test_text_lines_across_chunk_boundaries():
+    data = "\ufeffname\nJosé\nZoë".encode()
+    split = data.index("é".encode()) + 1
+
+    assert read_lines(data[:2], data[2:split], data[split:]) == ["name\n", "José\n", "Zoë"]
+
+
+def post_import(client, headers, path, body, **params):
+    response = client.post(f"/api/admin/imports/{path}", params=params, content=body, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def serials(db, customer):
+    return db.scalars(select(Device.serial_number).where(Device.customer_id == customer.id).order_by(Device.id)).all()
+
+
+def test_import_devices_ndjson(client, db, admin_headers, test_customer):
+    lines = [
+        {"owner_id": test_customer.id, "device_type": "Laptop", "brand": "Lenovo", "model": "T14", "serial_number": f"CORP-{i:03}"}
+        for i in range(1, 4)
+    ]
+    body = "\n".join(json.dumps(line) for line in lines) + "\n"
+
+    report = post_import(client, admin_headers, "devices", body)
+
+    assert report == {"rows": 3, "created": 3, "failed": 0, "errors": []}
+    assert serials(db, test_customer) == ["CORP-000", "CORP-001", "CORP-002", "CORP-003"]
+
+
+def test_import_devices_csv_reports_bad_rows(client, db, admin_headers, test_customer):
+    owner = test_customer.id
+    body = (
+        "﻿owner_id,device_type,brand,model,serial_number\r\n"
+        f"{owner},Laptop,Lenovo,\"T14, gen 2\",CORP-001\r\n"
+        f"{owner},Laptop,Lenovo,T14,CORP-000\r\n"
+        f"{owner},Laptop,Lenovo,T14,CORP-001\r\n"
+        f"999999,Laptop,Lenovo,T14,CORP-002\r\n"
+        f"{owner},,Lenovo,T14,CORP-003\r\n"
+        f"{owner},Printer,HP,\"Laser\nJet\",\r\n"
+        f"{owner},Printer,HP\r\n"
+    )
+
+    report = post_import(client, admin_headers, "devices", body, format="csv")
+
+    assert report["rows"] == 7
+    assert report["created"] == 2
+    assert [(error["row"], error["error"].split(" ")[0]) for error in report["errors"]] == [
+        (2, "Duplicate"), (3, "Duplicate"), (4, "Unknown"), (5, "device_type:"), (7, "Expected"),
+    ]
+    models = db.scalars(select(Device.model).where(Device.customer_id == owner).order_by(Device.id)).all()
+    assert models == ["XPS 13", "T14, gen 2", "Laser\nJet"]
+
+
+def test_import_devices_in_batches(client, db, admin_headers, test_customer, monkeypatch):
+    """Duplicates are caught across batches too: earlier batches are already in the table"""
+    monkeypatch.setattr(settings, "IMPORT_BATCH_ROWS", 2)
+    lines = [
+        {"owner_id": test_customer.id, "device_type": "Phone", "serial_number": serial}
+        for serial in ["P-1", "P-2", "P-3", "P-1", "P-4"]
+    ]
+
+    report = post_import(client, admin_headers, "devices", "\n".join(json.dumps(line) for line in lines))
+
+    assert report["created"] == 4
+    assert report["errors"] == [{"row": 4, "error": "Duplicate serial_number P-1"}]
+
+
+def test_imported_devices_reach_typeahead(client, db, admin_headers, test_customer):
+    typeahead.rebuild(db)
+    body = json.dumps({"owner_id": test_customer.id, "device_type": "Tablet", "brand": "Apple", "model": "iPad Zyx", "serial_number": "TAB-9"})
+
+    post_import(client, admin_headers, "devices", body)
+
+    assert [entry["serial_number"] for entry in typeahead.suggest("devices", "ipad zyx", 5)] == ["TAB-9"]
+
+
+def test_error_report_is_capped(client, admin_headers, test_customer, monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_MAX_ERRORS", 2)
+
+    report = post_import(client, admin_headers, "devices", "not json\n[1]\n{}\n")
+
+    assert report["failed"] == 3
+    assert report["errors"] == [{"row": 1, "error": "Invalid JSON"}, {"row": 2, "error": "Expected a JSON object"}]
+
+
+def test_import_work_orders(client, db, admin_headers, test_customer):
+    device_id = db.scalar(select(Device.id).where(Device.serial_number == "CORP-000"))
+    body = (
+        "device_id,title,status\n"
+        f"{device_id},Battery swap,\n"
+        f"{device_id},Screen repair,diagnosed\n"
+        f"{device_id},Keyboard,broken\n"
+        "999999,Fan noise,\n"
+    )
+
+    report = post_import(client, admin_headers, "work-orders", body, format="csv")
+
+    assert report["created"] == 2
+    assert [error["row"] for error in report["errors"]] == [3, 4]
+    work_orders = db.scalars(select(WorkOrder).where(WorkOrder.device_id == device_id).order_by(WorkOrder.id)).all()
+    assert [(w.title, w.status, w.customer_id) for w in work_orders] == [
+        ("Battery swap", WorkOrderStatus.PENDING, test_customer.id),
+        ("Screen repair", WorkOrderStatus.DIAGNOSED, test_customer.id),
+    ]
+
+
+def test_invalid_utf8_stops_import(client, db, admin_headers, test_customer):
+    body = json.dumps({"owner_id": test_customer.id, "device_type": "Phone", "serial_number": "U-1"}).encode() + b"\n\xff\xfe\n"
+
+    report = post_import(client, admin_headers, "devices", body)
+
+    assert report["created"] == 1
+    assert report["errors"] == [{"row": 2, "error": "Not valid UTF-8, import stopped"}]
+
+
+def test_import_users_csv(client, db, admin_headers, test_customer):
+    body = (
+        "name,email,password,role,phone\n"
+        "Tina Tech,tina@shop.example.com,s3cret-1,technician,555-0101\n"
+        "Carl Customer,carl@corp.example.com,s3cret-2,,\n"
+        "Again,it@corp.example.com,s3cret-3,,\n"
+        "Carl Twice,carl@corp.example.com,s3cret-4,,\n"
+        "No Password,nopass@corp.example.com,,,\n"
+        "Bad Email,not-an-email,s3cret-5,,\n"
+    )
+
+    report = post_import(client, admin_headers, "users", body, format="csv")
+
+    assert report["created"] == 2
+    assert [error["row"] for error in report["errors"]] == [3, 4, 5, 6]
+    assert report["errors"][0]["error"] == "Email already registered: it@corp.example.com"
+    tina = db.scalar(select(User).where(User.email == "tina@shop.example.com"))
+    carl = db.scalar(select(User).where(User.email == "carl@corp.example.com"))
+    assert (tina.role, tina.phone) == (UserRole.TECHNICIAN, "555-0101")
+    assert carl.role == UserRole.USER
+    assert verify_password("s3cret-2", carl.password_hash)
+    assert typeahead.suggest("users", "tina t", 5)[0]["id"] == tina.id
+
+
+def test_import_users_from_file_in_batches(db, test_customer, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_USER_BATCH_ROWS", 2)
+    path = tmp_path / "roster.ndjson"
+    path.write_text("".join(
+        json.dumps({"name": f"Staff {i}", "email": f"staff{i}@shop.example.com", "password": f"pw-{i}"}) + "\n"
+        for i in range(5)
+    ))
+
+    report = asyncio.run(run_import(db, "users", file_chunks(str(path), size=16), "ndjson"))
+
+    assert report == {"rows": 5, "created": 5, "failed": 0, "errors": []}
+
+
+def test_hash_passwords_in_process_pool(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 2)
+    monkeypatch.setattr(security, "_hash_pool", None)
+    passwords = [f"password-{i}" for i in range(4)]
+
+    try:
+        hashes = hash_passwords(passwords)
+        assert security._hash_pool is not None
+    finally:
+        if security._hash_pool is not None:
+            security._hash_pool.shutdown()
+
+    assert len(set(hashes)) == 4
+    assert all(verify_password(password, hashed) for password, hashed in zip(passwords, hashes))
+
+
+def test_import_permissions_and_format(client, db, admin_headers, test_customer):
+    assert client.post("/api/admin/imports/devices?format=xlsx", content="", headers=admin_headers).status_code == 400
+
+    technician = User(name="Tech", email="tech@example.com", password_hash="x", role=UserRole.TECHNICIAN)
+    db.add(technician)
+    db.commit()
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': technician.email})}"}
+    assert client.post("/api/admin/imports/devices", content="", headers=headers).status_code == 403
+    assert client.post("/api/admin/imports/users", content="", headers=headers).status_code == 403
+    assert client.post("/api/admin/imports/work-orders", content="", headers=headers).status_code == 200
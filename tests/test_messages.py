@@ -3,55 +3,19 @@ Tests for messaging system API endpoints
 Comprehensive tests for customer-technician communication
 """
 import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 from datetime import datetime
 
-from app.main import app
-from app.db.session import get_db
-from app.db.base_class import Base
-from app.models.user import Customer
+from app.models.user import User
+from app.models.device import Device
 from app.models.work_order import WorkOrder, WorkOrderStatus
 from app.models.message import Message, SenderType
 from app.core.security import create_access_token
 
-# Test database setup
-TEST_DATABASE_URL = "sqlite:///./test_messages.db"
-engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-
-@pytest.fixture(scope="function")
-def db():
-    """Create a fresh database for each test"""
-    Base.metadata.create_all(bind=engine)
-    db = TestingSessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-        Base.metadata.drop_all(bind=engine)
-
-
-@pytest.fixture(scope="function")
-def client(db):
-    """Create test client with database override"""
-    def override_get_db():
-        try:
-            yield db
-        finally:
-            pass
-    
-    app.dependency_overrides[get_db] = override_get_db
-    yield TestClient(app)
-    app.dependency_overrides.clear()
-
 
 @pytest.fixture
 def test_customer(db):
     """Create a test customer"""
-    customer = Customer(
+    customer = User(
         name="John Test",
         email="test@example.com",
         phone="555-0100",
@@ -66,7 +30,7 @@ def test_customer(db):
 @pytest.fixture
 def test_technician(db):
     """Create a test technician"""
-    tech = Customer(
+    tech = User(
         name="Tech Support",
         email="tech@example.com",
         phone="555-0200",
@@ -81,8 +45,13 @@ def test_technician(db):
 @pytest.fixture
 def test_work_order(db, test_customer, test_technician):
     """Create a test work order"""
+    device = Device(customer_id=test_customer.id, device_type="Phone", brand="Apple", model="iPhone 13")
+    db.add(device)
+    db.commit()
+
     work_order = WorkOrder(
         customer_id=test_customer.id,
+        device_id=device.id,
         title="Screen Replacement",
         description="iPhone screen cracked, needs replacement",
         status=WorkOrderStatus.IN_PROGRESS,
@@ -179,7 +148,7 @@ def test_get_message_thread_unauthorized(client, test_work_order):
 def test_get_message_thread_wrong_customer(client, db, test_work_order):
     """Test getting messages for someone else's work order"""
     # Create another customer
-    other_customer = Customer(
+    other_customer = User(
         name="Other User",
         email="other@example.com",
         phone="555-9999",
@@ -0,0 +1,158 @@
+"""
+Tests for request/DB metrics and the /metrics endpoint
+"""
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.metrics import MetricsRegistry, MetricsMiddleware, render, is_internal_client
+from app.db.instrumentation import instrument_engine
+
+# Private in-memory engine - the routes only run constant SELECTs, no schema needed
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+instrument_engine(engine)
+
+
+@pytest.fixture
+def fresh_registry(monkeypatch):
+    """Empty single-process registry for each test"""
+    registry = MetricsRegistry()
+    monkeypatch.setattr(metrics, "registry", registry)
+    monkeypatch.setattr(settings, "METRICS_ENABLED", True)
+    monkeypatch.setattr(settings, "METRICS_MULTIPROC_DIR", "")
+    return registry
+
+
+@pytest.fixture
+def client(fresh_registry):
+    """Small app with a route that runs two SQL statements"""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        return {"id": item_id}
+
+    return TestClient(app)
+
+
+# ==================== REGISTRY TESTS ====================
+
+def test_histogram_buckets_are_cumulative():
+    """Rendered buckets are cumulative and end with +Inf"""
+    registry = MetricsRegistry()
+    labels = (("route", "/x"),)
+    registry.observe("http_request_duration_seconds", labels, 0.003, (0.005, 0.1))
+    registry.observe("http_request_duration_seconds", labels, 0.05, (0.005, 0.1))
+    registry.observe("http_request_duration_seconds", labels, 3.0, (0.005, 0.1))
+
+    output = render(registry, [])
+
+    assert '# TYPE http_request_duration_seconds histogram' in output
+    assert 'http_request_duration_seconds_bucket{route="/x",le="0.005"} 1' in output
+    assert 'http_request_duration_seconds_bucket{route="/x",le="0.1"} 2' in output
+    assert 'http_request_duration_seconds_bucket{route="/x",le="+Inf"} 3' in output
+    assert 'http_request_duration_seconds_count{route="/x"} 3' in output
+
+
+def test_merge_adds_worker_snapshots():
+    """Snapshots from several workers add up"""
+    labels = (("route", "/x"),)
+    worker_a = MetricsRegistry()
+    worker_b = MetricsRegistry()
+    worker_a.inc("http_requests_total", labels)
+    worker_b.inc("http_requests_total", labels, 2)
+    worker_a.observe("db_queries_per_request", labels, 1, (1, 5))
+    worker_b.observe("db_queries_per_request", labels, 4, (1, 5))
+
+    merged = MetricsRegistry()
+    merged.merge(worker_a.snapshot())
+    merged.merge(worker_b.snapshot())
+
+    assert merged.counters[("http_requests_total", labels)] == 3
+    assert merged.histograms[("db_queries_per_request", labels)][1] == [1, 1, 0]
+
+
+def test_internal_client_check():
+    """Only loopback and private addresses may scrape"""
+    assert is_internal_client("127.0.0.1")
+    assert is_internal_client("10.1.2.3")
+    assert not is_internal_client("8.8.8.8")
+    assert not is_internal_client("testclient")
+    assert not is_internal_client(None)
+
+
+# ==================== MIDDLEWARE TESTS ====================
+
+def test_requests_labelled_by_route_template(client, fresh_registry):
+    """Raw ids never become label values"""
+    client.get("/items/1")
+    client.get("/items/2")
+
+    labels = (("method", "GET"), ("route", "/items/{item_id}"), ("status", "200"))
+    assert fresh_registry.counters[("http_requests_total", labels)] == 2
+
+
+def test_db_statements_counted_per_request(client, fresh_registry):
+    """Cursor events feed the per-request query histogram"""
+    client.get("/items/1")
+
+    labels = (("method", "GET"), ("route", "/items/{item_id}"))
+    buckets, counts, total, count = fresh_registry.histograms[("db_queries_per_request", labels)]
+    assert count == 1
+    assert total == 2
+
+
+def test_unmatched_paths_share_one_label(client, fresh_registry):
+    """404s don't create a series per path"""
+    client.get("/nope/1")
+    client.get("/nope/2")
+
+    labels = (("method", "GET"), ("route", "unmatched"), ("status", "404"))
+    assert fresh_registry.counters[("http_requests_total", labels)] == 2
+
+
+def test_multiprocess_snapshots_merged(fresh_registry, tmp_path, monkeypatch):
+    """Live workers' snapshot files are merged; dead workers' files are removed"""
+    monkeypatch.setattr(settings, "METRICS_MULTIPROC_DIR", str(tmp_path))
+    labels = (("route", "/x"),)
+    fresh_registry.inc("http_requests_total", labels)
+
+    other = MetricsRegistry()
+    other.inc("http_requests_total", labels, 4)
+    (tmp_path / "metrics_999999.json").write_text('{"counters": [], "histograms": []}')
+    monkeypatch.setattr(metrics, "pid_alive", lambda pid: pid != 999999)
+    metrics.flush_snapshot(force=True)
+    (tmp_path / "metrics_1.json").write_text(json.dumps(other.snapshot()))
+
+    merged = metrics.collect()
+
+    assert merged.counters[("http_requests_total", labels)] == 5
+    assert not (tmp_path / "metrics_999999.json").exists()
+
+
+# ==================== ENDPOINT TESTS ====================
+
+def test_metrics_endpoint(fresh_registry, monkeypatch):
+    """/metrics serves the text format to internal clients only"""
+    from app.main import app
+
+    client = TestClient(app)
+    assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setattr(settings, "METRICS_PRIVATE_ONLY", False)
+    client.get("/api/health")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_requests_total{method="GET",route="/api/health",status="200"} 1' in response.text
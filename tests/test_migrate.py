@@ -0,0 +1,76 @@
+"""
+Tests for the production migration step (app.db.migrate)
+"""
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import create_engine, inspect
+
+from app.db.base_class import Base
+from app.db.migrate import LEGACY_REVISION, migrate
+from app.models import user, device, work_order, message, notification, idempotency_key  # noqa: F401
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'migrate.db'}"
+
+
+def test_fresh_database_upgraded_to_head(database_url):
+    """An empty database gets every table from the migrations"""
+    result = migrate(database_url)
+
+    assert result["from"] is None
+    assert result["upgraded"] is True
+    engine = create_engine(database_url)
+    assert set(Base.metadata.tables) <= set(inspect(engine).get_table_names())
+    engine.dispose()
+
+
+def test_second_run_is_a_no_op(database_url):
+    """Replicas booting after the first find the schema at head"""
+    first = migrate(database_url)
+    second = migrate(database_url)
+
+    assert second["from"] == first["to"]
+    assert second["upgraded"] is False
+
+
+def test_legacy_create_all_database_stamped(database_url):
+    """A database built by create_all is adopted instead of re-created"""
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+
+    result = migrate(database_url)
+
+    assert result["from"] == LEGACY_REVISION
+    assert result["to"] != LEGACY_REVISION
+
+
+def test_baseline_database_gets_newer_tables(database_url):
+    """A database from the original create_all boot (no idempotency_keys) gets the tables added since"""
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine, tables=[
+        table for table in Base.metadata.sorted_tables if table.name != "idempotency_keys"
+    ])
+    engine.dispose()
+
+    result = migrate(database_url)
+
+    assert result["from"] == LEGACY_REVISION
+    engine = create_engine(database_url)
+    assert inspect(engine).has_table("idempotency_keys")
+    engine.dispose()
+
+
+def test_migrations_match_models(database_url):
+    """Migrated schema has every table, column and index the models declare"""
+    migrate(database_url)
+
+    engine = create_engine(database_url)
+    with engine.connect() as conn:
+        diffs = compare_metadata(MigrationContext.configure(conn), Base.metadata)
+    engine.dispose()
+    missing = [diff for diff in diffs if isinstance(diff, tuple) and diff[0] in ("add_table", "add_column", "add_index")]
+    assert missing == []
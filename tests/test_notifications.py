@@ -2,55 +2,21 @@
 Tests for notification system API endpoints
 """
 import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 from datetime import datetime
 
-from app.main import app
-from app.db.session import get_db
-from app.db.base_class import Base
-from app.models.user import Customer
+from app.models.user import User
+from app.models.device import Device
 from app.models.work_order import WorkOrder, WorkOrderStatus
 from app.models.notification import Notification, NotificationType
+from app.models.message import Message, SenderType
 from app.core.security import create_access_token
-
-# Test database setup
-TEST_DATABASE_URL = "sqlite:///./test_notifications.db"
-engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-
-@pytest.fixture(scope="function")
-def db():
-    """Create a fresh database for each test"""
-    Base.metadata.create_all(bind=engine)
-    db = TestingSessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-        Base.metadata.drop_all(bind=engine)
-
-
-@pytest.fixture(scope="function")
-def client(db):
-    """Create test client with database override"""
-    def override_get_db():
-        try:
-            yield db
-        finally:
-            pass
-    
-    app.dependency_overrides[get_db] = override_get_db
-    yield TestClient(app)
-    app.dependency_overrides.clear()
+from app.services import create_message_notification
 
 
 @pytest.fixture
 def test_customer(db):
     """Create a test customer"""
-    customer = Customer(
+    customer = User(
         name="John Test",
         email="test@example.com",
         phone="555-0100",
@@ -65,8 +31,13 @@ def test_customer(db):
 @pytest.fixture
 def test_work_order(db, test_customer):
     """Create a test work order"""
+    device = Device(customer_id=test_customer.id, device_type="Phone", brand="Apple", model="iPhone 13")
+    db.add(device)
+    db.commit()
+
     work_order = WorkOrder(
         customer_id=test_customer.id,
+        device_id=device.id,
         title="Screen Replacement",
         description="iPhone screen cracked",
         status=WorkOrderStatus.IN_PROGRESS,
@@ -83,7 +54,7 @@ def test_notifications(db, test_customer, test_work_order):
     """Create test notifications"""
     notifications = [
         Notification(
-            customer_id=test_customer.id,
+            user_id=test_customer.id,
             work_order_id=test_work_order.id,
             type=NotificationType.MESSAGE,
             title="New message from technician",
@@ -92,7 +63,7 @@ def test_notifications(db, test_customer, test_work_order):
             created_at=datetime.utcnow()
         ),
         Notification(
-            customer_id=test_customer.id,
+            user_id=test_customer.id,
             work_order_id=test_work_order.id,
             type=NotificationType.STATUS_CHANGE,
             title="Status updated",
@@ -101,7 +72,7 @@ def test_notifications(db, test_customer, test_work_order):
             created_at=datetime.utcnow()
         ),
         Notification(
-            customer_id=test_customer.id,
+            user_id=test_customer.id,
             work_order_id=test_work_order.id,
             type=NotificationType.COMPLETED,
             title="Repair completed",
@@ -216,7 +187,7 @@ def test_mark_nonexistent_notification_as_read(client, auth_headers):
 def test_mark_other_users_notification_as_read(client, db, test_notifications):
     """Test that user cannot mark another user's notification as read"""
     # Create another user
-    other_user = Customer(
+    other_user = User(
         name="Other User",
         email="other@example.com",
         phone="555-9999",
@@ -292,13 +263,14 @@ def test_unread_count_after_marking_read(client, auth_headers, test_notification
     assert data["unread_count"] == 1  # Should be 1 now
 
 
-def test_notification_ordering(client, auth_headers, db, test_customer):
+def test_notification_ordering(client, auth_headers, db, test_customer, test_work_order):
     """Test that notifications are ordered by creation time (newest first)"""
     # Create notifications with different timestamps
     import time
     
     old_notif = Notification(
-        customer_id=test_customer.id,
+        user_id=test_customer.id,
+        work_order_id=test_work_order.id,
         type=NotificationType.MESSAGE,
         title="Old notification",
         message="This is old",
@@ -311,7 +283,8 @@ def test_notification_ordering(client, auth_headers, db, test_customer):
     time.sleep(0.1)
     
     new_notif = Notification(
-        customer_id=test_customer.id,
+        user_id=test_customer.id,
+        work_order_id=test_work_order.id,
         type=NotificationType.MESSAGE,
         title="New notification",
         message="This is new",
@@ -363,6 +336,17 @@ def test_notification_types_are_valid(client, auth_headers, test_notifications):
         assert notif["type"] in valid_types
 
 
+def test_message_notification_helper(db, test_customer, test_work_order):
+    """Technician messages notify the work order's customer; customer messages don't"""
+    technician_message = Message(work_order_id=test_work_order.id, sender_id=99, sender_type=SenderType.TECHNICIAN, message="Ready")
+    customer_message = Message(work_order_id=test_work_order.id, sender_id=test_customer.id, sender_type=SenderType.CUSTOMER, message="Thanks")
+
+    notification = create_message_notification(db, technician_message, test_work_order)
+
+    assert (notification.user_id, notification.read) == (test_customer.id, False)
+    assert create_message_notification(db, customer_message, test_work_order) is None
+
+
 # ==================== RUN TESTS ====================
 
 if __name__ == "__main__":
@@ -0,0 +1,81 @@
+"""
+Tests for the prebuilt OpenAPI schema (OPENAPI_CACHE_FILE) and lazy password hashing
+"""
+import json
+
+from fastapi import FastAPI
+
+from app.core import security
+from app.core.openapi import load_openapi_cache, use_openapi_cache, write_openapi_cache
+from app.main import app as main_app
+
+
+def make_app():
+    app = FastAPI(title="Cache Test")
+
+    @app.get("/items")
+    def list_items():
+        return []
+
+    return app
+
+
+def test_cached_schema_served_without_generation(tmp_path):
+    """A matching cache file is served as-is instead of generating the schema"""
+    path = str(tmp_path / "openapi.json")
+    write_openapi_cache(make_app(), path)
+    with open(path) as f:
+        cached = json.load(f)
+    cached["openapi"]["info"]["title"] = "From Cache"
+    with open(path, "w") as f:
+        json.dump(cached, f)
+
+    app = make_app()
+    use_openapi_cache(app, path)
+
+    assert app.openapi()["info"]["title"] == "From Cache"
+    assert list(app.openapi()["paths"]) == ["/items"]
+
+
+def test_stale_cache_falls_back_to_generation(tmp_path):
+    """A cache built for different routes is ignored"""
+    path = str(tmp_path / "openapi.json")
+    write_openapi_cache(make_app(), path)
+
+    app = make_app()
+
+    @app.get("/new")
+    def new_route():
+        return {}
+
+    assert load_openapi_cache(app, path) is None
+    use_openapi_cache(app, path)
+    assert set(app.openapi()["paths"]) == {"/items", "/new"}
+
+
+def test_missing_cache_file_generates(tmp_path):
+    app = make_app()
+    use_openapi_cache(app, str(tmp_path / "missing.json"))
+
+    assert list(app.openapi()["paths"]) == ["/items"]
+
+
+def test_prebuilt_schema_matches_generated(tmp_path):
+    """The build step writes exactly what /openapi.json would generate"""
+    path = str(tmp_path / "openapi.json")
+    schema = write_openapi_cache(main_app, path)
+
+    assert load_openapi_cache(main_app, path) == schema
+    assert "/api/health" in schema["paths"]
+
+
+def test_password_context_built_on_first_use():
+    """Importing security does not build the bcrypt context; hashing does, once"""
+    security.get_pwd_context.cache_clear()
+    assert security.get_pwd_context.cache_info().currsize == 0
+
+    hashed = security.get_password_hash("secret")
+
+    assert security.verify_password("secret", hashed)
+    assert not security.verify_password("wrong", hashed)
+    assert security.get_pwd_context.cache_info().currsize == 1
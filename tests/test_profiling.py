@@ -0,0 +1,211 @@
+"""
+Tests for the request sampling profiler and admin profile endpoints
+"""
+import pstats
+import sys
+import time
+from collections import Counter
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core import profiling
+from app.core.config import settings
+from app.core.profiling import ProfilingMiddleware, StackSampler, to_collapsed, write_profile
+from app.core.security import create_access_token
+from app.models.user import User
+from app.models.user_role import UserRole
+
+
+@pytest.fixture
+def profile_settings(tmp_path, monkeypatch):
+    """Profiles go to a temp dir; sampled profiling off unless a test enables it"""
+    monkeypatch.setattr(settings, "PROFILING_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", False)
+    monkeypatch.setattr(settings, "PROFILING_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "PROFILING_ROUTES", [])
+    monkeypatch.setattr(settings, "PROFILING_INTERVAL_MS", 1.0)
+    monkeypatch.setattr(settings, "PROFILING_MAX_PROFILES", 200)
+    return tmp_path
+
+
+@pytest.fixture
+def client(client, session_factory, profile_settings, monkeypatch):
+    """Shared test client; the admin header check uses the test connection too"""
+    monkeypatch.setattr(profiling, "SessionLocal", session_factory)
+    return client
+
+
+def make_user(db, email, role):
+    user = User(name=email, email=email, phone="555-0100", password_hash="dummy_hash", role=role)
+    db.add(user)
+    db.commit()
+    return {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
+
+
+@pytest.fixture
+def admin_headers(db):
+    return make_user(db, "admin@example.com", UserRole.ADMIN)
+
+
+@pytest.fixture
+def user_headers(db):
+    return make_user(db, "user@example.com", UserRole.USER)
+
+
+def busy_endpoint():
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        pass
+    return {"ok": True}
+
+
+# ==================== SAMPLER TESTS ====================
+
+def test_sampler_keeps_stacks_from_outermost_marker():
+    """Stacks start at the marker frame and skip unrelated threads"""
+    sampler = StackSampler({test_sampler_keeps_stacks_from_outermost_marker.__code__}, 0.001)
+    sampler.sample(sys._getframe())
+
+    (stack, count), = sampler.samples.items()
+    assert count == 1
+    assert stack[0][2] == "test_sampler_keeps_stacks_from_outermost_marker"
+
+    other = StackSampler({busy_endpoint.__code__}, 0.001)
+    other.sample(sys._getframe())
+    assert not other.samples
+
+
+def test_profile_files_are_readable(profile_settings):
+    """The .prof file loads with pstats and collapsed stacks are flamegraph input"""
+    outer = ("app.py", 1, "endpoint")
+    inner = ("app.py", 10, "helper")
+    samples = Counter({(outer, inner): 3, (outer,): 1})
+
+    write_profile("20240101T000000-abcdef01", samples, 0.01, {"id": "20240101T000000-abcdef01"})
+
+    stats = pstats.Stats(str(profile_settings / "20240101T000000-abcdef01.prof"))
+    assert stats.stats[outer][3] == pytest.approx(0.04)
+    assert stats.stats[inner][2] == pytest.approx(0.03)
+    assert to_collapsed(samples).splitlines()[0] == "endpoint (app.py:1);helper (app.py:10) 3"
+
+
+def test_old_profiles_pruned(profile_settings, monkeypatch):
+    """Only PROFILING_MAX_PROFILES profiles are kept"""
+    monkeypatch.setattr(settings, "PROFILING_MAX_PROFILES", 2)
+    for second in range(3):
+        profile_id = f"20240101T00000{second}-abcdef01"
+        write_profile(profile_id, Counter(), 0.01, {"id": profile_id})
+
+    assert not (profile_settings / "20240101T000000-abcdef01.json").exists()
+    assert (profile_settings / "20240101T000002-abcdef01.prof").exists()
+
+
+# ==================== MIDDLEWARE TESTS ====================
+
+def test_sampled_route_profiled(profile_settings, monkeypatch):
+    """Sync endpoints in the threadpool are captured by the sampler"""
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(settings, "PROFILING_ROUTES", ["/busy"])
+    small_app = FastAPI()
+    small_app.add_middleware(ProfilingMiddleware)
+    small_app.get("/busy")(busy_endpoint)
+    small_app.get("/other")(lambda: {"ok": True})
+
+    client = TestClient(small_app)
+    response = client.get("/busy")
+    other = client.get("/other")
+
+    profile_id = response.headers["x-profile-id"]
+    assert "x-profile-id" not in other.headers
+    collapsed = (profile_settings / f"{profile_id}.collapsed").read_text()
+    assert collapsed.startswith("busy_endpoint (")
+
+
+def test_disabled_profiler_skips_route_matching(profile_settings, monkeypatch):
+    """With profiling off and no X-Profile header the routes are never scanned"""
+    small_app = FastAPI()
+    small_app.add_middleware(ProfilingMiddleware)
+    small_app.get("/other")(lambda: {"ok": True})
+
+    def match_route(self, scope):
+        raise AssertionError("routes scanned")
+
+    monkeypatch.setattr(ProfilingMiddleware, "match_route", match_route)
+    response = TestClient(small_app).get("/other")
+
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+
+
+def test_admin_header_profiles_request(client, admin_headers, user_headers):
+    """X-Profile: 1 only works for admins"""
+    profiled = client.get("/api/health", headers={**admin_headers, "X-Profile": "1"})
+    ignored = client.get("/api/health", headers={**user_headers, "X-Profile": "1"})
+
+    assert "x-profile-id" in profiled.headers
+    assert "x-profile-id" not in ignored.headers
+
+
+def test_bad_token_skips_user_lookup(client, monkeypatch):
+    """X-Profile with an invalid token never reaches the database"""
+    def load_user(email):
+        raise AssertionError("user looked up")
+
+    monkeypatch.setattr(profiling, "load_user", load_user)
+    response = client.get("/api/health", headers={"Authorization": "Bearer not-a-jwt", "X-Profile": "1"})
+
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+
+
+def test_profiled_request_reuses_principal(client, admin_headers):
+    """The user the profiler loaded is the request's principal - one users query in total"""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        response = client.get("/api/admin/profiles/", headers={**admin_headers, "X-Profile": "1"})
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    assert "x-profile-id" in response.headers
+    assert len([statement for statement in statements if "FROM users" in statement]) == 1
+
+
+# ==================== ADMIN ENDPOINT TESTS ====================
+
+def test_list_and_download_profiles(client, admin_headers):
+    """Admins can list profiles and download both formats"""
+    profile_id = client.get(
+        "/api/health", headers={**admin_headers, "X-Profile": "1"}
+    ).headers["x-profile-id"]
+
+    listing = client.get("/api/admin/profiles/", headers=admin_headers)
+    assert listing.status_code == 200
+    assert listing.json()[0]["id"] == profile_id
+    assert listing.json()[0]["route"] == "/api/health"
+
+    pstats_file = client.get(f"/api/admin/profiles/{profile_id}/pstats", headers=admin_headers)
+    collapsed = client.get(f"/api/admin/profiles/{profile_id}/collapsed", headers=admin_headers)
+    assert pstats_file.status_code == 200
+    assert collapsed.status_code == 200
+
+
+def test_profile_download_validation(client, admin_headers):
+    """Unknown formats and ids that aren't profile ids are rejected"""
+    assert client.get("/api/admin/profiles/20240101T000000-abcdef01/svg", headers=admin_headers).status_code == 400
+    assert client.get("/api/admin/profiles/..%2Fsecret/pstats", headers=admin_headers).status_code == 404
+    assert client.get("/api/admin/profiles/20240101T000000-abcdef01/pstats", headers=admin_headers).status_code == 404
+
+
+def test_profiles_require_admin(client, user_headers):
+    """Non-admins can't see profiles"""
+    assert client.get("/api/admin/profiles/", headers=user_headers).status_code == 403
@@ -0,0 +1,110 @@
+"""
+Tests for SQL statement instrumentation (fingerprints, budgets, Server-Timing)
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.db.instrumentation import (
+    QueryStats, QueryInstrumentationMiddleware, fingerprint, instrument_engine
+)
+
+# Private in-memory engine - the routes only run constant SELECTs, no schema needed
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+instrument_engine(engine)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Small app whose route runs one statement per requested item"""
+    monkeypatch.setattr(settings, "DB_SERVER_TIMING", True)
+    monkeypatch.setattr(settings, "DB_REQUEST_QUERY_BUDGET", 3)
+    monkeypatch.setattr(settings, "DB_REQUEST_TIME_BUDGET_MS", 10000)
+    app = FastAPI()
+    app.add_middleware(QueryInstrumentationMiddleware)
+
+    @app.get("/items/{count}")
+    def get_items(count: int):
+        with engine.connect() as conn:
+            for i in range(count):
+                conn.execute(text("SELECT :i"), {"i": i})
+        return {"count": count}
+
+    return TestClient(app)
+
+
+# ==================== FINGERPRINT TESTS ====================
+
+def test_fingerprint_strips_literals():
+    """Statements differing only in values share a fingerprint"""
+    assert fingerprint("SELECT * FROM users WHERE id = 5") == fingerprint("SELECT * FROM users WHERE id = 42")
+    assert fingerprint("SELECT * FROM users WHERE email = 'a@b.c'") == "SELECT * FROM users WHERE email = ?"
+
+
+def test_fingerprint_collapses_in_lists():
+    """IN lists of any length share a fingerprint"""
+    short = fingerprint("SELECT * FROM devices WHERE id IN (?, ?)")
+    long = fingerprint("SELECT * FROM devices WHERE id IN (?, ?, ?, ?, ?)")
+
+    assert short == long == "SELECT * FROM devices WHERE id IN (...)"
+
+
+def test_fingerprint_keeps_identifiers():
+    """Digits inside identifiers are not literals"""
+    assert fingerprint("SELECT anon_1.id FROM anon_1") == "SELECT anon_1.id FROM anon_1"
+
+
+def test_stats_track_slowest_and_group_by_fingerprint():
+    """Repeated shapes are merged in the report"""
+    stats = QueryStats()
+    stats.record("SELECT * FROM users WHERE id = 1", 0.001)
+    stats.record("SELECT * FROM users WHERE id = 2", 0.003)
+    stats.record("SELECT * FROM devices", 0.002)
+
+    assert stats.count == 3
+    assert stats.slowest_statement == "SELECT * FROM users WHERE id = 2"
+    top = stats.top_fingerprints()
+    assert top[0]["fingerprint"] == "SELECT * FROM users WHERE id = ?"
+    assert top[0]["count"] == 2
+
+
+# ==================== MIDDLEWARE TESTS ====================
+
+def test_server_timing_header(client):
+    """Responses carry the request's DB time and statement count"""
+    response = client.get("/items/2")
+
+    assert response.status_code == 200
+    assert response.headers["server-timing"].startswith("db;dur=")
+    assert 'desc="2 queries"' in response.headers["server-timing"]
+
+
+def test_over_budget_request_logged(client, caplog):
+    """Requests over the statement budget log a structured record"""
+    with caplog.at_level("WARNING", logger="app.db.queries"):
+        client.get("/items/2")
+        assert not caplog.records
+
+        client.get("/items/5")
+
+    assert caplog.records[-1].getMessage() == "db_budget_exceeded"
+    record = caplog.records[-1].fields
+    assert record["route"] == "/items/{count}"
+    assert record["query_count"] == 5
+    assert record["top_fingerprints"][0]["fingerprint"] == "SELECT ?"
+    assert record["top_fingerprints"][0]["count"] == 5
+
+
+def test_slow_query_logged(client, caplog, monkeypatch):
+    """Statements over DB_SLOW_QUERY_MS are logged without their parameters"""
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_MS", -1)
+
+    with caplog.at_level("WARNING", logger="app.db.queries"):
+        client.get("/items/1")
+
+    assert caplog.records[0].getMessage() == "slow_query"
+    record = caplog.records[0].fields
+    assert record["fingerprint"] == "SELECT ?"
@@ -0,0 +1,229 @@
+"""
+Query-count and query-plan regression tests for hot endpoints
+Each test records the SQL an endpoint issues, bounds the number of statements
+(so N+1 loops fail) and checks the plans for full table scans (so missing
+indexes fail).
+"""
+import pytest
+from datetime import datetime, timedelta
+
+from app.models.user import User
+from app.models.user_role import UserRole
+from app.models.device import Device
+from app.models.work_order import WorkOrder, WorkOrderStatus
+from app.models.message import Message, SenderType
+from app.models.notification import Notification, NotificationType
+from app.core.security import create_access_token
+
+WORK_ORDERS = 5
+MESSAGES_PER_ORDER = 4
+
+
+@pytest.fixture
+def test_customer(db):
+    """Create a test customer"""
+    customer = User(
+        name="John Test",
+        email="test@example.com",
+        phone="555-0100",
+        password_hash="dummy_hash"
+    )
+    db.add(customer)
+    db.commit()
+    db.refresh(customer)
+    return customer
+
+
+@pytest.fixture
+def test_admin(db):
+    """Create a test admin"""
+    admin = User(
+        name="Admin Test",
+        email="admin@example.com",
+        phone="555-0000",
+        password_hash="dummy_hash",
+        role=UserRole.ADMIN
+    )
+    db.add(admin)
+    db.commit()
+    db.refresh(admin)
+    return admin
+
+
+@pytest.fixture
+def test_shop(db, test_customer):
+    """Several work orders, each with a message thread and a notification"""
+    device = Device(customer_id=test_customer.id, device_type="Phone", serial_number="PLAN-001")
+    db.add(device)
+    db.commit()
+
+    now = datetime.utcnow()
+    work_orders = [
+        WorkOrder(
+            customer_id=test_customer.id,
+            device_id=device.id,
+            title=f"Repair {i}",
+            status=WorkOrderStatus.IN_PROGRESS if i % 2 else WorkOrderStatus.PENDING,
+            assigned_technician=f"Tech {i}",
+            created_at=now - timedelta(days=i)
+        )
+        for i in range(WORK_ORDERS)
+    ]
+    db.add_all(work_orders)
+    db.commit()
+
+    for work_order in work_orders:
+        db.add_all([
+            Message(
+                work_order_id=work_order.id,
+                sender_id=test_customer.id if j % 2 == 0 else 99,
+                sender_type=SenderType.CUSTOMER if j % 2 == 0 else SenderType.TECHNICIAN,
+                message=f"Message {j}",
+                is_read=0,
+                created_at=now - timedelta(hours=j)
+            )
+            for j in range(MESSAGES_PER_ORDER)
+        ])
+        db.add(Notification(
+            user_id=test_customer.id,
+            work_order_id=work_order.id,
+            type=NotificationType.STATUS_CHANGE,
+            title="Repair Status Updated",
+            message=f"{work_order.title} updated",
+            read=False
+        ))
+    db.commit()
+    return work_orders
+
+
+@pytest.fixture
+def auth_headers(test_customer):
+    """Create authorization headers"""
+    token = create_access_token({"sub": test_customer.email})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def admin_headers(test_admin):
+    """Authorization headers for the admin"""
+    token = create_access_token({"sub": test_admin.email})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def request(client, queries, method, url, **kwargs):
+    with queries.record():
+        response = client.request(method, url, **kwargs)
+    assert response.status_code < 400, response.text
+    return response
+
+
+# ==================== MESSAGES ====================
+
+def test_message_thread_queries(client, queries, auth_headers, test_shop):
+    """Thread: user, work order, messages and unread count - all by index"""
+    request(client, queries, "GET", f"/api/customers/messages/work-order/{test_shop[0].id}", headers=auth_headers)
+
+    queries.assert_max_queries(4)
+    queries.assert_indexed()
+
+
+def test_send_message_queries(client, queries, auth_headers, test_shop):
+    """Sending looks up the work order and inserts once"""
+    request(
+        client, queries, "POST", f"/api/customers/messages/work-order/{test_shop[0].id}",
+        headers=auth_headers, json={"message": "Any update?"}
+    )
+
+    queries.assert_max_queries(4)
+    queries.assert_indexed()
+
+
+def test_mark_read_queries(client, queries, auth_headers, test_shop, db):
+    """Marking many messages read does not issue one query per message"""
+    message_ids = [message_id for (message_id,) in db.query(Message.id).all()]
+
+    request(client, queries, "PUT", "/api/customers/messages/mark-read",
+            headers=auth_headers, json={"message_ids": message_ids})
+
+    queries.assert_max_queries(3)
+    queries.assert_indexed()
+
+
+def test_unread_message_count_queries(client, queries, auth_headers, test_shop):
+    request(client, queries, "GET", "/api/customers/messages/unread-count", headers=auth_headers)
+
+    queries.assert_max_queries(2)
+    queries.assert_indexed()
+
+
+def test_recent_messages_no_n_plus_one(client, queries, auth_headers, test_shop):
+    """Recent messages across work orders are fetched with their work order in one query"""
+    response = request(client, queries, "GET", "/api/customers/messages/recent?limit=20", headers=auth_headers)
+
+    assert len(response.json()) == WORK_ORDERS * MESSAGES_PER_ORDER
+    queries.assert_max_queries(2)
+    queries.assert_indexed()
+
+
+# ==================== NOTIFICATIONS ====================
+
+@pytest.mark.parametrize("url", [
+    "/api/customers/notifications/",
+    "/api/customers/notifications/?unread_only=true",
+    "/api/customers/notifications/unread-count",
+])
+def test_notification_read_queries(client, queries, auth_headers, test_shop, url):
+    response = request(client, queries, "GET", url, headers=auth_headers)
+
+    data = response.json()
+    assert (data["unread_count"] if "unread-count" in url else len(data)) == WORK_ORDERS
+
+    queries.assert_max_queries(2)
+    queries.assert_indexed()
+
+
+def test_mark_all_notifications_read_queries(client, queries, auth_headers, test_shop):
+    """A single UPDATE regardless of how many notifications are unread"""
+    request(client, queries, "PUT", "/api/customers/notifications/read-all", headers=auth_headers)
+
+    queries.assert_max_queries(2)
+    queries.assert_indexed()
+    assert client.get("/api/customers/notifications/unread-count", headers=auth_headers).json()["unread_count"] == 0
+
+
+# ==================== ADMIN LISTS ====================
+
+@pytest.mark.parametrize("url", [
+    "/api/admin/work-orders/?status=pending",
+    "/api/admin/devices/?customer_id={customer_id}",
+])
+def test_admin_filtered_list_queries(client, queries, admin_headers, test_customer, test_shop, url):
+    """Filtered admin lists use an index for the filter"""
+    response = request(client, queries, "GET", url.format(customer_id=test_customer.id), headers=admin_headers)
+
+    assert response.json()
+    queries.assert_max_queries(2)
+    queries.assert_indexed()
+
+
+def test_admin_work_orders_by_customer_queries(client, queries, admin_headers, test_customer, test_shop):
+    """The customer filter joins devices by index rather than scanning work orders"""
+    request(client, queries, "GET", f"/api/admin/work-orders/?customer_id={test_customer.id}", headers=admin_headers)
+
+    queries.assert_max_queries(2)
+    queries.assert_indexed()
+
+
+@pytest.mark.parametrize("url", [
+    "/api/admin/work-orders/",
+    "/api/admin/devices/",
+    "/api/admin/users/",
+])
+def test_admin_full_list_queries(client, queries, admin_headers, test_shop, url):
+    """Unfiltered lists read their own table once and nothing per row"""
+    response = request(client, queries, "GET", url, headers=admin_headers)
+
+    assert response.json()
+
+    queries.assert_max_queries(2)
+    queries.assert_indexed(allow={"work_orders", "devices", "users"})
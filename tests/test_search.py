@@ -0,0 +1,161 @@
+"""
+Tests for full-text search over work orders, devices and message threads
+"""
+import pytest
+
+from app.models.user import User
+from app.models.user_role import UserRole
+from app.models.device import Device
+from app.models.work_order import WorkOrder, WorkOrderStatus
+from app.models.message import Message, SenderType
+from app.core.security import create_access_token
+from app.db.search import fts5_query
+
+
+@pytest.fixture
+def test_customer(db):
+    """Create a test customer"""
+    customer = User(
+        name="John Test",
+        email="test@example.com",
+        phone="555-0100",
+        password_hash="dummy_hash"
+    )
+    db.add(customer)
+    db.commit()
+    db.refresh(customer)
+    return customer
+
+
+@pytest.fixture
+def tech_headers(db):
+    """Authorization headers for a technician"""
+    technician = User(
+        name="Tech Test",
+        email="tech@example.com",
+        phone="555-0001",
+        password_hash="dummy_hash",
+        role=UserRole.TECHNICIAN
+    )
+    db.add(technician)
+    db.commit()
+    token = create_access_token({"sub": technician.email})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def test_shop(db, test_customer):
+    """A laptop and a phone with one work order each, and a message thread"""
+    laptop = Device(customer_id=test_customer.id, device_type="Laptop", brand="Dell", model="XPS 13", serial_number="DL-7731")
+    phone = Device(customer_id=test_customer.id, device_type="Phone", brand="Apple", model="iPhone 14", serial_number="AP-5520")
+    db.add_all([laptop, phone])
+    db.commit()
+
+    keyboard = WorkOrder(
+        customer_id=test_customer.id,
+        device_id=laptop.id,
+        title="Keyboard Not Working",
+        description="Several keys unresponsive after a coffee spill",
+        status=WorkOrderStatus.IN_PROGRESS,
+        assigned_technician="Tech Smith"
+    )
+    screen = WorkOrder(
+        customer_id=test_customer.id,
+        device_id=phone.id,
+        title="Cracked Screen",
+        technician_notes="Ordered replacement digitizer",
+        status=WorkOrderStatus.PENDING
+    )
+    db.add_all([keyboard, screen])
+    db.commit()
+
+    db.add(Message(
+        work_order_id=screen.id,
+        sender_id=test_customer.id,
+        sender_type=SenderType.CUSTOMER,
+        message="The battery also drains overnight",
+        is_read=0
+    ))
+    db.commit()
+    return {"keyboard": keyboard, "screen": screen}
+
+
+def search(client, headers, q, **params):
+    response = client.get("/api/admin/search/", params={"q": q, **params}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_fts5_query_quotes_words_and_prefixes_last():
+    assert fts5_query("cracked scr") == '"cracked" "scr"*'
+    assert fts5_query('AND "NEAR(x') == '"and" "near" "x"*'
+    assert fts5_query("?!") == ""
+
+
+@pytest.mark.parametrize("q, expected, source", [
+    ("keyboard", "keyboard", "work_order"),
+    ("coffee spill", "keyboard", "work_order"),
+    ("digitizer", "screen", "work_order"),
+    ("XPS", "keyboard", "device"),
+    ("DL-77", "keyboard", "device"),
+    ("battery drains", "screen", "message"),
+])
+def test_search_finds_work_order(client, tech_headers, test_shop, q, expected, source):
+    results = search(client, tech_headers, q)
+
+    assert [r["work_order_id"] for r in results] == [test_shop[expected].id]
+    assert results[0]["matched_in"] == [source]
+
+
+def test_search_result_fields(client, tech_headers, test_shop):
+    result = search(client, tech_headers, "keyboard")[0]
+
+    assert result["title"] == "Keyboard Not Working"
+    assert result["status"] == "in_progress"
+    assert result["device_model"] == "XPS 13"
+    assert result["serial_number"] == "DL-7731"
+    assert result["score"] > 0
+
+
+def test_index_follows_updates_and_deletes(client, db, tech_headers, test_shop):
+    """Triggers keep the index in step with the tables"""
+    keyboard = test_shop["keyboard"]
+    keyboard.title = "Trackpad Replacement"
+    db.commit()
+
+    assert search(client, tech_headers, "keyboard") == []
+    assert [r["work_order_id"] for r in search(client, tech_headers, "trackpad")] == [keyboard.id]
+
+    db.query(Message).delete()
+    db.commit()
+    assert search(client, tech_headers, "battery") == []
+
+
+def test_search_ranks_multiple_matches_and_paginates(client, tech_headers, test_shop):
+    """Best match first; a work order matching in several places is listed once"""
+    results = search(client, tech_headers, "screen")
+    assert [r["work_order_id"] for r in results] == [test_shop["screen"].id]
+
+    both = search(client, tech_headers, "s")
+    assert len(both) == 2
+    assert both[0]["score"] >= both[1]["score"]
+    assert search(client, tech_headers, "s", skip=1, limit=1) == both[1:]
+
+
+def test_search_without_words_returns_nothing(client, tech_headers, test_shop):
+    assert search(client, tech_headers, "?!") == []
+
+
+def test_search_requires_technician(client, test_customer, test_shop):
+    token = create_access_token({"sub": test_customer.email})
+    response = client.get("/api/admin/search/", params={"q": "keyboard"}, headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 403
+
+
+def test_search_query_count(client, queries, tech_headers, test_shop):
+    """One search query plus one to load the page of work orders"""
+    with queries.record():
+        search(client, tech_headers, "keyboard")
+
+    queries.assert_max_queries(3)
@@ -0,0 +1,78 @@
+"""
+Tests for the bulk synthetic data generator
+"""
+import pytest
+from passlib.context import CryptContext
+from sqlalchemy import create_engine, func, select
+
+from app.db.base_class import Base
+from app.db.seed import BULK_PASSWORD, ShopSize, seed_bulk
+from app.models.user import User
+from app.models.message import Message
+from app.models.notification import Notification
+from app.models.work_order import WorkOrder, WorkOrderStatus
+
+SIZE = ShopSize(customers=40, technicians=3, devices=80, work_orders=300, messages=1500)
+
+
+def make_engine(path):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """An empty schema in a temp file"""
+    engine = make_engine(tmp_path / "seed.db")
+    yield engine
+    engine.dispose()
+
+
+def test_seed_bulk_counts(engine):
+    """Row counts match the requested size (messages on average)"""
+    counts = seed_bulk(engine, SIZE, password_hash="precomputed")
+
+    assert counts["users"] == 1 + SIZE.technicians + SIZE.customers
+    assert counts["devices"] == SIZE.devices
+    assert counts["work_orders"] == SIZE.work_orders
+    assert SIZE.messages * 0.7 < counts["messages"] < SIZE.messages * 1.3
+    with engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(Message.__table__)).scalar() == counts["messages"]
+        assert conn.execute(select(func.count()).select_from(Notification.__table__)).scalar() == counts["notifications"]
+
+
+def test_seed_bulk_deterministic(engine, tmp_path):
+    """The same seed produces identical rows"""
+    other = make_engine(tmp_path / "other.db")
+    seed_bulk(engine, SIZE, seed=7, password_hash="precomputed")
+    seed_bulk(other, SIZE, seed=7, password_hash="precomputed")
+
+    query = select(Message.__table__).order_by(Message.id)
+    with engine.connect() as a, other.connect() as b:
+        assert a.execute(query).all() == b.execute(query).all()
+    other.dispose()
+
+
+def test_seed_bulk_status_follows_age(engine):
+    """Old work orders are closed; recent ones are mostly still open"""
+    seed_bulk(engine, SIZE, password_hash="precomputed")
+
+    with engine.connect() as conn:
+        statuses = conn.execute(select(WorkOrder.status, WorkOrder.created_at)).all()
+    newest = max(created_at for _, created_at in statuses)
+    old = [status for status, created_at in statuses if (newest - created_at).days > 60]
+    assert old
+    assert all(status in {WorkOrderStatus.COMPLETED, WorkOrderStatus.DELIVERED, WorkOrderStatus.CANCELLED}
+               for status in old)
+
+
+def test_seed_bulk_password_and_empty_check(engine):
+    """Users share one valid hash; a non-empty database is refused"""
+    seed_bulk(engine, ShopSize(customers=2, technicians=1, devices=2, work_orders=2, messages=2))
+
+    with engine.connect() as conn:
+        password_hash = conn.execute(select(User.password_hash).limit(1)).scalar()
+    assert CryptContext(schemes=["bcrypt"]).verify(BULK_PASSWORD, password_hash)
+    with pytest.raises(ValueError):
+        seed_bulk(engine, SIZE)
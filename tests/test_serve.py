@@ -0,0 +1,88 @@
+"""
+Tests for the multi-worker server runner (app.serve)
+"""
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+from app import serve
+from app.core.config import settings
+
+
+def test_worker_count_from_cpus(monkeypatch):
+    """Auto mode runs one worker per usable CPU"""
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 0)
+    monkeypatch.setattr(serve, "available_cpus", lambda: 4)
+    monkeypatch.setattr(serve, "available_memory_mb", lambda: 64 * 1024)
+
+    assert serve.worker_count() == 4
+
+
+def test_worker_count_capped_by_memory(monkeypatch):
+    """Workers are limited to what fits in memory, but never below one"""
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 0)
+    monkeypatch.setattr(settings, "SERVER_WORKER_MEMORY_MB", 256)
+    monkeypatch.setattr(serve, "available_cpus", lambda: 8)
+
+    monkeypatch.setattr(serve, "available_memory_mb", lambda: 600)
+    assert serve.worker_count() == 2
+    monkeypatch.setattr(serve, "available_memory_mb", lambda: 100)
+    assert serve.worker_count() == 1
+
+
+def test_worker_count_explicit(monkeypatch):
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 3)
+
+    assert serve.worker_count() == 3
+
+
+def test_config_from_settings(monkeypatch):
+    """uvloop, httptools and connection limits come from Settings"""
+    monkeypatch.setattr(settings, "SERVER_BACKLOG", 4096)
+    monkeypatch.setattr(settings, "SERVER_KEEPALIVE_SECONDS", 15)
+    monkeypatch.setattr(settings, "SERVER_LIMIT_CONCURRENCY", 500)
+
+    config = serve.build_config(object())
+
+    assert (config.loop, config.http) == ("uvloop", "httptools")
+    assert config.backlog == 4096
+    assert config.timeout_keep_alive == 15
+    assert config.limit_concurrency == 500
+    assert config.access_log is False
+
+
+def test_workers_serve_and_drain_on_sigterm(tmp_path):
+    """Forked workers answer requests and the server exits cleanly on SIGTERM"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{tmp_path / 'serve.db'}",
+        SERVER_HOST="127.0.0.1",
+        SERVER_PORT=str(port),
+        SERVER_WORKERS="2",
+    )
+    server = subprocess.Popen([sys.executable, "-m", "app.serve"], env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                response = httpx.get(f"http://127.0.0.1:{port}/api/health", timeout=1)
+                break
+            except httpx.HTTPError:
+                assert time.monotonic() < deadline, "server did not start"
+                time.sleep(0.05)
+        assert response.status_code == 200
+
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(timeout=30) == 0
+    finally:
+        if server.poll() is None:
+            server.kill()
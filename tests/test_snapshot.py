@@ -0,0 +1,211 @@
+"""
+Tests for the Parquet / Arrow analytics snapshots
+"""
+import os
+import pytest
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.models.user import User
+from app.models.user_role import UserRole
+from app.models.device import Device
+from app.models.work_order import WorkOrder, WorkOrderStatus
+from app.models.message import Message, SenderType
+from app.core.security import create_access_token
+from app.db import snapshot as snapshots
+from app.db.snapshot import list_runs, read_state, write_snapshot
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+NOW = datetime(2026, 3, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def test_admin(db):
+    """Create a test admin"""
+    admin = User(
+        name="Admin Test",
+        email="admin@example.com",
+        phone="555-0000",
+        password_hash="dummy_hash",
+        role=UserRole.ADMIN
+    )
+    db.add(admin)
+    db.commit()
+    db.refresh(admin)
+    return admin
+
+
+@pytest.fixture
+def admin_headers(test_admin):
+    """Authorization headers for the admin"""
+    token = create_access_token({"sub": test_admin.email})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def test_shop(db, test_admin):
+    """Two work orders updated an hour before NOW, one message each"""
+    customer = User(name="John Test", email="test@example.com", phone="555-0100", password_hash="secret_hash")
+    db.add(customer)
+    db.commit()
+    device = Device(customer_id=customer.id, device_type="Laptop", brand="Dell", model="XPS 13", serial_number="SNAP-001")
+    db.add(device)
+    db.commit()
+
+    earlier = NOW - timedelta(hours=1)
+    work_orders = [
+        WorkOrder(
+            customer_id=customer.id,
+            device_id=device.id,
+            title=f"Repair {i}",
+            status=WorkOrderStatus.PENDING,
+            cost=50.0 * i if i else None,
+            created_at=earlier,
+            updated_at=earlier,
+        )
+        for i in range(2)
+    ]
+    db.add_all(work_orders)
+    db.commit()
+    db.add_all([
+        Message(
+            work_order_id=work_order.id,
+            sender_id=customer.id,
+            sender_type=SenderType.CUSTOMER,
+            message="When will it be ready?",
+            created_at=earlier,
+            updated_at=earlier,
+        )
+        for work_order in work_orders
+    ])
+    db.commit()
+    return work_orders
+
+
+def read(output_dir, entry, table):
+    return pq.read_table(os.path.join(output_dir, entry["tables"][table]["file"]))
+
+
+def test_full_snapshot(db, test_shop, tmp_path):
+    entry = write_snapshot(db, str(tmp_path), now=NOW)
+
+    assert entry["tables"]["work_orders"] == {
+        "file": "work_orders/work_orders-20260301T120000.parquet", "rows": 2, "mode": "full", "since": None,
+    }
+    work_orders = read(tmp_path, entry, "work_orders")
+    assert work_orders.column("status").to_pylist() == ["pending", "pending"]
+    assert work_orders.column("cost").to_pylist() == [None, 50.0]
+    assert work_orders.schema.field("updated_at").type == pa.timestamp("us")
+    assert read(tmp_path, entry, "devices").column("serial_number").to_pylist() == ["SNAP-001"]
+    assert entry["tables"]["notifications"] == {"file": None, "rows": 0, "mode": "full", "since": None}
+    assert list_runs(str(tmp_path)) == [entry]
+
+
+def test_password_hashes_not_exported(db, test_shop, tmp_path):
+    entry = write_snapshot(db, str(tmp_path), tables=["users"], now=NOW)
+
+    users = read(tmp_path, entry, "users")
+    assert "password_hash" not in users.column_names
+    assert sorted(users.column("email").to_pylist()) == ["admin@example.com", "test@example.com"]
+
+
+def test_incremental_snapshot_exports_changed_rows(db, test_shop, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SNAPSHOT_OVERLAP_SECONDS", 60)
+    write_snapshot(db, str(tmp_path), now=NOW)
+    assert read_state(str(tmp_path))["work_orders"] == {"column": "updated_at", "until": NOW.isoformat()}
+
+    test_shop[1].title = "Repair 1 (parts ordered)"
+    test_shop[1].updated_at = NOW + timedelta(minutes=5)
+    db.commit()
+    entry = write_snapshot(db, str(tmp_path), now=NOW + timedelta(minutes=10))
+
+    work_orders = entry["tables"]["work_orders"]
+    assert work_orders["mode"] == "incremental"
+    assert work_orders["since"] == (NOW - timedelta(seconds=60)).isoformat()
+    assert read(tmp_path, entry, "work_orders").column("title").to_pylist() == ["Repair 1 (parts ordered)"]
+    # Nothing new: no file for the table
+    assert entry["tables"]["messages"] == {
+        "file": None, "rows": 0, "mode": "incremental", "since": work_orders["since"],
+    }
+    # No updated_at: always written in full
+    assert entry["tables"]["users"]["mode"] == "full"
+    assert entry["tables"]["users"]["rows"] == 2
+    assert [run["run"] for run in list_runs(str(tmp_path))] == ["20260301T121000", "20260301T120000"]
+
+
+def test_full_flag_ignores_watermarks(db, test_shop, tmp_path):
+    write_snapshot(db, str(tmp_path), now=NOW)
+
+    entry = write_snapshot(db, str(tmp_path), full=True, now=NOW + timedelta(hours=1))
+
+    assert entry["tables"]["work_orders"]["mode"] == "full"
+    assert entry["tables"]["work_orders"]["rows"] == 2
+
+
+def test_partial_full_run_keeps_other_watermarks(db, test_shop, tmp_path, monkeypatch):
+    """--full --tables users re-exports users only; the next run is still incremental for the rest"""
+    monkeypatch.setattr(settings, "SNAPSHOT_OVERLAP_SECONDS", 0)
+    write_snapshot(db, str(tmp_path), now=NOW)
+
+    write_snapshot(db, str(tmp_path), tables=["users"], full=True, now=NOW + timedelta(hours=1))
+    full = write_snapshot(db, str(tmp_path), tables=["messages"], full=True, now=NOW + timedelta(hours=2))
+    entry = write_snapshot(db, str(tmp_path), now=NOW + timedelta(hours=3))
+
+    assert full["tables"]["messages"]["mode"] == "full"
+    assert entry["tables"]["work_orders"] == {"file": None, "rows": 0, "mode": "incremental", "since": NOW.isoformat()}
+    assert entry["tables"]["messages"]["since"] == (NOW + timedelta(hours=2)).isoformat()
+
+
+def test_arrow_format(db, test_shop, tmp_path):
+    entry = write_snapshot(db, str(tmp_path), file_format="arrow", tables=["messages"], now=NOW)
+
+    path = os.path.join(tmp_path, entry["tables"]["messages"]["file"])
+    assert path.endswith(".arrow")
+    messages = pa.ipc.open_file(path).read_all()
+    assert messages.column("sender_type").to_pylist() == ["customer", "customer"]
+
+
+def test_batches_become_row_groups(db, test_shop, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SNAPSHOT_BATCH_ROWS", 1)
+
+    entry = write_snapshot(db, str(tmp_path), tables=["work_orders"], now=NOW)
+
+    path = os.path.join(tmp_path, entry["tables"]["work_orders"]["file"])
+    assert pq.ParquetFile(path).num_row_groups == 2
+
+
+@pytest.mark.parametrize("kwargs", [{"file_format": "csv"}, {"tables": ["audit_log"]}])
+def test_invalid_options(db, tmp_path, kwargs):
+    with pytest.raises(ValueError):
+        write_snapshot(db, str(tmp_path), **kwargs)
+
+
+def test_snapshot_endpoints(client, db, admin_headers, test_shop, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SNAPSHOT_DIR", str(tmp_path))
+    started = []
+    monkeypatch.setattr("app.api.admin.snapshots.run_snapshot", started.append)
+
+    response = client.post("/api/admin/snapshots/", json={"tables": ["work_orders"]}, headers=admin_headers)
+    assert response.status_code == 202
+    assert started[0].tables == ["work_orders"]
+
+    entry = write_snapshot(db, str(tmp_path), tables=["work_orders"], now=NOW)
+    runs = client.get("/api/admin/snapshots/", headers=admin_headers).json()
+    assert runs[0]["tables"]["work_orders"]["rows"] == 2
+
+    response = client.get(f"/api/admin/snapshots/{entry['tables']['work_orders']['file']}", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.content[:4] == b"PAR1"
+
+
+def test_snapshot_conflicts_and_validation(client, admin_headers, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SNAPSHOT_DIR", str(tmp_path))
+
+    assert client.post("/api/admin/snapshots/", json={"format": "csv"}, headers=admin_headers).status_code == 400
+    assert client.post("/api/admin/snapshots/", json={"tables": ["audit_log"]}, headers=admin_headers).status_code == 400
+    with snapshots.snapshot_lock:
+        assert client.post("/api/admin/snapshots/", json={}, headers=admin_headers).status_code == 409
+    assert client.get("/api/admin/snapshots/users/../_state.json", headers=admin_headers).status_code == 404
+    assert client.get("/api/admin/snapshots/users/users-20260301T120000.parquet", headers=admin_headers).status_code == 404
@@ -0,0 +1,198 @@
+"""
+Tests for request tracing and the OTLP/JSON lines exporter
+"""
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from app.core import tracing
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.core.tracing import Span, current_span, exporter, parse_traceparent, trace_engine
+from app.models.user import User
+from app.models.user_role import UserRole
+from app.models.device import Device
+from app.models.work_order import WorkOrder, WorkOrderStatus
+from app.models.notification import NotificationType
+from app.services.notification_service import create_notification
+
+
+@pytest.fixture(scope="module", autouse=True)
+def traced_test_engine(engine):
+    """Statement spans for the shared test engine, while this module runs"""
+    trace_engine(engine)
+    yield
+    for name, listener in [
+        ("before_cursor_execute", tracing.before_cursor_execute),
+        ("after_cursor_execute", tracing.after_cursor_execute),
+        ("handle_error", tracing.handle_error),
+    ]:
+        event.remove(engine, name, listener)
+
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    """Trace every request into a temp file"""
+    path = tmp_path / "spans.jsonl"
+    monkeypatch.setattr(settings, "TRACING_ENABLED", True)
+    monkeypatch.setattr(settings, "TRACING_SAMPLE_RATIO", 1.0)
+    monkeypatch.setattr(settings, "TRACING_FILE", str(path))
+    yield path
+    exporter.force_flush()
+
+
+@pytest.fixture(scope="function")
+def client(client, trace_file):
+    """Shared test client with tracing to the temp file"""
+    return client
+
+
+@pytest.fixture
+def admin_headers(db):
+    """An admin and their authorization headers"""
+    admin = User(
+        name="Admin Test",
+        email="admin@example.com",
+        phone="555-0100",
+        password_hash="dummy_hash",
+        role=UserRole.ADMIN
+    )
+    db.add(admin)
+    db.commit()
+    token = create_access_token({"sub": admin.email})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def test_work_order(db, admin_headers):
+    """Create a work order to update"""
+    customer = User(name="John Test", email="test@example.com", phone="555-0101", password_hash="dummy_hash")
+    db.add(customer)
+    db.commit()
+    device = Device(customer_id=customer.id, device_type="Phone", serial_number="TRACE-001")
+    db.add(device)
+    db.commit()
+    work_order = WorkOrder(
+        customer_id=customer.id,
+        device_id=device.id,
+        title="Screen Replacement",
+        status=WorkOrderStatus.PENDING,
+        created_at=datetime.utcnow()
+    )
+    db.add(work_order)
+    db.commit()
+    db.refresh(work_order)
+    return work_order
+
+
+def read_spans(path):
+    """All spans written to a trace file"""
+    exporter.force_flush()
+    if not path.exists():
+        return []
+    spans = []
+    for line in path.read_text().splitlines():
+        for resource_spans in json.loads(line)["resourceSpans"]:
+            for scope_spans in resource_spans["scopeSpans"]:
+                spans.extend(scope_spans["spans"])
+    return spans
+
+
+# ==================== TRACEPARENT TESTS ====================
+
+def test_parse_traceparent():
+    """W3C traceparent headers are parsed; invalid ones ignored"""
+    header = b"00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+    assert parse_traceparent(header) == ("0af7651916cd43dd8448eb211c80319c", "b7ad6b7169203331", True)
+    assert parse_traceparent(header[:-1] + b"0")[2] is False
+    assert parse_traceparent(b"garbage") is None
+    assert parse_traceparent(None) is None
+
+
+# ==================== REQUEST TRACING TESTS ====================
+
+def test_status_update_spans(client, trace_file, admin_headers, test_work_order):
+    """A status update is broken down into auth, DB, commit and serialization spans"""
+    response = client.patch(
+        f"/api/admin/work-orders/{test_work_order.id}/status?status=in_progress",
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+
+    spans = read_spans(trace_file)
+    by_name = {span["name"]: span for span in spans}
+    root = by_name["PATCH /api/admin/work-orders/{work_order_id}/status"]
+
+    assert response.headers["x-trace-id"] == root["traceId"]
+    assert {span["traceId"] for span in spans} == {root["traceId"]}
+    assert "parentSpanId" not in root
+    for name in ["auth.get_current_user", "fastapi.endpoint", "fastapi.serialize_response",
+                 "db.session.commit", "db.SELECT", "db.UPDATE"]:
+        assert name in by_name
+    assert by_name["auth.get_current_user"]["parentSpanId"] == by_name["fastapi.dependencies"]["spanId"]
+    # The state machine issues the UPDATE (and the notification INSERT) itself; the commit follows
+    assert by_name["db.UPDATE"]["parentSpanId"] == by_name["fastapi.endpoint"]["spanId"]
+    notify = by_name["notification_service.notify_status_changes"]
+    assert notify["parentSpanId"] == by_name["fastapi.endpoint"]["spanId"]
+    assert by_name["db.INSERT"]["parentSpanId"] == notify["spanId"]
+
+
+def test_unsampled_requests_not_traced(client, trace_file, monkeypatch):
+    """Sampling ratio 0 records nothing"""
+    monkeypatch.setattr(settings, "TRACING_SAMPLE_RATIO", 0.0)
+
+    response = client.get("/api/health")
+
+    assert "x-trace-id" not in response.headers
+    assert read_spans(trace_file) == []
+
+
+def test_incoming_traceparent_continues_trace(client, trace_file, monkeypatch):
+    """A sampled parent from upstream overrides the local ratio"""
+    monkeypatch.setattr(settings, "TRACING_SAMPLE_RATIO", 0.0)
+    headers = {"traceparent": "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"}
+
+    client.get("/api/health", headers=headers)
+
+    root = next(span for span in read_spans(trace_file) if span["name"] == "GET /api/health")
+    assert root["traceId"] == "0af7651916cd43dd8448eb211c80319c"
+    assert root["parentSpanId"] == "b7ad6b7169203331"
+
+
+# ==================== SERVICE TESTS ====================
+
+def test_notification_service_traced(db, trace_file, test_work_order):
+    """notification_service calls get their own span with nested statements"""
+    root = Span("test", "0af7651916cd43dd8448eb211c80319c")
+    token = current_span.set(root)
+    try:
+        create_notification(
+            db, test_work_order.customer_id, NotificationType.STATUS_CHANGE, "Title", "Message", test_work_order.id
+        )
+    finally:
+        current_span.reset(token)
+        root.end()
+
+    spans = {span["name"]: span for span in read_spans(trace_file)}
+    service_span = spans["notification_service.create_notification"]
+    assert service_span["parentSpanId"] == root.span_id
+    assert spans["db.session.commit"]["parentSpanId"] == service_span["spanId"]
+
+
+def test_errors_recorded_on_span(trace_file):
+    """Exceptions mark the span as an error with an exception event"""
+    root = Span("test", "0af7651916cd43dd8448eb211c80319c")
+    token = current_span.set(root)
+    try:
+        with pytest.raises(ValueError):
+            with tracing.start_span("failing"):
+                raise ValueError("boom")
+    finally:
+        current_span.reset(token)
+
+    failing = next(span for span in read_spans(trace_file) if span["name"] == "failing")
+    assert failing["status"]["code"] == tracing.STATUS_ERROR
+    assert failing["events"][0]["name"] == "exception"
@@ -0,0 +1,183 @@
+"""
+Tests for the in-memory typeahead index and its endpoint
+"""
+import pytest
+
+from app.models.user import User
+from app.models.user_role import UserRole
+from app.models.device import Device
+from app.core.security import create_access_token
+from app.services.typeahead import PrefixIndex, UserEntry, compact, normalize, typeahead, word_suffixes
+
+
+@pytest.fixture
+def test_admin(db):
+    """Create a test admin"""
+    admin = User(
+        name="Admin Test",
+        email="admin@example.com",
+        phone="555-0000",
+        password_hash="dummy_hash",
+        role=UserRole.ADMIN
+    )
+    db.add(admin)
+    db.commit()
+    db.refresh(admin)
+    return admin
+
+
+@pytest.fixture
+def admin_headers(test_admin):
+    """Authorization headers for the admin"""
+    token = create_access_token({"sub": test_admin.email})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def test_shop(db, test_admin):
+    """Two customers with a device each, indexed"""
+    mary = User(name="Mary Ann Smith", email="mary@example.com", phone="(555) 010-2030", password_hash="x")
+    marco = User(name="Marco Polo", email="marco@example.com", phone="555-777-1234", password_hash="x")
+    db.add_all([mary, marco])
+    db.commit()
+    laptop = Device(customer_id=mary.id, device_type="Laptop", brand="Dell", model="XPS 13", serial_number="DL-7731")
+    phone = Device(customer_id=marco.id, device_type="Phone", brand="Apple", model="iPhone 14", serial_number="AP-5520")
+    db.add_all([laptop, phone])
+    db.commit()
+
+    typeahead.rebuild(db)
+    return {"mary": mary, "marco": marco, "laptop": laptop, "phone": phone}
+
+
+def suggest(client, headers, q, **params):
+    response = client.get("/api/admin/typeahead/", params={"q": q, **params}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_key_normalization():
+    assert normalize("  Mary-Ann  SMITH ") == "mary ann smith"
+    assert compact("(555) 010-2030") == "5550102030"
+    assert word_suffixes("Mary Ann Smith") == ["mary ann smith", "ann smith", "smith"]
+
+
+def user(user_id, name, email="x@example.com", phone=None):
+    return UserEntry(user_id, name, email, phone, UserRole.USER)
+
+
+def test_prefix_index_ranks_shorter_keys_first():
+    index = PrefixIndex(max_entries=100, max_key_length=48)
+    smithson, smith, jones = user(1, "Smithson"), user(2, "Smith"), user(3, "Jones")
+    index.load([smithson, smith, jones])
+
+    assert index.search(["smi"], limit=10) == [smith, smithson]
+    assert index.search(["smi"], limit=1) == [smith]
+    assert index.search(["zz"], limit=10) == []
+
+
+def test_prefix_index_upsert_and_remove():
+    index = PrefixIndex(max_entries=100, max_key_length=48)
+    index.upsert(user(1, "Alpha Beta"))
+    renamed = user(1, "Gamma")
+    index.upsert(renamed)
+
+    assert index.search(["alp"], limit=10) == []
+    assert index.search(["gam"], limit=10) == [renamed]
+
+    index.remove(1)
+    assert len(index) == 0
+    assert index.search(["gam"], limit=10) == []
+
+
+def test_prefix_index_merge_matches_load():
+    loaded = PrefixIndex(max_entries=100, max_key_length=48)
+    loaded.load([user(1, "Smith"), user(2, "Jones"), user(3, "Smithson")])
+    merged = PrefixIndex(max_entries=100, max_key_length=48)
+    merged.upsert(user(2, "Jones"))
+    merged.merge([user(3, "Smithson"), user(1, "Smith")])
+
+    assert merged.keys == loaded.keys
+    assert list(merged.ids) == list(loaded.ids)
+    assert merged.search(["smi"], limit=10) == [user(1, "Smith"), user(3, "Smithson")]
+
+
+def test_prefix_index_is_bounded():
+    """Items that would take the index past max_entries keys are skipped"""
+    index = PrefixIndex(max_entries=3, max_key_length=4)
+    index.load([user(1, "Aaaaaa", email="b@c"), user(2, "Cc", email="d@e")])
+    index.upsert(user(3, "Ee", email="f@g"))
+
+    assert len(index) == 2
+    assert index.skipped == 2
+    assert set(index.keys) == {"aaaa", "b c"}
+
+
+@pytest.mark.parametrize("q, user", [
+    ("mar", None),
+    ("smi", "mary"),
+    ("ann sm", "mary"),
+    ("mary@", "mary"),
+    ("555 010", "mary"),
+    ("5557771", "marco"),
+])
+def test_user_suggestions(client, admin_headers, test_shop, q, user):
+    users = suggest(client, admin_headers, q, kind="users")["users"]
+
+    if user is None:
+        assert {u["id"] for u in users} == {test_shop["mary"].id, test_shop["marco"].id}
+    else:
+        assert [u["id"] for u in users] == [test_shop[user].id]
+
+
+@pytest.mark.parametrize("q, device", [
+    ("xps", "laptop"),
+    ("dl-77", "laptop"),
+    ("dl77", "laptop"),
+    ("apple iph", "phone"),
+    ("14", "phone"),
+])
+def test_device_suggestions(client, admin_headers, test_shop, q, device):
+    devices = suggest(client, admin_headers, q, kind="devices")["devices"]
+
+    assert [d["id"] for d in devices] == [test_shop[device].id]
+    assert devices[0]["serial_number"] == test_shop[device].serial_number
+
+
+def test_suggestions_without_kind_cover_both(client, admin_headers, test_shop):
+    result = suggest(client, admin_headers, "ma")
+
+    assert set(result) == {"users", "devices"}
+    assert result["devices"] == []
+
+
+def test_admin_writes_update_index(client, admin_headers, test_shop):
+    """Creating, renaming and deleting through the admin routers is visible immediately"""
+    response = client.post("/api/admin/users/", headers=admin_headers, json={
+        "name": "Zelda Quinn", "email": "zelda@example.com", "phone": "555-9999", "password": "secret123",
+    })
+    assert response.status_code == 201, response.text
+    user_id = response.json()["id"]
+    assert [u["id"] for u in suggest(client, admin_headers, "zel", kind="users")["users"]] == [user_id]
+
+    response = client.put(f"/api/admin/users/{user_id}", headers=admin_headers, json={"name": "Yara Quinn"})
+    assert response.status_code == 200, response.text
+    assert suggest(client, admin_headers, "zelda q", kind="users")["users"] == []
+    assert [u["name"] for u in suggest(client, admin_headers, "yar", kind="users")["users"]] == ["Yara Quinn"]
+
+    response = client.delete(f"/api/admin/devices/{test_shop['laptop'].id}", headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert suggest(client, admin_headers, "xps", kind="devices")["devices"] == []
+
+
+def test_invalid_kind(client, admin_headers, test_shop):
+    response = client.get("/api/admin/typeahead/", params={"q": "a", "kind": "orders"}, headers=admin_headers)
+
+    assert response.status_code == 400
+
+
+def test_typeahead_does_not_query_database(client, queries, admin_headers, test_shop):
+    """Only authentication touches the database once the index is built"""
+    with queries.record():
+        suggest(client, admin_headers, "smi")
+
+    queries.assert_max_queries(1)
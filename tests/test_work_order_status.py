@@ -0,0 +1,178 @@
+"""
+Tests for the work order state machine and the routes that use it
+"""
+import pytest
+
+from sqlalchemy import select
+
+from app.models.user import User
+from app.models.user_role import UserRole
+from app.models.device import Device
+from app.models.message import Message, SenderType
+from app.models.notification import Notification
+from app.models.work_order import WorkOrder, WorkOrderStatus
+from app.core.security import create_access_token
+from app.services import work_order_status
+from app.services.work_order_status import (
+    HOOKS,
+    STAFF_TRANSITIONS,
+    allowed_targets,
+    can_transition,
+    change_statuses,
+    post_system_message,
+    validate_many,
+)
+
+S = WorkOrderStatus
+STAFF = User(id=1, role=UserRole.TECHNICIAN)
+CUSTOMER = User(id=2, role=UserRole.USER)
+
+
+@pytest.fixture
+def technician(db):
+    technician = User(name="Tech Test", email="tech@example.com", password_hash="x", role=UserRole.TECHNICIAN)
+    db.add(technician)
+    db.commit()
+    return technician
+
+
+@pytest.fixture
+def customer(db):
+    customer = User(name="John Test", email="test@example.com", password_hash="x")
+    db.add(customer)
+    db.commit()
+    return customer
+
+
+@pytest.fixture
+def make_work_order(db, customer):
+    device = Device(customer_id=customer.id, device_type="Laptop", serial_number="SM-001")
+    db.add(device)
+    db.commit()
+
+    def make(status):
+        work_order = WorkOrder(customer_id=customer.id, device_id=device.id, title="Repair", status=status)
+        db.add(work_order)
+        db.commit()
+        return work_order
+
+    return make
+
+
+def headers(user):
+    return {"Authorization": f"Bearer {create_access_token({'sub': user.email})}"}
+
+
+def test_every_status_has_transitions():
+    assert set(STAFF_TRANSITIONS) == set(WorkOrderStatus)
+
+
+@pytest.mark.parametrize("from_status, to_status, actor, allowed", [
+    (S.PENDING, S.DIAGNOSED, STAFF, True),
+    (S.IN_PROGRESS, S.COMPLETED, STAFF, True),
+    (S.COMPLETED, S.DELIVERED, STAFF, True),
+    (S.COMPLETED, S.IN_PROGRESS, STAFF, True),
+    (S.PENDING, S.DELIVERED, STAFF, False),
+    (S.DELIVERED, S.PENDING, STAFF, False),
+    (S.PENDING, S.CANCELLED, CUSTOMER, True),
+    (S.APPROVED, S.CANCELLED, CUSTOMER, False),
+    (S.PENDING, S.DIAGNOSED, CUSTOMER, False),
+])
+def test_can_transition(from_status, to_status, actor, allowed):
+    assert can_transition(from_status, to_status, actor) is allowed
+
+
+def test_validate_many_matches_can_transition():
+    statuses = list(WorkOrderStatus) * 2
+    for target in WorkOrderStatus:
+        assert validate_many(statuses, target, STAFF) == [can_transition(s, target, STAFF) for s in statuses]
+
+
+def test_allowed_targets():
+    assert allowed_targets(S.COMPLETED, STAFF) == [S.IN_PROGRESS, S.DELIVERED]
+    assert allowed_targets(S.DELIVERED, STAFF) == []
+
+
+def test_hooks_compiled_per_transition():
+    assert post_system_message in HOOKS[(S.IN_PROGRESS, S.COMPLETED)]
+    assert post_system_message in HOOKS[(S.COMPLETED, S.IN_PROGRESS)]
+    assert post_system_message not in HOOKS[(S.PENDING, S.DIAGNOSED)]
+    assert all(HOOKS[pair][0] is work_order_status.notify_customer for pair in HOOKS)
+
+
+def test_single_update_runs_side_effects(client, db, technician, make_work_order):
+    work_order = make_work_order(S.IN_PROGRESS)
+
+    response = client.patch(
+        f"/api/admin/work-orders/{work_order.id}/status",
+        params={"status": "completed", "technician_notes": "Replaced fan"},
+        headers=headers(technician),
+    )
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["status"] == "completed"
+    assert body["technician_notes"] == "Replaced fan"
+    assert body["completed_at"] is not None
+    notification = db.scalar(select(Notification).where(Notification.work_order_id == work_order.id))
+    assert notification.message.endswith("Great news! Your repair is complete")
+    message = db.scalar(select(Message).where(Message.work_order_id == work_order.id))
+    assert (message.sender_type, message.message) == (SenderType.SYSTEM, "Status changed from in progress to completed")
+
+
+def test_reopening_clears_completed_at(client, db, technician, make_work_order):
+    work_order = make_work_order(S.IN_PROGRESS)
+    path = f"/api/admin/work-orders/{work_order.id}/status"
+
+    client.patch(path, params={"status": "completed"}, headers=headers(technician))
+    response = client.patch(path, params={"status": "in_progress"}, headers=headers(technician))
+
+    assert response.json()["completed_at"] is None
+
+
+def test_concurrently_changed_rows_are_left_alone(db, technician, make_work_order):
+    """A row whose status changed since it was read is a conflict: not updated, no side effects"""
+    current, stale = make_work_order(S.IN_PROGRESS), make_work_order(S.CANCELLED)
+
+    results, changes = change_statuses(
+        db,
+        [(current.id, S.IN_PROGRESS, current.customer_id), (stale.id, S.IN_PROGRESS, stale.customer_id)],
+        S.COMPLETED,
+        technician,
+    )
+    db.commit()
+
+    assert [result["result"] for result in results] == ["updated", "conflict"]
+    assert [change.work_order_id for change in changes] == [current.id]
+    db.expire_all()
+    assert db.get(WorkOrder, stale.id).status == S.CANCELLED
+    assert db.scalars(select(Notification.work_order_id)).all() == [current.id]
+    assert db.scalars(select(Message.work_order_id)).all() == [current.id]
+
+
+@pytest.mark.parametrize("status, detail", [
+    ("delivered", "Cannot move a work order from 'pending' to 'delivered'. Allowed: diagnosed, in_progress, cancelled"),
+    ("waiting_for_parts", "Invalid status. Must be one of: pending, diagnosed, approved, in_progress, completed, delivered, cancelled"),
+])
+def test_single_update_rejects_invalid_moves(client, db, technician, make_work_order, status, detail):
+    work_order = make_work_order(S.PENDING)
+
+    response = client.patch(
+        f"/api/admin/work-orders/{work_order.id}/status", params={"status": status}, headers=headers(technician)
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == detail
+
+
+def test_customer_cancel_uses_state_machine(client, db, customer, make_work_order):
+    pending, approved = make_work_order(S.PENDING), make_work_order(S.APPROVED)
+
+    assert client.delete(f"/api/customers/work-orders/{approved.id}", headers=headers(customer)).status_code == 400
+    assert client.delete(f"/api/customers/work-orders/{pending.id}", headers=headers(customer)).status_code == 200
+
+    db.expire_all()
+    assert db.get(WorkOrder, pending.id).status == S.CANCELLED
+    # No notification to the customer about their own cancellation; the thread records it
+    assert db.scalar(select(Notification).where(Notification.work_order_id == pending.id)) is None
+    assert db.scalar(select(Message.message).where(Message.work_order_id == pending.id)) == "Status changed from pending to cancelled"